@@ -9,7 +9,7 @@ from config import Config
 login_manager = LoginManager()
 
 
-def create_app(testing=False):
+def create_app(testing=False, database_uri=None):
     app = Flask(__name__)
     if testing:
         app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
@@ -18,6 +18,8 @@ def create_app(testing=False):
         app.config["SECRET_KEY"] = Config.SECRET_KEY
     else:
         app.config.from_object(Config)
+    if database_uri:
+        app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
     kanvas_db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
@@ -0,0 +1,111 @@
+import argparse
+import json
+import subprocess
+import sys
+
+from app import create_app
+from app.extensions import kanvas_db
+from app.models.section import Section
+from app.services.generate_schedule import GREEDY_MODE, SCHEDULE_MODES, GenerationOptions
+from app.services.schedule_benchmark import (
+    SyntheticTerm,
+    benchmark_record,
+    generate_synthetic_term,
+    run_benchmark,
+)
+
+
+def _parse_credit_mix(value):
+    mix = {}
+    for item in value.split(","):
+        block_count, weight = item.split(":")
+        mix[int(block_count)] = float(weight)
+    return mix
+
+
+def _current_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def parse_args(argv=None):
+    defaults = SyntheticTerm()
+    parser = argparse.ArgumentParser(
+        description="Genera un semestre sintético y mide generate_schedule."
+    )
+    parser.add_argument(
+        "--database-uri",
+        default="sqlite:///:memory:",
+        help="Base de datos vacía dedicada al benchmark (SQLite o MySQL).",
+    )
+    parser.add_argument("--sections", type=int, default=defaults.sections)
+    parser.add_argument("--students-per-section", type=int, default=defaults.students_per_section)
+    parser.add_argument("--student-load", type=int, default=defaults.student_load)
+    parser.add_argument("--cohort-size", type=int, default=defaults.cohort_size)
+    parser.add_argument("--rooms", type=int, default=defaults.rooms)
+    parser.add_argument("--teacher-load", type=int, default=defaults.teacher_load)
+    parser.add_argument(
+        "--credit-mix",
+        type=_parse_credit_mix,
+        default=defaults.credit_mix,
+        help="Créditos y pesos, por ejemplo 2:0.3,3:0.5,4:0.2",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--mode", choices=sorted(SCHEDULE_MODES), default=GREEDY_MODE)
+    parser.add_argument("--fallback", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="No medir memoria (tracemalloc hace más lenta la ejecución).",
+    )
+    parser.add_argument(
+        "--output", help="Archivo JSON Lines al que se agrega el resultado (por defecto stdout)."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    term = SyntheticTerm(
+        sections=args.sections,
+        students_per_section=args.students_per_section,
+        student_load=args.student_load,
+        cohort_size=args.cohort_size,
+        rooms=args.rooms,
+        teacher_load=args.teacher_load,
+        credit_mix=args.credit_mix,
+        seed=args.seed,
+    )
+    options = {"mode": args.mode, "fallback": args.fallback}
+
+    app = create_app(database_uri=args.database_uri)
+    with app.app_context():
+        kanvas_db.create_all()
+        if Section.query.count():
+            sys.exit("La base de datos del benchmark debe estar vacía.")
+
+        counts = generate_synthetic_term(term)
+        runs = run_benchmark(
+            repeat=args.repeat,
+            trace_memory=not args.no_memory,
+            options=GenerationOptions(**options),
+        )
+        record = benchmark_record(term, counts, runs, **options)
+        record["commit"] = _current_commit()
+
+    line = json.dumps(record, default=str)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as output:
+            output.write(line + "\n")
+    else:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
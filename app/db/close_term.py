@@ -0,0 +1,67 @@
+import argparse
+import sys
+
+from app import create_app
+from app.services.batch_close import DEFAULT_CLOSE_CHUNK_SIZE, close_sections
+
+
+def _parse_section_ids(value):
+    return [int(section_id) for section_id in value.split(",") if section_id.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Cierra de una vez las secciones abiertas de un periodo o de una lista."
+    )
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--semester", type=int, choices=(1, 2))
+    parser.add_argument(
+        "--sections", type=_parse_section_ids, help="Ids de secciones, por ejemplo 3,8,15"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Procesos para calcular las notas (por defecto SECTION_CLOSE_WORKERS).",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CLOSE_CHUNK_SIZE)
+    parser.add_argument("--database-uri", help="Base de datos a usar (por defecto la configurada).")
+    args = parser.parse_args(argv)
+    if (args.year is None) != (args.semester is None):
+        parser.error("--year y --semester se usan juntos.")
+    if args.year is None and args.sections is None:
+        parser.error("Indica --year y --semester, o --sections.")
+    return args
+
+
+def _print_progress(done, total):
+    print(f"{done}/{total} secciones procesadas", flush=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    term = (args.year, args.semester) if args.year is not None else None
+
+    app = create_app(database_uri=args.database_uri)
+    with app.app_context():
+        workers = args.workers
+        if workers is None:
+            workers = app.config.get("SECTION_CLOSE_WORKERS")
+        result = close_sections(
+            term=term,
+            section_ids=args.sections,
+            workers=workers,
+            chunk_size=args.chunk_size,
+            progress=_print_progress,
+        )
+
+    print(f"Secciones cerradas: {len(result.closed)}")
+    if result.skipped:
+        print(f"Omitidas (cerradas o inexistentes): {', '.join(map(str, result.skipped))}")
+    for section_id, error in result.failed.items():
+        print(f"No se pudo cerrar la sección {section_id}: {error}", file=sys.stderr)
+    if result.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import argparse
+
+from app import create_app
+from app.services.schedule_jobs import fail_interrupted_jobs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Marca como fallidos los trabajos de horario en cola o en ejecución. "
+            "Úsalo con la aplicación detenida, antes de levantar los workers."
+        )
+    )
+    parser.add_argument("--database-uri", help="Base de datos a usar (por defecto la configurada).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    app = create_app(database_uri=args.database_uri)
+    with app.app_context():
+        failed = fail_interrupted_jobs()
+
+    print(f"Trabajos marcados como fallidos: {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import sys
+
+from app import create_app
+from app.services.grade_subtotals import DEFAULT_REBUILD_CHUNK_SIZE, rebuild_subtotals
+
+
+def _parse_section_ids(value):
+    return [int(section_id) for section_id in value.split(",") if section_id.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recalcula desde cero los subtotales de notas guardados por sección."
+    )
+    parser.add_argument(
+        "--sections", type=_parse_section_ids, help="Ids de secciones, por ejemplo 3,8,15"
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_REBUILD_CHUNK_SIZE)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Solo informa las secciones desactualizadas, sin guardar cambios.",
+    )
+    parser.add_argument("--database-uri", help="Base de datos a usar (por defecto la configurada).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    app = create_app(database_uri=args.database_uri)
+    with app.app_context():
+        stale = rebuild_subtotals(
+            section_ids=args.sections, chunk_size=args.chunk_size, dry_run=args.check
+        )
+
+    if not stale:
+        print("Los subtotales están al día.")
+        return
+    label = "Secciones desactualizadas" if args.check else "Secciones corregidas"
+    print(f"{label}: {', '.join(map(str, stale))}")
+    if args.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
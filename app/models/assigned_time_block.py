@@ -1,4 +1,5 @@
 from app.extensions import kanvas_db
+from app.models.course_instance import Semester
 
 
 class AssignedTimeBlock(kanvas_db.Model):  # type: ignore[name-defined]
@@ -6,6 +7,14 @@ class AssignedTimeBlock(kanvas_db.Model):  # type: ignore[name-defined]
 
     id = kanvas_db.Column(kanvas_db.Integer, primary_key=True)
 
+    version_id = kanvas_db.Column(
+        kanvas_db.Integer,
+        kanvas_db.ForeignKey("schedule_versions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    version = kanvas_db.relationship("ScheduleVersion", back_populates="assigned_time_blocks")
+
     section_id = kanvas_db.Column(
         kanvas_db.Integer,
         kanvas_db.ForeignKey("sections.id", ondelete="CASCADE"),
@@ -27,12 +36,27 @@ class AssignedTimeBlock(kanvas_db.Model):  # type: ignore[name-defined]
     )
     time_block = kanvas_db.relationship("TimeBlock", back_populates="assigned_time_blocks")
 
+    # The section's (year, semester) term: rooms are only shared within a term.
+    year = kanvas_db.Column(kanvas_db.Integer, nullable=False)
+    semester = kanvas_db.Column(kanvas_db.Enum(Semester), nullable=False)
+
     __table_args__ = (
-        kanvas_db.UniqueConstraint("classroom_id", "time_block_id", name="uq_classroom_timeblock"),
-        kanvas_db.UniqueConstraint("section_id", "time_block_id", name="uq_section_timeblock"),
+        kanvas_db.UniqueConstraint(
+            "version_id",
+            "year",
+            "semester",
+            "classroom_id",
+            "time_block_id",
+            name="uq_classroom_timeblock",
+        ),
+        kanvas_db.Index("ix_version_timeblock", "version_id", "time_block_id"),
+        kanvas_db.UniqueConstraint(
+            "version_id", "section_id", "time_block_id", name="uq_section_timeblock"
+        ),
     )
 
     def __repr__(self):
-        return f"<AssignedTimeBlock section={self.section_id},\
+        return f"<AssignedTimeBlock version={self.version_id},\
+                                    section={self.section_id},\
                                     classroom={self.classroom_id},\
                                     block={self.time_block_id}>"
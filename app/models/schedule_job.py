@@ -0,0 +1,53 @@
+import enum
+from datetime import datetime
+
+from app.extensions import kanvas_db
+
+
+class ScheduleJobStatus(enum.Enum):
+    PENDING = "En cola"
+    RUNNING = "En ejecución"
+    DONE = "Completado"
+    FAILED = "Fallido"
+    CANCELLED = "Cancelado"
+
+    def __str__(self):
+        return self.value
+
+
+class ScheduleJob(kanvas_db.Model):  # type: ignore[name-defined]
+    __tablename__ = "schedule_jobs"
+
+    id = kanvas_db.Column(kanvas_db.Integer, primary_key=True)
+    status = kanvas_db.Column(
+        kanvas_db.Enum(ScheduleJobStatus),
+        nullable=False,
+        default=ScheduleJobStatus.PENDING,
+        index=True,
+    )
+    incremental = kanvas_db.Column(kanvas_db.Boolean, nullable=False, default=False)
+    phase = kanvas_db.Column(kanvas_db.String(20))
+    placed = kanvas_db.Column(kanvas_db.Integer, nullable=False, default=0)
+    total = kanvas_db.Column(kanvas_db.Integer, nullable=False, default=0)
+    cancel_requested = kanvas_db.Column(kanvas_db.Boolean, nullable=False, default=False)
+    error = kanvas_db.Column(kanvas_db.Text)
+    created_at = kanvas_db.Column(kanvas_db.DateTime, nullable=False, default=datetime.now)
+    started_at = kanvas_db.Column(kanvas_db.DateTime)
+    finished_at = kanvas_db.Column(kanvas_db.DateTime)
+
+    @property
+    def is_finished(self):
+        return self.status in (
+            ScheduleJobStatus.DONE,
+            ScheduleJobStatus.FAILED,
+            ScheduleJobStatus.CANCELLED,
+        )
+
+    @property
+    def elapsed_seconds(self):
+        if self.started_at is None:
+            return 0.0
+        return ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+
+    def __repr__(self):
+        return f"<ScheduleJob id={self.id}, status={self.status}, phase={self.phase}>"
@@ -0,0 +1,37 @@
+import enum
+from datetime import datetime
+
+from app.extensions import kanvas_db
+
+
+class ScheduleVersionStatus(enum.Enum):
+    BUILDING = "Generando"
+    READY = "Lista"
+    FAILED = "Fallida"
+
+    def __str__(self):
+        return self.value
+
+
+class ScheduleVersion(kanvas_db.Model):  # type: ignore[name-defined]
+    __tablename__ = "schedule_versions"
+
+    id = kanvas_db.Column(kanvas_db.Integer, primary_key=True)
+    status = kanvas_db.Column(
+        kanvas_db.Enum(ScheduleVersionStatus),
+        nullable=False,
+        default=ScheduleVersionStatus.BUILDING,
+    )
+    is_active = kanvas_db.Column(kanvas_db.Boolean, nullable=False, default=False, index=True)
+    created_at = kanvas_db.Column(kanvas_db.DateTime, nullable=False, default=datetime.now)
+    activated_at = kanvas_db.Column(kanvas_db.DateTime)
+    edited_at = kanvas_db.Column(kanvas_db.DateTime)
+    score = kanvas_db.Column(kanvas_db.JSON)
+    report = kanvas_db.Column(kanvas_db.JSON)
+
+    assigned_time_blocks = kanvas_db.relationship(
+        "AssignedTimeBlock", back_populates="version", passive_deletes=True
+    )
+
+    def __repr__(self):
+        return f"<ScheduleVersion id={self.id}, status={self.status}, active={self.is_active}>"
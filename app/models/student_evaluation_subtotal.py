@@ -0,0 +1,30 @@
+from app.extensions import kanvas_db
+
+
+class StudentEvaluationSubtotal(kanvas_db.Model):  # type: ignore[name-defined]
+    __tablename__ = "student_evaluation_subtotals"
+
+    student_id = kanvas_db.Column(
+        kanvas_db.Integer,
+        kanvas_db.ForeignKey("students.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    evaluation_id = kanvas_db.Column(
+        kanvas_db.Integer,
+        kanvas_db.ForeignKey("evaluations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    section_id = kanvas_db.Column(
+        kanvas_db.Integer,
+        kanvas_db.ForeignKey("sections.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    weighted_sum = kanvas_db.Column(kanvas_db.Float, nullable=False, default=0.0)
+    weight_total = kanvas_db.Column(kanvas_db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return (
+            f"<StudentEvaluationSubtotal student_id={self.student_id} "
+            f"evaluation_id={self.evaluation_id}>"
+        )
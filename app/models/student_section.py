@@ -26,5 +26,7 @@ class StudentSection(kanvas_db.Model):  # type: ignore[name-defined]
         overlaps="sections,section_associations",
     )
 
+    __table_args__ = (kanvas_db.Index("ix_student_sections_student", "student_id"),)
+
     def __repr__(self):
         return f"<StudentSection student_id={self.student_id} section_id={self.section_id}>"
@@ -0,0 +1,23 @@
+from app.extensions import kanvas_db
+
+
+class StudentSectionSubtotal(kanvas_db.Model):  # type: ignore[name-defined]
+    __tablename__ = "student_section_subtotals"
+
+    student_id = kanvas_db.Column(
+        kanvas_db.Integer,
+        kanvas_db.ForeignKey("students.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    section_id = kanvas_db.Column(
+        kanvas_db.Integer,
+        kanvas_db.ForeignKey("sections.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    weighted_sum = kanvas_db.Column(kanvas_db.Float, nullable=False, default=0.0)
+    weight_total = kanvas_db.Column(kanvas_db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (kanvas_db.Index("ix_student_section_subtotals_section", "section_id"),)
+
+    def __repr__(self):
+        return f"<StudentSectionSubtotal student_id={self.student_id} section_id={self.section_id}>"
@@ -1,8 +1,10 @@
-from flask import Blueprint, flash, redirect, render_template, url_for
+from flask import Blueprint, current_app, flash, redirect, render_template, url_for
 
 from app.extensions import kanvas_db
 from app.forms.classroom_forms import ClassroomForm
 from app.models.classroom import Classroom
+from app.services.generate_schedule import configured_time_grid, invalidate_schedule_cache
+from app.services.schedule_repair import repair_active_schedule
 
 classroom_bp = Blueprint("classroom", __name__, url_prefix="/classrooms")
 
@@ -68,7 +70,19 @@ def edit(classroom_id):
 @classroom_bp.route("/<int:classroom_id>/delete", methods=["POST"])
 def delete(classroom_id):
     classroom = Classroom.query.get_or_404(classroom_id)
+    repair = repair_active_schedule(
+        configured_time_grid(current_app.config), classroom_ids=[classroom_id]
+    )
     kanvas_db.session.delete(classroom)
     kanvas_db.session.commit()
+    invalidate_schedule_cache()
     flash("Sala eliminada exitosamente", "success")
+    if repair and repair.placements:
+        flash(f"Secciones reasignadas en el horario: {len(repair.placements)}.", "info")
+    if repair and repair.unplaced_section_ids:
+        flash(
+            "No se pudieron reasignar las secciones "
+            f"{', '.join(str(section_id) for section_id in repair.unplaced_section_ids)}.",
+            "warning",
+        )
     return redirect(url_for("classroom.index"))
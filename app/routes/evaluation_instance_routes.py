@@ -9,6 +9,7 @@ from app.services.evaluation_instance_service import (
     get_evaluation_instance_with_students_and_grades,
     get_section_id,
 )
+from app.services.grade_subtotals import refresh_subtotals
 from app.services.validations import validate_section_for_evaluation
 from app.utils.decorators import require_section_open
 
@@ -70,6 +71,7 @@ def create():
 
         try:
             kanvas_db.session.add(evaluation_instance)
+            refresh_subtotals([section_id])
             kanvas_db.session.commit()
             return redirect(
                 url_for(
@@ -116,11 +118,13 @@ def edit(evaluation_instance_id):
                 evaluation_instance=evaluation_instance,
             )
 
+        previous_section_id = evaluation_instance.evaluation.section_id
         evaluation_instance.title = title
         evaluation_instance.optional = optional
         evaluation_instance.evaluation_id = evaluation_id
 
         try:
+            refresh_subtotals({previous_section_id, get_section_id(evaluation_id)})
             kanvas_db.session.commit()
             return redirect(
                 url_for(
@@ -148,7 +152,9 @@ def edit(evaluation_instance_id):
 def delete(evaluation_instance_id):
     evaluation_instance = EvaluationInstance.query.get_or_404(evaluation_instance_id)
     try:
+        section_id = evaluation_instance.evaluation.section_id
         kanvas_db.session.delete(evaluation_instance)
+        refresh_subtotals([section_id])
         kanvas_db.session.commit()
     except SQLAlchemyError as e:
         kanvas_db.session.rollback()
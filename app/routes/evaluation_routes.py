@@ -8,6 +8,7 @@ from app.extensions import kanvas_db
 from app.forms.evaluation_forms import EvaluationForm
 from app.models.evaluation import Evaluation
 from app.models.section import Section, WeighingType
+from app.services.grade_subtotals import refresh_subtotals
 from app.services.validations import validate_section_for_evaluation
 from app.utils.decorators import require_section_open
 
@@ -59,6 +60,7 @@ def edit_instance_weights(evaluation_id):
             instance.instance_weighing = weights[instance.id]
 
         try:
+            refresh_subtotals([evaluation.section_id])
             kanvas_db.session.commit()
             flash("Pesos de instancias actualizados correctamente", "success")
             return redirect(url_for(SHOW_ROUTE, evaluation_id=evaluation.id))
@@ -111,6 +113,7 @@ def create():
 
         try:
             kanvas_db.session.add(evaluation)
+            refresh_subtotals([section_id])
             kanvas_db.session.commit()
             return redirect(url_for(SHOW_ROUTE, evaluation_id=evaluation.id))
         except SQLAlchemyError as e:
@@ -151,12 +154,14 @@ def edit(evaluation_id):
             flash("Ya existe una evaluación con ese título para la seccion.", "danger")
             return render_template("evaluations/edit.html", form=form, evaluation=evaluation)
 
+        previous_section_id = evaluation.section_id
         evaluation.title = title
         evaluation.weighing = 0.0
         evaluation.weighing_system = weighing_system
         evaluation.section_id = section_id
 
         try:
+            refresh_subtotals({previous_section_id, section_id})
             kanvas_db.session.commit()
             return redirect(url_for(SHOW_ROUTE, evaluation_id=evaluation.id))
         except SQLAlchemyError as e:
@@ -172,6 +177,7 @@ def delete(evaluation_id):
     evaluation = Evaluation.query.get_or_404(evaluation_id)
     try:
         kanvas_db.session.delete(evaluation)
+        refresh_subtotals([evaluation.section_id])
         kanvas_db.session.commit()
     except SQLAlchemyError:
         kanvas_db.session.rollback()
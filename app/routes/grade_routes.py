@@ -1,9 +1,12 @@
-from flask import Blueprint, redirect, render_template, request, url_for
+from flask import Blueprint, flash, redirect, render_template, request, url_for
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.extensions import kanvas_db
+from app.models.evaluation import Evaluation
 from app.models.evaluation_instance import EvaluationInstance
 from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.services.grade_entry import GradeEntryError, grade_entry_sheet, save_grades
+from app.services.grade_subtotals import refresh_grade_subtotals
 from app.services.validations import validate_section_for_evaluation
 
 grade_bp = Blueprint("grades", __name__, url_prefix="/grades")
@@ -51,6 +54,7 @@ def _save_grade_transaction(evaluation_instance_id, student_id, grade_value):
             )
             kanvas_db.session.add(new_grade)
 
+        refresh_grade_subtotals([(evaluation_instance_id, student_id)])
         kanvas_db.session.commit()
         return True
     except SQLAlchemyError as e:
@@ -139,7 +143,93 @@ def delete_grade(evaluation_instance_id, student_id):
 
     try:
         kanvas_db.session.delete(grade_instance)
+        refresh_grade_subtotals([(evaluation_instance_id, student_id)])
         kanvas_db.session.commit()
         return _redirect_to_evaluation(evaluation_instance_id)
     except SQLAlchemyError as e:
         return _handle_grade_error(e, "eliminar la nota")
+
+
+@grade_bp.route("/<int:evaluation_instance_id>/sheet", methods=["GET", "POST"])
+def instance_sheet(evaluation_instance_id):
+    """Planilla de notas de todos los estudiantes para una instancia de evaluación."""
+    if _validate_section(evaluation_instance_id):
+        return _redirect_to_evaluation(evaluation_instance_id)
+
+    instance = EvaluationInstance.query.get_or_404(evaluation_instance_id)
+    return _grade_sheet(
+        instance.evaluation,
+        [instance],
+        url_for("grades.instance_sheet", evaluation_instance_id=evaluation_instance_id),
+    )
+
+
+@grade_bp.route("/evaluation/<int:evaluation_id>/sheet", methods=["GET", "POST"])
+def evaluation_sheet(evaluation_id):
+    """Planilla de notas de todos los estudiantes para todas las instancias de una evaluación."""
+    evaluation = Evaluation.query.get_or_404(evaluation_id)
+    if validate_section_for_evaluation(evaluation.section_id):
+        return redirect(url_for("evaluation.show", evaluation_id=evaluation_id))
+
+    instances = sorted(evaluation.instances, key=lambda instance: instance.index_in_evaluation)
+    return _grade_sheet(
+        evaluation,
+        instances,
+        url_for("grades.evaluation_sheet", evaluation_id=evaluation_id),
+    )
+
+
+def _grade_sheet(evaluation, instances, sheet_url):
+    """Muestra la planilla o guarda todas sus notas en una sola escritura."""
+    instance_ids = [instance.id for instance in instances]
+
+    if request.method == "POST":
+        wants_json = request.is_json
+        try:
+            entries = _sheet_entries(instance_ids[0] if len(instances) == 1 else None)
+            saved = save_grades(evaluation.section_id, instance_ids, entries)
+        except GradeEntryError as e:
+            if wants_json:
+                return {"errors": e.errors}, 400
+            for error in e.errors:
+                flash(error, "danger")
+            return redirect(sheet_url)
+        except SQLAlchemyError as e:
+            kanvas_db.session.rollback()
+            return _handle_grade_error(e, "guardar las notas")
+
+        if wants_json:
+            return {"saved": saved}
+        flash(f"Notas guardadas: {saved}.", "success")
+        return redirect(sheet_url)
+
+    students, grades = grade_entry_sheet(evaluation.section_id, instance_ids)
+    return render_template(
+        "evaluation_instances/grade_sheet.html",
+        evaluation=evaluation,
+        instances=instances,
+        students=students,
+        grades=grades,
+    )
+
+
+def _sheet_entries(default_instance_id):
+    """(evaluation_instance_id, student_id, nota) enviados como JSON o formulario."""
+    if request.is_json:
+        entries = []
+        for item in (request.get_json(silent=True) or {}).get("grades", []):
+            try:
+                instance_id = int(item.get("evaluation_instance_id", default_instance_id))
+                student_id = int(item["student_id"])
+            except (AttributeError, KeyError, TypeError, ValueError):
+                raise GradeEntryError([f"Entrada inválida: {item}"]) from None
+            entries.append((instance_id, student_id, item.get("grade")))
+        return entries
+
+    entries = []
+    for key, grade in request.form.items():
+        prefix, _, ids = key.partition("-")
+        instance_id, _, student_id = ids.partition("-")
+        if prefix == "grade" and instance_id.isdigit() and student_id.isdigit():
+            entries.append((int(instance_id), int(student_id), grade))
+    return entries
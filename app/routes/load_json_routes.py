@@ -21,6 +21,7 @@ from app.services.database_validations import (
     filter_existing_by_two_fields,
     filter_grades,
 )
+from app.services.grade_subtotals import refresh_grade_subtotals, refresh_subtotals
 from app.utils import json_constants as JC
 from app.utils.flash_messages import flash_invalid_grades, flash_invalid_load, flash_successful_load
 from app.utils.parsing.parse_classroom_json import parse_classrooms_json
@@ -230,6 +231,7 @@ def load_sections_from_json():
             created_sections_count = add_objects_to_session(filtered_sections)
             created_evaluations_count = add_objects_to_session(parsed_evaluations)
             created_evaluation_instances_count = add_objects_to_session(parsed_instances)
+            refresh_subtotals({evaluation.section_id for evaluation in parsed_evaluations})
 
             kanvas_db.session.commit()
 
@@ -266,6 +268,10 @@ def load_student_sections_from_json():
             )
 
             created_student_sections_count = add_objects_to_session(filtered_links)
+            refresh_subtotals(
+                {link.section_id for link in filtered_links},
+                {link.student_id for link in filtered_links},
+            )
 
             kanvas_db.session.commit()
             flash_successful_load(created_student_sections_count, JC.STUDENT_SECTIONS_LABEL)
@@ -294,6 +300,9 @@ def load_grades_from_json():
             flash_invalid_grades(parsed_data)
 
             created_grades_count = add_objects_to_session(valid_entries)
+            refresh_grade_subtotals(
+                (grade.evaluation_instance_id, grade.student_id) for grade in valid_entries
+            )
 
             kanvas_db.session.commit()
             flash_successful_load(created_grades_count, JC.GRADES_LABEL)
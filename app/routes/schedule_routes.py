@@ -1,51 +1,346 @@
-import io
-
-import pandas as pd
-from flask import Blueprint, flash, redirect, render_template, send_file, url_for
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    stream_with_context,
+    url_for,
+)
 
+from app.extensions import kanvas_db
+from app.models.classroom import Classroom
+from app.models.schedule_job import ScheduleJob
+from app.models.section import Section
+from app.models.teacher import Teacher
+from app.models.user import User
 from app.services.generate_schedule import (
-    delete_assigned_time_blocks,
-    generate_schedule,
+    DEFAULT_ATTEMPTS,
+    DEFAULT_TIME_BUDGET,
+    GREEDY_MODE,
+    GenerationOptions,
+    configured_time_grid,
+    feasibility_report,
     get_schedule,
+    get_terms,
+    invalidate_schedule_cache,
+)
+from app.services.schedule_edit import (
+    ScheduleEditError,
+    move_section,
+    swap_candidates,
+    swap_sections,
+)
+from app.services.schedule_export import EXPORT_FORMATS, XLSX_FORMAT, schedule_rows
+from app.services.schedule_jobs import (
+    ScheduleJobError,
+    cancel_job,
+    job_status,
+    submit_generation_job,
+)
+from app.services.schedule_local_search import DEFAULT_IMPROVE_TIME_BUDGET
+from app.services.schedule_repair import repair_active_schedule
+from app.services.schedule_timetable import (
+    CLASSROOM_TIMETABLE,
+    STUDENT_TIMETABLE,
+    TEACHER_TIMETABLE,
+    TIMETABLE_LABELS,
+    timetable_for,
+)
+from app.services.schedule_versions import (
+    DEFAULT_VERSIONS_KEPT,
+    ScheduleVersionError,
+    diff_versions,
+    get_active_version,
+    get_active_version_id,
+    list_versions,
+    rollback_to_version,
 )
 
 schedule_bp = Blueprint("schedule", __name__, url_prefix="/schedule")
 
 
+def _configured_grid():
+    return configured_time_grid(current_app.config)
+
+
+def _generation_options():
+    config = current_app.config
+    return GenerationOptions(
+        mode=config.get("SCHEDULE_MODE", GREEDY_MODE),
+        fallback=config.get("SCHEDULE_SOLVER_FALLBACK", True),
+        time_budget=config.get("SCHEDULE_SOLVER_TIME_BUDGET", DEFAULT_TIME_BUDGET),
+        attempts=config.get("SCHEDULE_MULTISTART_ATTEMPTS", DEFAULT_ATTEMPTS),
+        workers=config.get("SCHEDULE_WORKERS"),
+        term_workers=config.get("SCHEDULE_TERM_WORKERS"),
+        improve_time_budget=config.get("SCHEDULE_IMPROVE_TIME_BUDGET", DEFAULT_IMPROVE_TIME_BUDGET),
+        versions_kept=config.get("SCHEDULE_VERSIONS_KEPT", DEFAULT_VERSIONS_KEPT),
+        grid=_configured_grid(),
+    )
+
+
+def _selected_term():
+    """
+    Parse the optional ``term`` parameter, given as "<year>-<semester>".
+    """
+    value = request.values.get("term")
+    if not value:
+        return None
+    year, _, semester = value.partition("-")
+    if not (year.isdigit() and semester.isdigit()):
+        raise ValueError(f"Periodo inválido: {value}")
+    return (int(year), int(semester))
+
+
 @schedule_bp.route("/")
 def index():
     schedule = get_schedule()
-    return render_template("schedule/index.html", schedule=schedule)
+    teachers = (
+        Teacher.query.join(User, Teacher.user_id == User.id)
+        .with_entities(Teacher.id, User.first_name, User.last_name)
+        .order_by(User.last_name, User.first_name)
+        .all()
+    )
+    return render_template(
+        "schedule/index.html",
+        schedule=schedule,
+        terms=get_terms(),
+        active_version=get_active_version(),
+        teachers=teachers,
+        classrooms=Classroom.query.order_by(Classroom.name).all(),
+    )
+
+
+def _wants_json():
+    return request.accept_mimetypes.best == "application/json"
+
+
+@schedule_bp.route("/feasibility")
+def feasibility():
+    issues = feasibility_report(_configured_grid())
+    if _wants_json():
+        return {
+            "feasible": not issues,
+            "issues": [
+                {"term": f"{term[0]}-{term[1]}", **issue._asdict()} for term, issue in issues
+            ],
+        }
+    return render_template("schedule/feasibility.html", issues=issues)
+
 
+@schedule_bp.route("/students/<int:student_id>")
+def student_timetable(student_id):
+    return _render_timetable(STUDENT_TIMETABLE, student_id)
 
-@schedule_bp.route("/generate")
-def generate():
+
+@schedule_bp.route("/teachers/<int:teacher_id>")
+def teacher_timetable(teacher_id):
+    return _render_timetable(TEACHER_TIMETABLE, teacher_id)
+
+
+@schedule_bp.route("/classrooms/<int:classroom_id>")
+def classroom_timetable(classroom_id):
+    return _render_timetable(CLASSROOM_TIMETABLE, classroom_id)
+
+
+def _render_timetable(kind, owner_id):
     try:
-        delete_assigned_time_blocks()
-        generate_schedule()
-        flash("Horario generado exitosamente!.", "success")
-    except RuntimeError as e:
-        flash(f"Error generando horario: {str(e)}", "danger")
+        term = _selected_term()
+    except ValueError as e:
+        if _wants_json():
+            return {"error": str(e)}, 400
+        flash(str(e), "danger")
+        return redirect(url_for("schedule.index"))
+
+    timetable = timetable_for(kind, owner_id, term=term)
+    if timetable is None:
+        abort(404)
+    name, days = timetable
+    if _wants_json():
+        return {"kind": kind, "id": owner_id, "name": name, "timetable": days}
+    return render_template(
+        "schedule/timetable.html", label=TIMETABLE_LABELS[kind], name=name, days=days
+    )
+
+
+@schedule_bp.route("/sections/<int:section_id>/edit")
+def edit_section(section_id):
+    entry = get_schedule().get(section_id)
+    if entry is None:
+        abort(404)
+    return render_template(
+        "schedule/edit_section.html",
+        section_id=section_id,
+        entry=entry,
+        classrooms=Classroom.query.order_by(Classroom.name).all(),
+        time_blocks=_configured_grid().blocks,
+        candidates=swap_candidates(section_id),
+    )
+
+
+@schedule_bp.route("/sections/<int:section_id>/move", methods=["POST"])
+def move(section_id):
+    values = request.get_json(silent=True) or request.form
+    try:
+        move_section(
+            section_id,
+            int(values.get("classroom_id", 0)),
+            int(values.get("time_block_id", 0)),
+            _configured_grid(),
+        )
+    except (ScheduleEditError, ValueError) as e:
+        return _edit_failed(section_id, e)
+    return _edit_done(section_id, f"Sección {section_id} movida.")
+
+
+@schedule_bp.route("/sections/<int:section_id>/swap", methods=["POST"])
+def swap(section_id):
+    values = request.get_json(silent=True) or request.form
+    try:
+        swap_sections(section_id, int(values.get("other_section_id", 0)), _configured_grid())
+    except (ScheduleEditError, ValueError) as e:
+        return _edit_failed(section_id, e)
+    return _edit_done(section_id, f"Sección {section_id} intercambiada.")
+
+
+def _edit_failed(section_id, error):
+    if request.is_json or _wants_json():
+        return {"error": str(error)}, 409
+    flash(f"No se pudo editar el horario: {error}", "danger")
+    return redirect(url_for("schedule.edit_section", section_id=section_id))
+
+
+def _edit_done(section_id, message):
+    if request.is_json or _wants_json():
+        return {"section_id": section_id, "entry": get_schedule().get(section_id)}
+    flash(message, "success")
     return redirect(url_for("schedule.index"))
 
 
-@schedule_bp.route("/download")
-def download():
+@schedule_bp.route("/repair", methods=["POST"])
+def repair():
+    values = request.get_json(silent=True) or {}
     try:
-        schedule = get_schedule()
-        df = pd.DataFrame(schedule.values())
+        classroom_ids = [int(classroom_id) for classroom_id in values.get("classroom_ids", [])]
+        teacher_blocks = [
+            (int(teacher_id), int(time_block_id))
+            for teacher_id, time_block_id in values.get("teacher_blocks", [])
+        ]
+    except (TypeError, ValueError):
+        return {"error": "classroom_ids y teacher_blocks deben ser listas de ids."}, 400
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
+    result = repair_active_schedule(_configured_grid(), classroom_ids, teacher_blocks)
+    if result is None:
+        return {"error": "No hay un horario activo para reparar."}, 409
+    kanvas_db.session.commit()
+    invalidate_schedule_cache()
+    return {
+        "moved": [placement.section_id for placement in result.placements],
+        "displaced": result.displaced_section_ids,
+        "unplaced": result.unplaced_section_ids,
+    }
 
-        output.seek(0)
-        return send_file(
-            output,
-            download_name="horario.xlsx",
-            as_attachment=True,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-    except (IOError, ValueError, KeyError, TypeError) as e:
+
+@schedule_bp.route("/jobs", methods=["POST"])
+def submit_job():
+    incremental = request.values.get("incremental", type=int) == 1
+    try:
+        options = _generation_options()
+        term = _selected_term()
+    except ValueError as e:
+        if _wants_json():
+            return {"error": str(e)}, 400
+        flash(f"Error generando horario: {str(e)}", "danger")
+        return redirect(url_for("schedule.index"))
+    job_id = submit_generation_job(options, incremental=incremental, term=term)
+    if _wants_json():
+        return {"id": job_id, "status_url": url_for("schedule.job_status_json", job_id=job_id)}, 202
+    return redirect(url_for("schedule.job", job_id=job_id))
+
+
+@schedule_bp.route("/jobs/<int:job_id>")
+def job(job_id):
+    schedule_job = ScheduleJob.query.get_or_404(job_id)
+    return render_template("schedule/job.html", job=schedule_job)
+
+
+@schedule_bp.route("/jobs/<int:job_id>/status")
+def job_status_json(job_id):
+    return job_status(ScheduleJob.query.get_or_404(job_id))
+
+
+@schedule_bp.route("/jobs/<int:job_id>/cancel", methods=["POST"])
+def cancel(job_id):
+    ScheduleJob.query.get_or_404(job_id)
+    try:
+        cancel_job(job_id)
+    except ScheduleJobError as e:
+        if _wants_json():
+            return {"error": str(e)}, 409
+        flash(str(e), "danger")
+        return redirect(url_for("schedule.job", job_id=job_id))
+
+    if _wants_json():
+        return job_status(ScheduleJob.query.get_or_404(job_id)), 202
+    flash("Cancelación solicitada.", "info")
+    return redirect(url_for("schedule.job", job_id=job_id))
+
+
+@schedule_bp.route("/versions")
+def versions():
+    return render_template("schedule/versions.html", versions=list_versions())
+
+
+@schedule_bp.route("/versions/<int:version_id>/activate", methods=["POST"])
+def activate_version(version_id):
+    try:
+        rollback_to_version(version_id)
+        flash(f"Versión {version_id} activada.", "success")
+    except ScheduleVersionError as e:
+        flash(str(e), "danger")
+    return redirect(url_for("schedule.versions"))
+
+
+@schedule_bp.route("/versions/<int:version_id>/diff")
+def diff_version(version_id):
+    against_id = request.args.get("against", type=int) or get_active_version_id()
+    changes = diff_versions(against_id, version_id)
+    section_ids = {section_id for ids in changes.values() for section_id in ids}
+    sections = {
+        section.id: section for section in Section.query.filter(Section.id.in_(section_ids)).all()
+    }
+    return render_template(
+        "schedule/diff.html",
+        version_id=version_id,
+        against_id=against_id,
+        changes=changes,
+        sections=sections,
+    )
+
+
+@schedule_bp.route("/download")
+def download():
+    export_format = request.args.get("format", XLSX_FORMAT)
+    if export_format not in EXPORT_FORMATS:
+        flash(f"Error descargando horario: formato desconocido {export_format}", "danger")
+        return redirect(url_for("schedule.index"))
+    try:
+        term = _selected_term()
+    except ValueError as e:
         flash(f"Error descargando horario: {str(e)}", "danger")
         return redirect(url_for("schedule.index"))
+
+    writer, mimetype, filename = EXPORT_FORMATS[export_format]
+    rows = schedule_rows(
+        teacher_id=request.args.get("teacher_id", type=int),
+        classroom_id=request.args.get("classroom_id", type=int),
+        term=term,
+    )
+    return Response(
+        stream_with_context(writer(rows)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
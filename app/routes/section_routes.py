@@ -1,4 +1,4 @@
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
 from sqlalchemy.exc import SQLAlchemyError
 from wtforms.validators import AnyOf
 
@@ -6,14 +6,13 @@ from app.extensions import kanvas_db
 from app.forms.section_forms import SectionForm
 from app.models.course_instance import CourseInstance
 from app.models.section import Section, WeighingType
-from app.models.section_grade import SectionGrade
-from app.models.student_evaluation_instance import StudentEvaluationInstance
 from app.models.teacher import Teacher
+from app.services.batch_close import DEFAULT_CLOSE_CHUNK_SIZE, close_sections
+from app.services.grade_engine import GradeComputationError, close_section, grade_sheet
+from app.services.grade_subtotals import refresh_subtotals
 from app.services.section_service import create_section
 from app.utils.decorators import require_section_open
 
-MINIMUM_GRADE = 1.0
-
 section_bp = Blueprint("section", __name__, url_prefix="/sections")
 
 INDEX_ROUTE = "section.index"
@@ -91,6 +90,7 @@ def edit_evaluation_weights(section_id):
             evaluation.weighing = weights[evaluation.id]
 
         try:
+            refresh_subtotals([section.id])
             kanvas_db.session.commit()
             flash("Pesos de evaluaciones actualizados correctamente", "success")
             return redirect(url_for("section.show", section_id=section.id))
@@ -176,44 +176,77 @@ def delete(section_id):
     return redirect(url_for(INDEX_ROUTE))
 
 
+@section_bp.route("/close", methods=["POST"])
+def close_many():
+    wants_json = request.is_json
+    if wants_json:
+        values = request.get_json(silent=True) or {}
+        section_ids = values.get("section_ids")
+    else:
+        values = request.form
+        section_ids = request.form.getlist("section_ids") or None
+    try:
+        term, section_ids = _batch_close_selection(values.get("term"), section_ids)
+        # Grades are computed in this process: forking a pool from a web worker is unsafe.
+        result = close_sections(
+            term=term,
+            section_ids=section_ids,
+            chunk_size=current_app.config.get("SECTION_CLOSE_CHUNK_SIZE", DEFAULT_CLOSE_CHUNK_SIZE),
+        )
+    except ValueError as e:
+        if wants_json:
+            return {"error": str(e)}, 400
+        flash(str(e), "danger")
+        return redirect(url_for(INDEX_ROUTE))
+
+    if wants_json:
+        return {
+            "closed": result.closed,
+            "skipped": result.skipped,
+            "failed": {str(section_id): error for section_id, error in result.failed.items()},
+        }
+    flash(f"Secciones cerradas: {len(result.closed)}.", "success")
+    for section_id, error in result.failed.items():
+        flash(f"No se pudo cerrar la sección {section_id}: {error}", "danger")
+    return redirect(url_for(INDEX_ROUTE))
+
+
+def _batch_close_selection(term_value, section_ids):
+    """
+    The (year, semester) term and the section ids a batch close was asked for.
+
+    ``section_ids`` is a list of ids, or of comma-separated ids as form fields send them.
+    """
+    term = None
+    if term_value:
+        year, _, semester = str(term_value).partition("-")
+        if not (year.isdigit() and semester in ("1", "2")):
+            raise ValueError(f"Periodo inválido: {term_value}")
+        term = (int(year), int(semester))
+
+    if isinstance(section_ids, str):
+        section_ids = [section_ids]
+    if section_ids is not None:
+        try:
+            section_ids = [
+                int(value)
+                for item in section_ids
+                for value in str(item).split(",")
+                if value.strip()
+            ]
+        except (TypeError, ValueError) as exc:
+            raise ValueError("section_ids debe ser una lista de ids.") from exc
+    return term, section_ids
+
+
 @section_bp.route("/<int:section_id>/close", methods=["POST"])
 def close(section_id):
-    section = Section.query.get_or_404(section_id)
-    students = section.students
-    evaluations = section.evaluations
-
-    final_grades = {}
-
-    for student in students:
-        total_grade = 0.0
-        total_weighing = 0.0
-        for evaluation in evaluations:
-            evaluation_grade = 0.0
-            total_instance_weight = 0.0
-            for instance in evaluation.instances:
-                student_instance = StudentEvaluationInstance.query.filter_by(
-                    student_id=student.id, evaluation_instance_id=instance.id
-                ).first()
-
-                if student_instance and student_instance.grade is not None:
-                    evaluation_grade += student_instance.grade * instance.instance_weighing
-                    total_instance_weight += instance.instance_weighing
-                elif not instance.optional:
-                    evaluation_grade += MINIMUM_GRADE * instance.instance_weighing
-                    total_instance_weight += instance.instance_weighing
-
-            if total_instance_weight > 0:
-                evaluation_grade /= total_instance_weight
-                total_grade += evaluation_grade * evaluation.weighing
-                total_weighing += evaluation.weighing
-
-        total_grade /= total_weighing
-        grade = SectionGrade(student_id=student.id, section_id=section_id, grade=total_grade)
-        kanvas_db.session.add(grade)
-        final_grades[student.id] = total_grade
-
-    section.closed = True
-    kanvas_db.session.commit()
+    Section.query.get_or_404(section_id)
+    try:
+        close_section(section_id)
+    except GradeComputationError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("section.show", section_id=section_id))
 
     flash("La sección fue cerrada exitosamente.", "success")
     return redirect(url_for("section.grades", section_id=section_id))
@@ -222,9 +255,4 @@ def close(section_id):
 @section_bp.route("/<int:section_id>/grades", methods=["GET"])
 def grades(section_id):
     section = Section.query.get_or_404(section_id)
-    return render_template(
-        "sections/grades.html",
-        section=section,
-        StudentEvaluationInstance=StudentEvaluationInstance,
-        SectionGrade=SectionGrade,
-    )
+    return render_template("sections/grades.html", section=section, sheet=grade_sheet(section))
@@ -0,0 +1,142 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import kanvas_db
+from app.models.course_instance import CourseInstance, Semester
+from app.models.section import Section
+from app.services.grade_engine import (
+    GradeComputationError,
+    load_grade_matrices,
+    section_grade_rows,
+    write_section_grades,
+)
+
+DEFAULT_CLOSE_CHUNK_SIZE = 50
+
+BatchCloseResult = namedtuple("BatchCloseResult", ["closed", "skipped", "failed"])
+
+
+def open_section_ids(term=None, section_ids=None):
+    """
+    Ids of the open sections of a (year, semester) ``term``, or among ``section_ids``.
+    """
+    query = kanvas_db.session.query(Section.id).filter(Section.closed.isnot(True))
+    if term is not None:
+        year, semester = term
+        query = query.join(CourseInstance, CourseInstance.id == Section.course_instance_id).filter(
+            CourseInstance.year == year, CourseInstance.semester == Semester(semester)
+        )
+    if section_ids is not None:
+        query = query.filter(Section.id.in_(list(section_ids)))
+    return [section_id for (section_id,) in query.order_by(Section.id)]
+
+
+def close_sections(
+    term=None,
+    section_ids=None,
+    workers=None,
+    chunk_size=DEFAULT_CLOSE_CHUNK_SIZE,
+    progress=None,
+):
+    """
+    Close every open section of ``term`` or ``section_ids`` in one batch.
+
+    The grades of all the sections are read in one bulk fetch and the final
+    grades computed with the vectorized grade engine, in a pool of
+    ``workers`` processes when more than one is asked for; only the
+    close_term command does, since forking from a threaded web worker is
+    unsafe. SectionGrade rows
+    and closed flags are then written ``chunk_size`` sections per
+    transaction, so a failed chunk leaves the others closed.
+    ``progress(done, total)`` is called after each chunk.
+
+    Returns a BatchCloseResult with the closed ids, the requested ids that
+    were already closed or do not exist, and {section_id: error} for the
+    sections that could not be closed.
+    """
+    if term is None and section_ids is None:
+        raise ValueError("Indica un periodo o una lista de secciones para cerrar.")
+    to_close = open_section_ids(term, section_ids)
+    skipped = sorted(set(section_ids or ()) - set(to_close))
+    report = progress or _ignore_progress
+    report(0, len(to_close))
+
+    ready, failed = _compute_rows(list(load_grade_matrices(to_close).values()), workers)
+    not_graded = len(failed)
+    closed = _write_chunks(
+        ready, chunk_size, failed, lambda written: report(not_graded + written, len(to_close))
+    )
+    return BatchCloseResult(closed, skipped, failed)
+
+
+def _compute_rows(matrices, workers):
+    """
+    (section_id, SectionGrade rows) of the matrices that could be graded and {section_id: error}.
+    """
+    if workers and workers > 1 and len(matrices) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _grade_rows, matrices, chunksize=max(1, len(matrices) // (workers * 4))
+                )
+            )
+    else:
+        results = [_grade_rows(matrix) for matrix in matrices]
+
+    ready = []
+    failed = {}
+    for matrix, (rows, error) in zip(matrices, results):
+        if error is None:
+            ready.append((matrix.section_id, rows))
+        else:
+            failed[matrix.section_id] = error
+    return ready, failed
+
+
+def _write_chunks(ready, chunk_size, failed, progress):
+    """
+    Write ``ready`` ``chunk_size`` sections per transaction and return the ids closed.
+
+    Sections of a failed chunk are added to ``failed``; ``progress(written)``
+    is called after each chunk with the number of sections processed.
+    """
+    closed = []
+    for start in range(0, len(ready), chunk_size):
+        chunk = ready[start : start + chunk_size]
+        chunk_ids = [section_id for section_id, _rows in chunk]
+        error = _write_chunk(chunk)
+        if error is None:
+            closed.extend(chunk_ids)
+        else:
+            failed.update({section_id: error for section_id in chunk_ids})
+        progress(start + len(chunk))
+    return closed
+
+
+def _write_chunk(chunk):
+    """
+    Write the (section_id, rows) pairs of ``chunk`` in one transaction; the error, if it failed.
+    """
+    try:
+        write_section_grades(
+            [section_id for section_id, _rows in chunk],
+            [row for _section_id, rows in chunk for row in rows],
+        )
+        kanvas_db.session.commit()
+    except SQLAlchemyError as e:
+        kanvas_db.session.rollback()
+        return str(e)
+    return None
+
+
+def _grade_rows(matrix):
+    try:
+        return section_grade_rows(matrix), None
+    except GradeComputationError as e:
+        return None, str(e)
+
+
+def _ignore_progress(_done, _total):
+    pass
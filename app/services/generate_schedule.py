@@ -1,23 +1,44 @@
-from collections import defaultdict
-from datetime import datetime, timedelta
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.extensions import kanvas_db
 from app.models.assigned_time_block import AssignedTimeBlock
 from app.models.classroom import Classroom
 from app.models.course import Course
 from app.models.course_instance import CourseInstance
+from app.models.schedule_version import ScheduleVersion
 from app.models.section import Section
-from app.models.student import Student
-from app.models.student_section import StudentSection
 from app.models.time_block import TimeBlock
-
-DAYS = {
-    1: "Lunes",
-    2: "Martes",
-    3: "Miércoles",
-    4: "Jueves",
-    5: "Viernes",
-}
+from app.services.schedule_engine import ScheduleEngine, ScheduleSnapshot
+from app.services.schedule_feasibility import check_feasibility, explain_unplaced
+from app.services.schedule_grid import WEEKDAYS, TimeGrid
+from app.services.schedule_incremental import split_assignments
+from app.services.schedule_local_search import AnnealingConfig, improve_schedule
+from app.services.schedule_metrics import RunReport, SolveStats
+from app.services.schedule_multistart import DEFAULT_ATTEMPTS, MultistartOptions, run_multistart
+from app.services.schedule_quality import score_terms
+from app.services.schedule_solver import DEFAULT_TIME_BUDGET, BacktrackingSolver
+from app.services.schedule_versions import (
+    DEFAULT_VERSIONS_KEPT,
+    activate_version,
+    copy_version_rows,
+    create_version,
+    get_active_version_id,
+    mark_version_failed,
+    prune_versions,
+    record_version_report,
+    record_version_score,
+    version_rows,
+)
+from app.utils.bulk_sql import insert_rows, upsert_rows
+
+SATURDAY = 6
+
+DAYS = {day: name for day, name in WEEKDAYS.items() if day != SATURDAY}
 
 MORNING_START = 9
 MORNING_END = 13
@@ -27,311 +48,560 @@ AFTERNOON_END = 18
 
 BLOCK_DURATION = 60
 
+GREEDY_MODE = "greedy"
+BACKTRACKING_MODE = "backtracking"
+MULTISTART_MODE = "multistart"
+
+LOAD_PHASE = "load"
+SOLVE_PHASE = "solve"
+SORT_PHASE = "sort"
+PLACE_PHASE = "place"
+IMPROVE_PHASE = "improve"
+PERSIST_PHASE = "persist"
+
+GenerationOptions = namedtuple(
+    "GenerationOptions",
+    [
+        "mode",
+        "fallback",
+        "time_budget",
+        "attempts",
+        "workers",
+        "term_workers",
+        "improve_time_budget",
+        "versions_kept",
+        "grid",
+    ],
+    defaults=(
+        GREEDY_MODE,
+        False,
+        None,
+        DEFAULT_ATTEMPTS,
+        None,
+        None,
+        None,
+        DEFAULT_VERSIONS_KEPT,
+        None,
+    ),
+)
+GenerationOptions.__doc__ = """
+Settings of a generate_schedule run; see its docstring for what each one does.
+"""
+
+# Which rows of the active version a run copies into its new version: all of
+# them but those of the re-solved terms and of the stale sections.
+_KeptRows = namedtuple("_KeptRows", ["version_id", "skipped_terms", "skipped_section_ids"])
+
+_schedule_cache = {}
+_schedule_cache_lock = threading.Lock()
+
 
 class ScheduleAssignmentError(Exception):
     pass
 
 
-def delete_assigned_time_blocks():
+class ScheduleInfeasibleError(ScheduleAssignmentError):
     """
-    Delete all assigned time blocks from the database.
+    Raised before solving when the data breaks a necessary condition; ``issues`` says which.
     """
-    kanvas_db.session.query(AssignedTimeBlock).delete()
-    kanvas_db.session.commit()
+
+    def __init__(self, issues):
+        self.issues = issues
+        super().__init__(
+            "El horario no es factible: "
+            + "; ".join(f"Periodo {term[0]}-{term[1]}: {issue.message}" for term, issue in issues)
+        )
+
+
+class ScheduleGenerationCancelled(Exception):
+    pass
 
 
-def _create_block_range(start_hour, end_hour, duration):
+def build_time_grid(block_duration=BLOCK_DURATION, saturday=False):
     """
-    Create time blocks between given start and end hours, for each weekday.
+    The TimeGrid for the configured days, morning and afternoon sessions and block length.
     """
-    for hour in range(start_hour, end_hour):
-        for day_num, day_name in DAYS.items():
-            block_id = (hour - 1) * len(DAYS) + day_num
-            time_block = TimeBlock.query.filter_by(id=block_id).first()
-
-            start = datetime.strptime(f"{hour:02d}:00", "%H:%M")
-            stop = start + timedelta(minutes=duration)
+    days = dict(DAYS)
+    if saturday:
+        days[SATURDAY] = WEEKDAYS[SATURDAY]
+    sessions = ((MORNING_START, MORNING_END), (AFTERNOON_START, AFTERNOON_END))
+    return TimeGrid.build(days, sessions, block_duration)
 
-            if not time_block:
-                time_block = TimeBlock(
-                    id=block_id,
-                    start_time=start.strftime("%H:%M"),
-                    stop_time=stop.strftime("%H:%M"),
-                    weekday=day_name,
-                )
-            else:
-                time_block.start_time = start.strftime("%H:%M")
-                time_block.stop_time = stop.strftime("%H:%M")
-                time_block.weekday = day_name
 
-            kanvas_db.session.add(time_block)
+def configured_time_grid(config):
+    """
+    build_time_grid with the SCHEDULE_BLOCK_DURATION and SCHEDULE_SATURDAY settings of ``config``.
+    """
+    return build_time_grid(
+        block_duration=config.get("SCHEDULE_BLOCK_DURATION", BLOCK_DURATION),
+        saturday=config.get("SCHEDULE_SATURDAY", False),
+    )
 
 
-def _create_time_blocks():
+def _create_time_blocks(grid):
     """
-    Create all time blocks for morning and afternoon sessions.
+    Create or update the time blocks of the grid in one upsert.
     """
-    _create_block_range(MORNING_START, MORNING_END, BLOCK_DURATION)
-    _create_block_range(AFTERNOON_START, AFTERNOON_END, BLOCK_DURATION)
+    upsert_rows(TimeBlock, grid.rows(), ["id"], ["start_time", "stop_time", "weekday"])
     kanvas_db.session.commit()
 
 
-def generate_schedule():
+def generate_schedule(options=None, incremental=False, term=None, progress=None, run_report=None):
     """
     Generate the schedule by assigning sections to classrooms and time blocks.
+
+    ``options`` is a GenerationOptions. Its ``mode`` selects the greedy
+    scheduler, the backtracking solver or the parallel multi-start greedy.
+    With ``fallback`` a failure is retried with the solver. ``time_budget``
+    (seconds) bounds the selected mode, and ``attempts`` / ``workers`` size
+    the multi-start.
+
+    Every run writes a new schedule version and only activates it once all
+    its rows are in, in the same transaction, so readers never see a partial
+    schedule. With ``incremental`` the still valid assignments of the active
+    version are copied over and only new or invalidated sections are placed
+    around them. The kept rows are copied inside the database with one
+    INSERT ... SELECT; the active assignments of the solved terms are still
+    read once, to check which ones are still valid and which blocks they
+    take. The ``versions_kept`` newest versions are kept for rollback.
+
+    Sections of different (year, semester) terms never conflict, so each term
+    is solved on its own, in up to ``term_workers`` processes. With ``term``
+    only that (year, semester) is scheduled and the other terms keep their
+    current assignments.
+
+    ``grid`` is the TimeGrid to schedule on, by default the one built from
+    DAYS, the morning and afternoon sessions and BLOCK_DURATION.
+
+    With ``improve_time_budget`` (seconds per term) every solved term goes
+    through the local search of improve_schedule to cut student idle gaps,
+    teacher days and empty seats. The ScheduleQuality score of the resulting
+    schedule is stored on its version either way, next to the RunReport of the
+    run: time and SQL statements per phase, candidate windows evaluated per
+    section and rejected windows by reason.
+
+    ``progress(phase, placed, total)`` is called as the run advances; it may
+    raise ScheduleGenerationCancelled to abort, and is never called while rows
+    of the new version are pending. ``run_report`` is the RunReport the run
+    fills, for callers such as the benchmark that read it back; a new one by
+    default. Returns the new placements.
     """
-    _create_time_blocks()
-
-    sections = (
-        kanvas_db.session.query(Section)
-        .join(CourseInstance)
-        .join(Course)
-        .outerjoin(StudentSection)
-        .group_by(Section.id)
-        .order_by(
-            kanvas_db.func.count(StudentSection.student_id).desc(),
-            Course.credits.desc(),
-        )
-        .all()
-    )
+    options = options or GenerationOptions()
+    if options.mode not in SCHEDULE_MODES:
+        raise ValueError(f"Modo de generación desconocido: {options.mode}")
+
+    report = progress or _ignore_progress
+    run_report = run_report or RunReport(kanvas_db.engine)
+    with run_report:
+        with run_report.phase(LOAD_PHASE):
+            report(LOAD_PHASE, 0, 0)
+            options = options._replace(grid=options.grid or build_time_grid())
+            _create_time_blocks(options.grid)
+            snapshot, terms, carried_rows, kept_rows = _load_terms(options.grid, incremental, term)
+            version_id = create_version()
+        try:
+            issues = _feasibility_issues(terms, options.grid)
+            if issues:
+                raise ScheduleInfeasibleError(issues)
+            placements, stats = _solve_terms(terms, options, report)
+            run_report.add_solve_stats(stats, [SORT_PHASE, PLACE_PHASE, IMPROVE_PHASE])
+
+            total = sum(len(term_snapshot.sections) for term_snapshot in terms.values())
+            report(PERSIST_PHASE, total, total)
+            with run_report.phase(PERSIST_PHASE):
+                snapshot.assignments = carried_rows + [
+                    row for term_snapshot in terms.values() for row in term_snapshot.assignments
+                ]
+                _persist_version(version_id, snapshot, options.grid, placements, kept_rows)
+            record_version_report(version_id, run_report.as_dict())
+            activate_version(version_id)
+            kanvas_db.session.commit()
+            invalidate_schedule_cache()
+        except (ScheduleAssignmentError, ScheduleGenerationCancelled, SQLAlchemyError):
+            kanvas_db.session.rollback()
+            mark_version_failed(version_id)
+            raise
+
+    prune_versions(options.versions_kept)
+    return placements
+
+
+def _load_terms(grid, incremental, term):
+    """
+    The snapshot of the run, its term snapshots to solve and the rows of the terms left alone.
 
-    classrooms = kanvas_db.session.query(Classroom).all()
-    time_blocks = kanvas_db.session.query(TimeBlock).order_by(TimeBlock.id).all()
+    Term snapshots keep the active assignments still valid with
+    ``incremental``, and none otherwise. Also returns the _KeptRows to copy
+    from the active version, or None when nothing is kept.
+    """
+    keeps_assignments = incremental or term is not None
+    active_version_id = get_active_version_id() if keeps_assignments else None
+    snapshot = ScheduleSnapshot.load(active_version_id, time_blocks=grid.blocks)
+
+    terms = snapshot.split_by_term()
+    carried_rows = []
+    if term is not None:
+        if term not in terms:
+            raise ValueError(f"No hay secciones en el periodo {term[0]}-{term[1]}")
+        carried_rows = [
+            row
+            for other_term, term_snapshot in terms.items()
+            if other_term != term
+            for row in term_snapshot.assignments
+        ]
+        terms = {term: terms[term]}
+    stale_section_ids = set()
+    for term_snapshot in terms.values():
+        if incremental:
+            term_snapshot.assignments, stale = split_assignments(term_snapshot, grid)
+            stale_section_ids |= stale
+        else:
+            term_snapshot.assignments = []
 
-    for section in sections:
-        if _assign_section_if_possible(section, classrooms, time_blocks):
-            continue
-        raise ScheduleAssignmentError(f"No se pudo asignar la sección {section.id}")
+    kept_rows = None
+    if active_version_id is not None:
+        kept_rows = _KeptRows(
+            active_version_id, () if incremental else list(terms), stale_section_ids
+        )
+    return snapshot, terms, carried_rows, kept_rows
 
-    kanvas_db.session.commit()
 
+def _persist_version(version_id, snapshot, grid, placements, kept_rows):
+    """
+    Copy the ``kept_rows`` and insert the new placements, and score them with ``snapshot``.
+    """
+    terms_by_section = {section.id: section.term for section in snapshot.sections}
+    if kept_rows is not None:
+        copy_version_rows(
+            kept_rows.version_id,
+            version_id,
+            kept_rows.skipped_terms,
+            kept_rows.skipped_section_ids,
+        )
+    _assign_blocks(placements, version_id, terms_by_section)
+    record_version_score(version_id, score_terms(snapshot, grid, placements))
 
-def _group_blocks_by_day(time_blocks):
-    blocks_by_day = defaultdict(list)
-    for tb in time_blocks:
-        blocks_by_day[tb.weekday].append(tb)
-    for blocks in blocks_by_day.values():
-        blocks.sort(key=lambda b: b.start_time)
-    return blocks_by_day
-
-
-def _get_contiguous_sequences(blocks):
-    sequences = []
-    if not blocks:
-        return sequences
-    current_sequence = [blocks[0]]
-    for block in blocks[1:]:
-        prev_end = current_sequence[-1].stop_time
-        current_start = block.start_time
-        if current_start == prev_end:
-            current_sequence.append(block)
-        else:
-            sequences.append(current_sequence)
-            current_sequence = [block]
-    if current_sequence:
-        sequences.append(current_sequence)
-    return sequences
 
+def feasibility_report(grid=None):
+    """
+    The (term, FeasibilityIssue) pairs that rule out a schedule, without generating one.
+    """
+    grid = grid or build_time_grid()
+    snapshot = ScheduleSnapshot.load(time_blocks=grid.blocks)
+    return _feasibility_issues(snapshot.split_by_term(), grid)
 
-def _assign_section_if_possible(section, classrooms, time_blocks):
-    required_blocks = section.course_instance.course.credits
-    blocks_by_day = _group_blocks_by_day(time_blocks)
 
-    for day, blocks in blocks_by_day.items():
-        sequences = _get_contiguous_sequences(blocks)
-        if _try_assign_from_sequences(section, classrooms, sequences, required_blocks, day):
-            return True
+def _feasibility_issues(terms, grid):
+    return [
+        (term, issue)
+        for term, term_snapshot in terms.items()
+        for issue in check_feasibility(term_snapshot, grid)
+    ]
 
-    return False
 
+def _solve_terms(terms, options, progress):
+    """
+    Solve and improve every term snapshot, one after the other or in a process pool.
 
-def _try_assign_from_sequences(section, classrooms, sequences, required_blocks, day):
-    for sequence in sequences:
-        if len(sequence) < required_blocks:
-            continue
+    Returns the placements of all terms, in term order, and their merged SolveStats.
+    """
+    term_workers = min(options.term_workers or os.cpu_count() or 1, len(terms))
+    if term_workers <= 1:
+        results = _solve_terms_in_order(terms, options, progress)
+    else:
+        results = _solve_terms_in_pool(terms, options._replace(workers=1), term_workers, progress)
 
-        if _try_assign_from_sequence(section, classrooms, sequence, required_blocks, day):
-            return True
+    stats = SolveStats()
+    for _placements, term_stats in results.values():
+        stats.merge(term_stats)
+    placements = [placement for term in terms for placement in results[term][0]]
+    return placements, stats
 
-    return False
 
+def _solve_terms_in_order(terms, options, progress):
+    total = sum(len(term_snapshot.sections) for term_snapshot in terms.values())
+    results = {}
+    solved = 0
+    for term, term_snapshot in terms.items():
 
-def _try_assign_from_sequence(section, classrooms, sequence, required_blocks, day):
-    for i in range(len(sequence) - required_blocks + 1):
-        candidate_time_blocks = sequence[i : i + required_blocks]
+        def term_progress(phase, placed, _total, offset=solved):
+            progress(phase, offset + placed, total)
 
-        for classroom in classrooms:
-            if _is_valid_assignment(section, classroom.id, candidate_time_blocks):
-                _assign_blocks(section.id, classroom.id, candidate_time_blocks)
-                print(
-                    f"Sección {section.id} asignada en sala {classroom.name}, "
-                    f"{day}, bloques {[tb.id for tb in candidate_time_blocks]}"
-                )
-                return True
-    return False
+        results[term] = _solve_term(term, term_snapshot, options, term_progress)
+        solved += len(term_snapshot.sections)
+    return results
 
 
-def _is_valid_assignment(section, classroom_id, time_blocks):
+def _solve_terms_in_pool(terms, options, term_workers, progress):
     """
-    Check if the assignment of a section to a classroom and time blocks is valid.
-    """
-    classroom = _get_classroom(classroom_id)
-    num_students = _get_student_count(section.id)
-
-    has_enough_capacity = _has_capacity(classroom, num_students)
-    blocks_available = not _are_blocks_taken(classroom_id, time_blocks)
-    teacher_free = not _has_schedule_conflict(section.teacher_id, time_blocks)
-    students_free = not _students_have_conflict(section.id, time_blocks)
+    {term: (placements, SolveStats)} solved in ``term_workers`` processes.
 
-    return has_enough_capacity and blocks_available and teacher_free and students_free
-
-
-def _get_classroom(classroom_id):
+    On failure the pool is shut down without waiting for the terms still being solved.
+    """
+    total = sum(len(term_snapshot.sections) for term_snapshot in terms.values())
+    progress(SOLVE_PHASE, 0, total)
+    results = {}
+    solved = 0
+    executor = ProcessPoolExecutor(max_workers=term_workers)
+    try:
+        futures = {
+            executor.submit(_solve_term, term, term_snapshot, options): term
+            for term, term_snapshot in terms.items()
+        }
+        for future in as_completed(futures):
+            term = futures[future]
+            results[term] = future.result()
+            solved += len(terms[term].sections)
+            progress(SOLVE_PHASE, solved, total)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _solve_term(term, snapshot, options, progress=None):
     """
-    Retrieve a classroom by its ID.
+    Placements of one term and the SolveStats of sorting, placing and improving them.
     """
-    return kanvas_db.session.query(Classroom).filter_by(id=classroom_id).first()
+    progress = progress or _ignore_progress
+    stats = SolveStats()
+    with stats.timed(SORT_PHASE):
+        sections = snapshot.sections_in_greedy_order()
+    try:
+        with stats.timed(PLACE_PHASE):
+            try:
+                placements = SCHEDULE_MODES[options.mode](
+                    snapshot, options, sections, stats, progress
+                )
+            except ScheduleAssignmentError:
+                if options.mode == BACKTRACKING_MODE or not options.fallback:
+                    raise
+                placements = _solve_backtracking(snapshot, options, sections, stats, progress)
+    except ScheduleAssignmentError as e:
+        raise ScheduleAssignmentError(f"Periodo {term[0]}-{term[1]}: {e}") from e
+
+    if not options.improve_time_budget:
+        return placements, stats
+    total = len(snapshot.sections)
+    progress(IMPROVE_PHASE, total, total)
+    with stats.timed(IMPROVE_PHASE):
+        placements = improve_schedule(
+            snapshot,
+            options.grid,
+            placements,
+            AnnealingConfig(time_budget=options.improve_time_budget),
+        )
+    return placements, stats
 
 
-def _get_student_count(section_id):
-    """
-    Return the number of students enrolled in a given section.
-    """
-    return kanvas_db.session.query(StudentSection).filter_by(section_id=section_id).count()
+def _ignore_progress(_phase, _placed, _total):
+    pass
 
 
-def _has_capacity(classroom, num_students):
-    """
-    Check if the classroom has enough capacity for the number of students.
-    """
-    return classroom.capacity >= num_students
+def _solve_greedy(snapshot, options, sections=None, stats=None, progress=_ignore_progress):
+    engine = ScheduleEngine(snapshot, options.grid, stats)
+    if sections is None:
+        sections = snapshot.sections_in_greedy_order()
+    total = len(snapshot.sections)
+    already_placed = total - len(sections)
+    progress(SOLVE_PHASE, already_placed, total)
+    for count, section in enumerate(sections, start=1):
+        if engine.place(section) is None:
+            raise ScheduleAssignmentError(
+                f"No se pudo asignar la sección {section.id}: {explain_unplaced(engine, section)}"
+            )
+        progress(SOLVE_PHASE, already_placed + count, total)
+    return engine.placements
+
+
+def _solve_backtracking(snapshot, options, sections=None, stats=None, progress=_ignore_progress):
+    if sections is None:
+        sections = snapshot.sections_in_greedy_order()
+    total = len(snapshot.sections)
+    already_placed = total - len(sections)
+    progress(SOLVE_PHASE, already_placed, total)
+
+    engine = ScheduleEngine(snapshot, options.grid, stats)
+    solver = BacktrackingSolver(
+        engine,
+        time_budget=options.time_budget or DEFAULT_TIME_BUDGET,
+        on_progress=lambda placed: progress(SOLVE_PHASE, already_placed + placed, total),
+    )
+    if not solver.solve(sections):
+        raise ScheduleAssignmentError(
+            f"No se encontró un horario factible ({solver.backtracks} retrocesos)."
+            f"{_greedy_failure(snapshot, options)}"
+        )
+    return engine.placements
 
 
-def _assign_blocks(section_id, classroom_id, time_blocks):
+def _greedy_failure(snapshot, options):
     """
-    Assign given time blocks to a section in a specific classroom.
+    The greedy pass's failure, which names a section and the constraint that blocked it.
     """
-    for time_block in time_blocks:
-        assignment = AssignedTimeBlock(
-            section_id=section_id,
-            classroom_id=classroom_id,
-            time_block_id=time_block.id,
-        )
-        kanvas_db.session.add(assignment)
+    try:
+        _solve_greedy(snapshot, options)
+    except ScheduleAssignmentError as e:
+        return f" En orden voraz: {e}"
+    return ""
+
+
+def _solve_multistart(snapshot, options, _sections=None, stats=None, progress=_ignore_progress):
+    total = len(snapshot.sections)
+    already_placed = total - len(snapshot.sections_in_greedy_order())
+    progress(SOLVE_PHASE, already_placed, total)
+    result = run_multistart(
+        snapshot,
+        options.grid,
+        MultistartOptions(options.attempts, options.workers, options.time_budget),
+        on_result=lambda best: progress(SOLVE_PHASE, already_placed + len(best.placements), total),
+    )
+    if result is None:
+        raise ScheduleAssignmentError("Se agotó el tiempo antes de completar un intento.")
+    if stats is not None:
+        stats.merge(result.stats)
+    if result.unplaced:
+        raise ScheduleAssignmentError(_multistart_failure(snapshot, options.grid, result))
+    return result.placements
 
 
-def _are_blocks_taken(classroom_id, time_blocks):
+def _multistart_failure(snapshot, grid, result):
     """
-    Check if any of the given time blocks are already taken in the classroom.
+    The message of a multi-start whose best attempt left ``result.unplaced`` sections out.
     """
-    time_block_ids = [tb.id for tb in time_blocks]
-    assigned = (
-        kanvas_db.session.query(AssignedTimeBlock)
-        .filter(
-            AssignedTimeBlock.classroom_id == classroom_id,
-            AssignedTimeBlock.time_block_id.in_(time_block_ids),
+    sections = {section.id: section for section in snapshot.sections}
+    engine = ScheduleEngine(snapshot, grid)
+    for placement in result.placements:
+        engine.assign(
+            sections[placement.section_id],
+            placement.classroom_id,
+            placement.day,
+            placement.block_ids,
+            engine.mask_of(placement.block_ids),
         )
-        .first()
+    first = sections[result.unplaced[0]]
+    return (
+        f"No se pudieron asignar {len(result.unplaced)} secciones "
+        f"(primera: {first.id}, {explain_unplaced(engine, first)})"
     )
-    return assigned is not None
 
 
-def _has_schedule_conflict(teacher_id, time_blocks):
-    """
-    Check if the teacher has a scheduling conflict with the given time blocks.
-    """
-    time_block_ids = [tb.id for tb in time_blocks]
-    return _teacher_has_assigned_blocks(teacher_id, time_block_ids)
+SCHEDULE_MODES = {
+    GREEDY_MODE: _solve_greedy,
+    BACKTRACKING_MODE: _solve_backtracking,
+    MULTISTART_MODE: _solve_multistart,
+}
 
 
-def _teacher_has_assigned_blocks(teacher_id, time_block_ids):
+def _assign_blocks(placements, version_id, terms):
     """
-    Check if a teacher has been assigned any of the specified time blocks.
+    Insert the time blocks of every placement in a single multi-row insert.
     """
-    assigned = (
-        kanvas_db.session.query(AssignedTimeBlock)
-        .join(Section)
-        .filter(
-            Section.teacher_id == teacher_id,
-            AssignedTimeBlock.time_block_id.in_(time_block_ids),
-        )
-        .first()
+    insert_rows(
+        AssignedTimeBlock,
+        version_rows(
+            version_id,
+            (
+                (placement.section_id, placement.classroom_id, time_block_id)
+                for placement in placements
+                for time_block_id in placement.block_ids
+            ),
+            terms,
+        ),
     )
-    return assigned is not None
 
 
-def _students_have_conflict(section_id, time_blocks):
+def get_terms():
     """
-    Check if any student in the section has a scheduling conflict with the given time blocks.
+    Return the (year, semester) terms that have sections, oldest first.
     """
-    student_ids = _get_student_ids_from_section(section_id)
-    time_block_ids = [tb.id for tb in time_blocks]
+    return [
+        (year, semester.value)
+        for year, semester in kanvas_db.session.query(CourseInstance.year, CourseInstance.semester)
+        .join(Section, Section.course_instance_id == CourseInstance.id)
+        .distinct()
+        .order_by(CourseInstance.year, CourseInstance.semester)
+    ]
 
-    return _has_conflict_with_time_blocks(student_ids, time_block_ids)
 
-
-def _get_student_ids_from_section(section_id):
-    """
-    Retrieve a list of student IDs enrolled in a specific section.
+def get_schedule():
     """
-    student_id_tuples = (
-        kanvas_db.session.query(Student.id)
-        .join(StudentSection)
-        .filter(StudentSection.section_id == section_id)
-        .all()
-    )
-    return [sid for (sid,) in student_id_tuples]
-
+    The active schedule as {section_id: entry}, ordered by start time.
 
-def _has_conflict_with_time_blocks(student_ids, time_block_ids):
+    The schedule is built once per activated or edited version and cached in
+    the process; each call costs one query to find the active version. The
+    cached dict is shared, so callers must not modify it.
     """
-    Check if any of the students have already been assigned the given time blocks.
-    """
-    assigned = (
-        kanvas_db.session.query(AssignedTimeBlock)
-        .join(Section)
-        .join(StudentSection)
-        .filter(
-            StudentSection.student_id.in_(student_ids),
-            AssignedTimeBlock.time_block_id.in_(time_block_ids),
+    active = (
+        kanvas_db.session.query(
+            ScheduleVersion.id, ScheduleVersion.activated_at, ScheduleVersion.edited_at
         )
+        .filter(ScheduleVersion.is_active.is_(True))
         .first()
     )
-    return assigned is not None
+    key = tuple(active) if active else None
+    with _schedule_cache_lock:
+        if key in _schedule_cache:
+            return _schedule_cache[key]
 
+    schedule = _build_clean_schedule(_fetch_assigned_time_blocks(key[0] if key else None))
+    with _schedule_cache_lock:
+        _schedule_cache.clear()
+        _schedule_cache[key] = schedule
+    return schedule
 
-def get_schedule():
-    raw_schedule = _fetch_assigned_time_blocks()
-    return _build_clean_schedule(raw_schedule)
+
+def invalidate_schedule_cache():
+    """
+    Drop the cached schedule, for changes made to a version after it was activated.
+    """
+    with _schedule_cache_lock:
+        _schedule_cache.clear()
 
 
-def _fetch_assigned_time_blocks():
+def _fetch_assigned_time_blocks(version_id):
+    """
+    Every assigned block of ``version_id`` with the fields of its entry, in one query.
+    """
     return (
-        kanvas_db.session.query(AssignedTimeBlock)
+        kanvas_db.session.query(
+            AssignedTimeBlock.section_id,
+            Course.title.label("course_title"),
+            Course.code.label("course_code"),
+            Section.code.label("section_code"),
+            Classroom.name.label("classroom"),
+            TimeBlock.weekday,
+            TimeBlock.start_time,
+            TimeBlock.stop_time,
+        )
+        .join(Section, Section.id == AssignedTimeBlock.section_id)
+        .join(CourseInstance, CourseInstance.id == Section.course_instance_id)
+        .join(Course, Course.id == CourseInstance.course_id)
+        .join(Classroom, Classroom.id == AssignedTimeBlock.classroom_id)
         .join(TimeBlock, TimeBlock.id == AssignedTimeBlock.time_block_id)
-        .order_by(TimeBlock.start_time)
+        .filter(AssignedTimeBlock.version_id == version_id)
+        .order_by(TimeBlock.start_time, AssignedTimeBlock.section_id)
         .all()
     )
 
 
-def _build_clean_schedule(schedule):
+def _build_clean_schedule(rows):
     clean_schedule = {}
-    for entry in schedule:
-        section_id = entry.section_id
+    for row in rows:
+        section_id = row.section_id
         if section_id not in clean_schedule:
-            clean_schedule[section_id] = _build_schedule_entry(entry)
+            clean_schedule[section_id] = _build_schedule_entry(row)
         else:
-            clean_schedule[section_id]["stop_time"] = entry.time_block.stop_time.strftime("%H:%M")
+            clean_schedule[section_id]["stop_time"] = row.stop_time.strftime("%H:%M")
     return clean_schedule
 
 
-def _build_schedule_entry(entry):
+def _build_schedule_entry(row):
     return {
-        "course_title": entry.section.course_instance.course.title,
-        "course_code": entry.section.course_instance.course.code,
-        "section_code": entry.section.code,
-        "classroom": entry.classroom.name,
-        "weekday": entry.time_block.weekday,
-        "start_time": entry.time_block.start_time.strftime("%H:%M"),
-        "stop_time": entry.time_block.stop_time.strftime("%H:%M"),
+        "course_title": row.course_title,
+        "course_code": row.course_code,
+        "section_code": row.section_code,
+        "classroom": row.classroom,
+        "weekday": row.weekday,
+        "start_time": row.start_time.strftime("%H:%M"),
+        "stop_time": row.stop_time.strftime("%H:%M"),
     }
@@ -0,0 +1,403 @@
+from collections import defaultdict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from app.extensions import kanvas_db
+from app.models.evaluation import Evaluation
+from app.models.evaluation_instance import EvaluationInstance
+from app.models.section import Section
+from app.models.section_grade import SectionGrade
+from app.models.student import Student
+from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.models.student_evaluation_subtotal import StudentEvaluationSubtotal
+from app.models.student_section import StudentSection
+from app.models.student_section_subtotal import StudentSectionSubtotal
+from app.models.user import User
+from app.utils.bulk_sql import insert_rows
+
+MINIMUM_GRADE = 1.0
+
+EvaluationColumn = namedtuple("EvaluationColumn", ["id", "title", "weighing"])
+InstanceColumn = namedtuple(
+    "InstanceColumn", ["id", "evaluation_id", "title", "weighing", "optional"]
+)
+GradeMatrix = namedtuple(
+    "GradeMatrix", ["section_id", "student_ids", "evaluations", "instances", "grades"]
+)
+GradeMatrix.__doc__ = """
+One section's grades as a dense students x instances array.
+
+``grades[i, j]`` is the grade of ``student_ids[i]`` in ``instances[j]``, NaN
+when there is no grade. Evaluations and their instances are in id order.
+"""
+GradeSubtotals = namedtuple(
+    "GradeSubtotals", ["evaluation_sums", "evaluation_weights", "final_sums", "final_weights"]
+)
+ComputedGrades = namedtuple("ComputedGrades", ["evaluation_grades", "final_grades"])
+SheetEvaluation = namedtuple("SheetEvaluation", ["title", "weighing", "instances"])
+SheetRow = namedtuple("SheetRow", ["student_id", "name", "evaluations", "final_grade"])
+GradeSheet = namedtuple("GradeSheet", ["evaluations", "rows"])
+
+
+class GradeComputationError(Exception):
+    pass
+
+
+def load_grade_matrices(section_ids, student_ids=None, lock=False):
+    """
+    {section_id: GradeMatrix} for ``section_ids``, in three queries whatever their size.
+
+    Only enrolled students get a row; grades of students who left the
+    section are ignored, as the per-student close loop always did.
+    ``student_ids`` limits the rows to those students. With ``lock`` their
+    StudentSection rows are locked until the transaction ends, so concurrent
+    writers recomputing the same students wait for each other.
+    """
+    section_ids = list(section_ids)
+    if student_ids is not None:
+        student_ids = list(student_ids)
+    rows_by_section = _load_enrollments(section_ids, student_ids, lock)
+    evaluations, instances = _load_columns(section_ids)
+    grades_by_section = _load_grades(section_ids, student_ids)
+
+    return {
+        section_id: GradeMatrix(
+            section_id,
+            rows_by_section[section_id],
+            evaluations[section_id],
+            instances[section_id],
+            _pivot_grades(
+                grades_by_section.get(section_id),
+                rows_by_section[section_id],
+                [instance.id for instance in instances[section_id]],
+            ),
+        )
+        for section_id in section_ids
+    }
+
+
+def _load_enrollments(section_ids, student_ids, lock):
+    """
+    {section_id: [student_id]} of the enrolled students, in id order.
+    """
+    enrollments = kanvas_db.session.query(
+        StudentSection.section_id, StudentSection.student_id
+    ).filter(StudentSection.section_id.in_(section_ids))
+    if student_ids is not None:
+        enrollments = enrollments.filter(StudentSection.student_id.in_(student_ids))
+    if lock:
+        enrollments = enrollments.with_for_update()
+
+    rows_by_section = defaultdict(list)
+    for section_id, student_id in enrollments.order_by(
+        StudentSection.section_id, StudentSection.student_id
+    ):
+        rows_by_section[section_id].append(student_id)
+    return rows_by_section
+
+
+def _load_columns(section_ids):
+    """
+    The EvaluationColumns and InstanceColumns of every section, in id order.
+    """
+    evaluations = defaultdict(list)
+    instances = defaultdict(list)
+    for row in (
+        kanvas_db.session.query(
+            Evaluation.section_id,
+            Evaluation.id,
+            Evaluation.title,
+            Evaluation.weighing,
+            EvaluationInstance.id,
+            EvaluationInstance.title,
+            EvaluationInstance.instance_weighing,
+            EvaluationInstance.optional,
+        )
+        .outerjoin(EvaluationInstance, EvaluationInstance.evaluation_id == Evaluation.id)
+        .filter(Evaluation.section_id.in_(section_ids))
+        .order_by(Evaluation.section_id, Evaluation.id, EvaluationInstance.id)
+    ):
+        section_id, evaluation_id, title, weighing, instance_id, *instance = row
+        if not evaluations[section_id] or evaluations[section_id][-1].id != evaluation_id:
+            evaluations[section_id].append(EvaluationColumn(evaluation_id, title, weighing))
+        if instance_id is not None:
+            instances[section_id].append(InstanceColumn(instance_id, evaluation_id, *instance))
+    return evaluations, instances
+
+
+def _load_grades(section_ids, student_ids):
+    """
+    {section_id: DataFrame of student_id, instance_id and grade} of the sections with grades.
+    """
+    grade_rows = (
+        kanvas_db.session.query(
+            Evaluation.section_id,
+            StudentEvaluationInstance.student_id,
+            StudentEvaluationInstance.evaluation_instance_id,
+            StudentEvaluationInstance.grade,
+        )
+        .join(
+            EvaluationInstance,
+            EvaluationInstance.id == StudentEvaluationInstance.evaluation_instance_id,
+        )
+        .join(Evaluation, Evaluation.id == EvaluationInstance.evaluation_id)
+        .filter(Evaluation.section_id.in_(section_ids))
+    )
+    if student_ids is not None:
+        grade_rows = grade_rows.filter(StudentEvaluationInstance.student_id.in_(student_ids))
+
+    grades = pd.DataFrame(
+        grade_rows.all(), columns=["section_id", "student_id", "instance_id", "grade"]
+    )
+    grades["grade"] = grades["grade"].astype(float)
+    return dict(tuple(grades.groupby("section_id")))
+
+
+def _pivot_grades(section_grades, rows, columns):
+    """
+    The dense ``rows`` x ``columns`` grade array of one section, NaN where there is no grade.
+    """
+    if section_grades is None:
+        return np.full((len(rows), len(columns)), np.nan)
+    return (
+        section_grades.pivot(index="student_id", columns="instance_id", values="grade")
+        .reindex(index=rows, columns=columns)
+        .to_numpy(dtype=float)
+    )
+
+
+def load_grade_matrix(section_id):
+    return load_grade_matrices([section_id])[section_id]
+
+
+def compute_subtotals(matrix):
+    """
+    Weighted sums and weight totals of a GradeMatrix, per evaluation and over the section.
+
+    A missing grade counts as MINIMUM_GRADE unless the instance is optional,
+    in which case the instance is left out of its evaluation's sums. An
+    evaluation with no counted instance is left out of the section's sums.
+    Columns are added one at a time in id order, vectorized over students,
+    so every sum is the exact float the per-student loop gave.
+    """
+    student_count = len(matrix.student_ids)
+    columns_by_evaluation = defaultdict(list)
+    for index, instance in enumerate(matrix.instances):
+        columns_by_evaluation[instance.evaluation_id].append(index)
+
+    evaluation_sums = np.zeros((student_count, len(matrix.evaluations)))
+    evaluation_weights = np.zeros((student_count, len(matrix.evaluations)))
+    final_sums = np.zeros(student_count)
+    final_weights = np.zeros(student_count)
+    for position, evaluation in enumerate(matrix.evaluations):
+        grade, weight = _evaluation_subtotal(matrix, columns_by_evaluation[evaluation.id])
+        evaluation_sums[:, position] = grade
+        evaluation_weights[:, position] = weight
+
+        has_weight = weight > 0
+        average = np.divide(grade, weight, out=np.full(student_count, np.nan), where=has_weight)
+        final_sums = np.where(has_weight, final_sums + average * evaluation.weighing, final_sums)
+        final_weights = np.where(has_weight, final_weights + evaluation.weighing, final_weights)
+    return GradeSubtotals(evaluation_sums, evaluation_weights, final_sums, final_weights)
+
+
+def _evaluation_subtotal(matrix, indexes):
+    """
+    Every student's weighted sum and weight total over the instance columns at ``indexes``.
+    """
+    student_count = len(matrix.student_ids)
+    grade = np.zeros(student_count)
+    weight = np.zeros(student_count)
+    for index in indexes:
+        instance = matrix.instances[index]
+        column = matrix.grades[:, index]
+        graded = ~np.isnan(column)
+        counted = graded if instance.optional else np.ones(student_count, dtype=bool)
+        value = np.where(graded, column, MINIMUM_GRADE)
+        grade = np.where(counted, grade + value * instance.weighing, grade)
+        weight = np.where(counted, weight + instance.weighing, weight)
+    return grade, weight
+
+
+def compute_grades(matrix, subtotals=None):
+    """
+    Evaluation averages (students x evaluations) and final grades of a GradeMatrix.
+
+    Averages are the quotients of compute_subtotals; an evaluation with no
+    counted instance has a NaN average, as does the final grade of a
+    student with no counted evaluation.
+    """
+    subtotals = subtotals or compute_subtotals(matrix)
+    return ComputedGrades(
+        np.divide(
+            subtotals.evaluation_sums,
+            subtotals.evaluation_weights,
+            out=np.full(subtotals.evaluation_sums.shape, np.nan),
+            where=subtotals.evaluation_weights > 0,
+        ),
+        np.divide(
+            subtotals.final_sums,
+            subtotals.final_weights,
+            out=np.full(subtotals.final_sums.shape, np.nan),
+            where=subtotals.final_weights != 0,
+        ),
+    )
+
+
+def section_grade_rows(matrix, computed=None):
+    """
+    The SectionGrade rows closing ``matrix``'s section would write.
+    """
+    computed = computed or compute_grades(matrix)
+    if np.isnan(computed.final_grades).any():
+        raise GradeComputationError(
+            f"La sección {matrix.section_id} no tiene evaluaciones con ponderación para "
+            "calcular la nota final."
+        )
+    return [
+        {"student_id": student_id, "section_id": matrix.section_id, "grade": float(grade)}
+        for student_id, grade in zip(matrix.student_ids, computed.final_grades)
+    ]
+
+
+def close_section(section_id):
+    """
+    Compute every student's final grade from their grades, store it and mark the section closed.
+
+    Grades are computed like close_sections does, from the grades
+    themselves, never from the subtotal store, so a stale or missing store
+    cannot finalize a wrong grade.
+    """
+    rows = section_grade_rows(load_grade_matrix(section_id))
+    write_section_grades([section_id], rows)
+    kanvas_db.session.commit()
+    return rows
+
+
+def write_section_grades(section_ids, rows):
+    """
+    Insert the SectionGrade ``rows`` and mark ``section_ids`` closed.
+
+    Nothing is committed, so callers choose how many sections go in one transaction.
+    """
+    insert_rows(SectionGrade, rows)
+    kanvas_db.session.query(Section).filter(Section.id.in_(section_ids)).update(
+        {Section.closed: True}, synchronize_session=False
+    )
+
+
+def grade_sheet(section):
+    """
+    The GradeSheet of the sections/grades.html report, in five queries whatever the section size.
+
+    Each SheetRow holds, per evaluation, the cells of its instances (the
+    grade, MINIMUM_GRADE for a missing required grade, None for a missing
+    optional one) and the evaluation average, read from the subtotal store.
+    The final grade is the stored SectionGrade of a closed section and the
+    stored running average otherwise; averages that cannot be computed are None.
+    When the store lacks rows of the section, as before its first rebuild,
+    averages are computed from the grades instead.
+    """
+    matrix = load_grade_matrix(section.id)
+    names, final_grades = _sheet_students(section, matrix.student_ids)
+    averages = _stored_evaluation_averages(section.id)
+    if len(averages) < len(matrix.student_ids) * len(matrix.evaluations) or (
+        not section.closed and len(final_grades) < len(matrix.student_ids)
+    ):
+        computed = compute_grades(matrix)
+        averages = {
+            (student_id, evaluation.id): _number(computed.evaluation_grades[row, position])
+            for row, student_id in enumerate(matrix.student_ids)
+            for position, evaluation in enumerate(matrix.evaluations)
+        }
+        if not section.closed:
+            final_grades = {
+                student_id: _number(grade)
+                for student_id, grade in zip(matrix.student_ids, computed.final_grades)
+            }
+
+    columns_by_evaluation = defaultdict(list)
+    for index, instance in enumerate(matrix.instances):
+        columns_by_evaluation[instance.evaluation_id].append(index)
+    evaluations = [
+        SheetEvaluation(
+            evaluation.title,
+            evaluation.weighing,
+            [matrix.instances[index] for index in columns_by_evaluation[evaluation.id]],
+        )
+        for evaluation in matrix.evaluations
+    ]
+
+    rows = []
+    for row, student_id in enumerate(matrix.student_ids):
+        cells = [
+            (
+                [
+                    _sheet_cell(matrix.grades[row, index], matrix.instances[index])
+                    for index in columns_by_evaluation[evaluation.id]
+                ],
+                averages.get((student_id, evaluation.id)),
+            )
+            for evaluation in matrix.evaluations
+        ]
+        rows.append(
+            SheetRow(student_id, names.get(student_id, ""), cells, final_grades.get(student_id))
+        )
+    return GradeSheet(evaluations, rows)
+
+
+def _sheet_students(section, student_ids):
+    """
+    Names and stored final grades of ``student_ids`` in ``section``, in one query.
+
+    Final grades are the SectionGrades of a closed section and the running
+    averages of an open one; students without a stored row are left out.
+    """
+    if section.closed:
+        final, final_columns = SectionGrade, (SectionGrade.grade,)
+    else:
+        final = StudentSectionSubtotal
+        final_columns = (StudentSectionSubtotal.weighted_sum, StudentSectionSubtotal.weight_total)
+    names = {}
+    final_grades = {}
+    for student_id, name, *final_values in (
+        kanvas_db.session.query(Student.id, User.first_name + " " + User.last_name, *final_columns)
+        .join(User, User.id == Student.user_id)
+        .outerjoin(final, (final.student_id == Student.id) & (final.section_id == section.id))
+        .filter(Student.id.in_(student_ids))
+    ):
+        names[student_id] = name
+        if section.closed:
+            final_grades[student_id] = final_values[0]
+        elif final_values[-1] is not None:
+            final_grades[student_id] = _quotient(*final_values)
+    return names, final_grades
+
+
+def _stored_evaluation_averages(section_id):
+    return {
+        (student_id, evaluation_id): _quotient(weighted_sum, weight_total)
+        for student_id, evaluation_id, weighted_sum, weight_total in kanvas_db.session.query(
+            StudentEvaluationSubtotal.student_id,
+            StudentEvaluationSubtotal.evaluation_id,
+            StudentEvaluationSubtotal.weighted_sum,
+            StudentEvaluationSubtotal.weight_total,
+        ).filter(StudentEvaluationSubtotal.section_id == section_id)
+    }
+
+
+def _sheet_cell(grade, instance):
+    if not np.isnan(grade):
+        return float(grade)
+    return None if instance.optional else MINIMUM_GRADE
+
+
+def _number(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _quotient(weighted_sum, weight_total):
+    if weighted_sum is None or not weight_total:
+        return None
+    return weighted_sum / weight_total
@@ -0,0 +1,100 @@
+from app.extensions import kanvas_db
+from app.models.student import Student
+from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.models.student_section import StudentSection
+from app.models.user import User
+from app.services.grade_subtotals import refresh_subtotals
+from app.utils.bulk_sql import upsert_rows
+
+
+class GradeEntryError(ValueError):
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def grade_entry_sheet(section_id, instance_ids):
+    """
+    The enrolled (student_id, name) pairs of a section and their grades in ``instance_ids``.
+
+    Grades come as {(evaluation_instance_id, student_id): grade}; two queries in all.
+    """
+    students = (
+        kanvas_db.session.query(Student.id, User.first_name + " " + User.last_name)
+        .join(StudentSection, StudentSection.student_id == Student.id)
+        .join(User, User.id == Student.user_id)
+        .filter(StudentSection.section_id == section_id)
+        .order_by(User.last_name, User.first_name, Student.id)
+        .all()
+    )
+    grades = {
+        (instance_id, student_id): grade
+        for instance_id, student_id, grade in kanvas_db.session.query(
+            StudentEvaluationInstance.evaluation_instance_id,
+            StudentEvaluationInstance.student_id,
+            StudentEvaluationInstance.grade,
+        )
+        .join(
+            StudentSection,
+            (StudentSection.student_id == StudentEvaluationInstance.student_id)
+            & (StudentSection.section_id == section_id),
+        )
+        .filter(StudentEvaluationInstance.evaluation_instance_id.in_(list(instance_ids)))
+    }
+    return students, grades
+
+
+def save_grades(section_id, instance_ids, entries):
+    """
+    Save (evaluation_instance_id, student_id, grade) entries of one section in one upsert.
+
+    Blank grades are skipped, so untouched cells keep their grade. Students
+    are checked against the section's enrollment, loaded once, and instances
+    against ``instance_ids``. Nothing is written unless every entry is
+    valid; otherwise GradeEntryError lists the invalid ones. Subtotals of the
+    students graded are refreshed in the same transaction. Returns the number
+    of grades saved.
+    """
+    instance_ids = set(instance_ids)
+    enrolled = {
+        student_id
+        for (student_id,) in kanvas_db.session.query(StudentSection.student_id).filter(
+            StudentSection.section_id == section_id
+        )
+    }
+
+    rows = {}
+    errors = []
+    for instance_id, student_id, grade in entries:
+        if grade is None or str(grade).strip() == "":
+            continue
+        if instance_id not in instance_ids:
+            errors.append(f"La instancia {instance_id} no pertenece a esta planilla.")
+            continue
+        if student_id not in enrolled:
+            errors.append(f"El estudiante {student_id} no pertenece a esta sección.")
+            continue
+        try:
+            value = float(grade)
+        except (TypeError, ValueError):
+            errors.append(f"Nota inválida para el estudiante {student_id}: {grade}")
+            continue
+        rows[(instance_id, student_id)] = {
+            "evaluation_instance_id": instance_id,
+            "student_id": student_id,
+            "grade": value,
+        }
+    if errors:
+        raise GradeEntryError(errors)
+    if not rows:
+        return 0
+
+    upsert_rows(
+        StudentEvaluationInstance,
+        list(rows.values()),
+        key_columns=["student_id", "evaluation_instance_id"],
+        update_columns=["grade"],
+    )
+    refresh_subtotals([section_id], {student_id for _instance_id, student_id in rows})
+    kanvas_db.session.commit()
+    return len(rows)
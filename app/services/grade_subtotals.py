@@ -0,0 +1,134 @@
+from app.extensions import kanvas_db
+from app.models.evaluation import Evaluation
+from app.models.evaluation_instance import EvaluationInstance
+from app.models.section import Section
+from app.models.student_evaluation_subtotal import StudentEvaluationSubtotal
+from app.models.student_section_subtotal import StudentSectionSubtotal
+from app.services.grade_engine import compute_subtotals, load_grade_matrices
+from app.utils.bulk_sql import insert_rows
+
+DEFAULT_REBUILD_CHUNK_SIZE = 200
+
+
+def refresh_subtotals(section_ids, student_ids=None):
+    """
+    Recompute the stored subtotals of ``section_ids`` from their grades and weights.
+
+    ``student_ids`` limits the work to those students, so a grade write
+    only recomputes the rows of the student it touched: one evaluation's
+    weighted sum and weight total and the section's, added in the same order
+    as compute_subtotals, so the store never drifts from a full rebuild.
+    Rows of students no longer enrolled are dropped. The students'
+    StudentSection rows are locked before their grades are read, so two
+    writes for the same student recompute one after the other. Does not
+    commit, so the caller writes the grade and its subtotals in one transaction.
+    """
+    section_ids = list(section_ids)
+    if not section_ids:
+        return
+    matrices = load_grade_matrices(section_ids, student_ids, lock=True)
+
+    for model in (StudentEvaluationSubtotal, StudentSectionSubtotal):
+        query = kanvas_db.session.query(model).filter(model.section_id.in_(section_ids))
+        if student_ids is not None:
+            query = query.filter(model.student_id.in_(list(student_ids)))
+        query.delete(synchronize_session=False)
+
+    evaluation_rows = []
+    section_rows = []
+    for matrix in matrices.values():
+        subtotals = compute_subtotals(matrix)
+        for row, student_id in enumerate(matrix.student_ids):
+            for position, evaluation in enumerate(matrix.evaluations):
+                evaluation_rows.append(
+                    {
+                        "student_id": student_id,
+                        "evaluation_id": evaluation.id,
+                        "section_id": matrix.section_id,
+                        "weighted_sum": float(subtotals.evaluation_sums[row, position]),
+                        "weight_total": float(subtotals.evaluation_weights[row, position]),
+                    }
+                )
+            section_rows.append(
+                {
+                    "student_id": student_id,
+                    "section_id": matrix.section_id,
+                    "weighted_sum": float(subtotals.final_sums[row]),
+                    "weight_total": float(subtotals.final_weights[row]),
+                }
+            )
+    insert_rows(StudentEvaluationSubtotal, evaluation_rows)
+    insert_rows(StudentSectionSubtotal, section_rows)
+
+
+def refresh_grade_subtotals(grade_keys):
+    """
+    Recompute the subtotals touched by (evaluation_instance_id, student_id) grade writes.
+    """
+    grade_keys = list(grade_keys)
+    if not grade_keys:
+        return
+    instance_ids = {instance_id for instance_id, _student_id in grade_keys}
+    section_ids = [
+        section_id
+        for (section_id,) in kanvas_db.session.query(Evaluation.section_id)
+        .join(EvaluationInstance, EvaluationInstance.evaluation_id == Evaluation.id)
+        .filter(EvaluationInstance.id.in_(instance_ids))
+        .distinct()
+    ]
+    refresh_subtotals(section_ids, {student_id for _instance_id, student_id in grade_keys})
+
+
+def provisional_grade(student_id, section_id):
+    """
+    The running final grade of a student in a section, or None when it has no weight.
+    """
+    subtotal = kanvas_db.session.get(StudentSectionSubtotal, (student_id, section_id))
+    if subtotal is None or not subtotal.weight_total:
+        return None
+    return subtotal.weighted_sum / subtotal.weight_total
+
+
+def rebuild_subtotals(
+    section_ids=None, chunk_size=DEFAULT_REBUILD_CHUNK_SIZE, dry_run=False, progress=None
+):
+    """
+    Recompute the whole store, or that of ``section_ids``, ``chunk_size`` sections per commit.
+
+    Returns the ids of the sections whose stored rows differed from the
+    recomputed ones, i.e. where an out-of-band write left the store stale.
+    With ``dry_run`` every chunk is rolled back, so the store is only checked.
+    """
+    if section_ids is None:
+        section_ids = [section_id for (section_id,) in kanvas_db.session.query(Section.id)]
+    section_ids = sorted(section_ids)
+
+    stale = []
+    for start in range(0, len(section_ids), chunk_size):
+        chunk = section_ids[start : start + chunk_size]
+        before = _stored_rows(chunk)
+        refresh_subtotals(chunk)
+        after = _stored_rows(chunk)
+        stale.extend(
+            section_id for section_id in chunk if before.get(section_id) != after.get(section_id)
+        )
+        if dry_run:
+            kanvas_db.session.rollback()
+        else:
+            kanvas_db.session.commit()
+        if progress:
+            progress(start + len(chunk), len(section_ids))
+    return stale
+
+
+def _stored_rows(section_ids):
+    rows = {}
+    for model, key in (
+        (StudentEvaluationSubtotal, StudentEvaluationSubtotal.evaluation_id),
+        (StudentSectionSubtotal, StudentSectionSubtotal.section_id),
+    ):
+        for section_id, *values in kanvas_db.session.query(
+            model.section_id, model.student_id, key, model.weighted_sum, model.weight_total
+        ).filter(model.section_id.in_(section_ids)):
+            rows.setdefault(section_id, set()).add((model.__tablename__, *values))
+    return rows
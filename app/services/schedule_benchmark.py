@@ -0,0 +1,232 @@
+import math
+import random
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime
+
+from werkzeug.security import generate_password_hash
+
+from app.extensions import kanvas_db
+from app.models.classroom import Classroom
+from app.models.course import Course
+from app.models.course_instance import CourseInstance, Semester
+from app.models.section import Section, WeighingType
+from app.models.student import Student
+from app.models.student_section import StudentSection
+from app.models.teacher import Teacher
+from app.models.user import User
+from app.services.generate_schedule import ScheduleAssignmentError, generate_schedule
+from app.services.schedule_metrics import RunReport
+from app.utils.bulk_sql import insert_rows
+
+SyntheticTerm = namedtuple(
+    "SyntheticTerm",
+    [
+        "sections",
+        "students_per_section",
+        "student_load",
+        "cohort_size",
+        "rooms",
+        "teacher_load",
+        "credit_mix",
+        "seed",
+    ],
+    defaults=(200, 30, 4, 8, 25, 3, {2: 0.3, 3: 0.5, 4: 0.2}, 0),
+)
+
+BENCHMARK_YEAR = 2025
+
+
+def generate_synthetic_term(term):
+    """
+    Insert a random but reproducible term described by ``term`` into the current database.
+
+    Students belong to cohorts of ``cohort_size`` sections and take
+    ``student_load`` of them, so the conflict graph looks like a real
+    program's instead of a random one. Every section is its own course with
+    credits drawn from ``credit_mix``; teachers get ``teacher_load`` sections
+    each and classroom capacities span one to two average enrollments, with
+    the largest room fitting the largest section. Returns the row counts.
+    """
+    rng = random.Random(term.seed)
+    teacher_count = math.ceil(term.sections / term.teacher_load)
+    student_count = math.ceil(term.sections * term.students_per_section / term.student_load)
+    people = _people_rows(rng, teacher_count, student_count)
+    courses = _course_rows(term, rng)
+    enrollment_rows, enrollments = _enrollment_rows(term, rng, student_count)
+
+    for model, rows in (
+        *people,
+        *courses,
+        (StudentSection, enrollment_rows),
+        (Classroom, _classroom_rows(term, rng, enrollments)),
+    ):
+        insert_rows(model, rows)
+    kanvas_db.session.commit()
+
+    return {
+        "teachers": teacher_count,
+        "students": student_count,
+        "sections": term.sections,
+        "enrollments": len(enrollment_rows),
+        "classrooms": term.rooms,
+    }
+
+
+def _people_rows(rng, teacher_count, student_count):
+    """
+    (model, rows) pairs of the users, teachers and students of a synthetic term.
+    """
+    password_hash = generate_password_hash("password", method="pbkdf2:sha256")
+    user_rows = [
+        {
+            "id": user_id,
+            "email": f"benchmark.{user_id}@example.com",
+            "password_hash": password_hash,
+            "first_name": "Benchmark",
+            "last_name": str(user_id),
+        }
+        for user_id in range(1, teacher_count + student_count + 1)
+    ]
+    teacher_rows = [{"id": index, "user_id": index} for index in range(1, teacher_count + 1)]
+    student_rows = [
+        {
+            "id": index,
+            "user_id": teacher_count + index,
+            "university_entry_year": BENCHMARK_YEAR - rng.randint(0, 5),
+        }
+        for index in range(1, student_count + 1)
+    ]
+    return (User, user_rows), (Teacher, teacher_rows), (Student, student_rows)
+
+
+def _course_rows(term, rng):
+    """
+    (model, rows) pairs of the courses, instances and sections, one of each per section.
+    """
+    credit_values = list(term.credit_mix)
+    credit_weights = [term.credit_mix[value] for value in credit_values]
+    section_ids = range(1, term.sections + 1)
+    course_rows = [
+        {
+            "id": index,
+            "title": f"Curso Benchmark {index}",
+            "code": f"BM{index:05d}",
+            "credits": rng.choices(credit_values, credit_weights)[0],
+        }
+        for index in section_ids
+    ]
+    instance_rows = [
+        {"id": index, "course_id": index, "year": BENCHMARK_YEAR, "semester": Semester.FIRST}
+        for index in section_ids
+    ]
+    section_rows = [
+        {
+            "id": index,
+            "course_instance_id": index,
+            "code": index,
+            "weighing_type": WeighingType.WEIGHT,
+            "teacher_id": (index - 1) // term.teacher_load + 1,
+            "closed": False,
+        }
+        for index in section_ids
+    ]
+    return (Course, course_rows), (CourseInstance, instance_rows), (Section, section_rows)
+
+
+def _enrollment_rows(term, rng, student_count):
+    """
+    StudentSection rows of students taking ``student_load`` sections of one cohort each.
+
+    Also returns the enrollment of every section.
+    """
+    section_ids = list(range(1, term.sections + 1))
+    cohorts = [
+        section_ids[start : start + term.cohort_size]
+        for start in range(0, term.sections, term.cohort_size)
+    ]
+    enrollment_rows = []
+    enrollments = dict.fromkeys(section_ids, 0)
+    for student_id in range(1, student_count + 1):
+        cohort = rng.choice(cohorts)
+        for section_id in rng.sample(cohort, min(term.student_load, len(cohort))):
+            enrollment_rows.append({"student_id": student_id, "section_id": section_id})
+            enrollments[section_id] += 1
+    return enrollment_rows, enrollments
+
+
+def _classroom_rows(term, rng, enrollments):
+    classroom_rows = [
+        {
+            "id": index,
+            "name": f"Sala Benchmark {index}",
+            "capacity": rng.randint(term.students_per_section, 2 * term.students_per_section),
+        }
+        for index in range(1, term.rooms + 1)
+    ]
+    largest = max(classroom_rows, key=lambda row: row["capacity"])
+    largest["capacity"] = max(largest["capacity"], max(enrollments.values(), default=0))
+    return classroom_rows
+
+
+class PlacedCounter:
+    """
+    ``progress`` callback of generate_schedule that keeps the sections placed so far.
+    """
+
+    def __init__(self):
+        self.placed = 0
+
+    def __call__(self, _phase, placed, _total):
+        self.placed = placed
+
+
+def run_benchmark(repeat=1, trace_memory=True, options=None):
+    """
+    Generate the schedule ``repeat`` times over the current data and return one record per run.
+
+    ``options`` is the GenerationOptions of every run. Each record is the
+    RunReport summary the run stores on its version (time, SQL statements
+    per phase and candidate counts), plus its status, the sections placed
+    and, with ``trace_memory``, the peak traced memory of the run.
+    """
+    runs = []
+    for _ in range(repeat):
+        run_report = RunReport(kanvas_db.engine)
+        counter = PlacedCounter()
+        status, error = "ok", None
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            generate_schedule(options, progress=counter, run_report=run_report)
+        except ScheduleAssignmentError as e:
+            status, error = "failed", str(e)
+        finally:
+            peak_memory = None
+            if trace_memory:
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        runs.append(
+            {
+                "status": status,
+                "error": error,
+                "placed": counter.placed,
+                "peak_memory_bytes": peak_memory,
+                **run_report.as_dict(),
+            }
+        )
+    return runs
+
+
+def benchmark_record(term, counts, runs, **options):
+    """
+    Machine-readable summary of a benchmark, one JSON object per invocation.
+    """
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "database": kanvas_db.engine.dialect.name,
+        "term": {**term._asdict(), "credit_mix": {str(k): v for k, v in term.credit_mix.items()}},
+        "counts": counts,
+        "options": options,
+        "runs": runs,
+    }
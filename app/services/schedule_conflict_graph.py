@@ -0,0 +1,46 @@
+from collections import defaultdict
+
+from app.extensions import kanvas_db
+from app.models.student_section import StudentSection
+
+
+class StudentConflictGraph:
+    """
+    Undirected graph joining every pair of sections that share at least one student.
+    """
+
+    def __init__(self, enrollments):
+        self.sections_by_student = defaultdict(set)
+        for section_id, student_id in enrollments:
+            self.sections_by_student[student_id].add(section_id)
+
+        self._neighbours = defaultdict(set)
+        for section_ids in self.sections_by_student.values():
+            for section_id in section_ids:
+                self._neighbours[section_id].update(section_ids)
+        for section_id, neighbours in self._neighbours.items():
+            neighbours.discard(section_id)
+
+    @classmethod
+    def load(cls):
+        """
+        Build the graph from the student_sections table in a single query.
+        """
+        return cls(
+            kanvas_db.session.query(StudentSection.section_id, StudentSection.student_id).all()
+        )
+
+    def neighbours(self, section_id):
+        """
+        Sections sharing at least one student with the given section.
+        """
+        return self._neighbours.get(section_id, set())
+
+    def conflicts(self, section_id, other_section_id):
+        return other_section_id in self.neighbours(section_id)
+
+    def degree(self, section_id):
+        return len(self.neighbours(section_id))
+
+    def sections_of(self, student_id):
+        return self.sections_by_student.get(student_id, set())
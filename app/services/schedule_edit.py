@@ -0,0 +1,286 @@
+from collections import namedtuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
+
+from app.extensions import kanvas_db
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.classroom import Classroom
+from app.models.course import Course
+from app.models.course_instance import CourseInstance
+from app.models.schedule_version import ScheduleVersion
+from app.models.section import Section
+from app.models.student_section import StudentSection
+from app.services.generate_schedule import build_time_grid, invalidate_schedule_cache
+from app.services.schedule_versions import replace_version_rows, rescore_version
+
+SectionSlot = namedtuple(
+    "SectionSlot",
+    [
+        "section_id",
+        "teacher_id",
+        "credits",
+        "enrollment",
+        "term",
+        "classroom_id",
+        "block_ids",
+    ],
+)
+
+
+class ScheduleEditError(Exception):
+    pass
+
+
+def move_section(section_id, classroom_id, start_block_id, grid=None):
+    """
+    Move a section of the active schedule to ``classroom_id``, starting at ``start_block_id``.
+
+    The section keeps its length: it takes as many back-to-back blocks of
+    that day as it has credits. Room, teacher, student and capacity
+    conflicts are checked with a fixed number of indexed queries, and the
+    section's rows are replaced in one short transaction, along with the
+    version's score for the section's term. ``grid`` is the TimeGrid of the
+    schedule, by default the one of build_time_grid.
+    """
+    grid = grid or build_time_grid()
+    version_id = _lock_active_version()
+    try:
+        slot = _load_slot(version_id, section_id)
+        block_ids = _window(grid, start_block_id, slot.credits)
+        _check_slot(version_id, slot, classroom_id, block_ids, exclude=[section_id])
+        _replace_slots(
+            version_id, {section_id: (classroom_id, block_ids)}, {section_id: slot.term}, grid
+        )
+    except ScheduleEditError:
+        kanvas_db.session.rollback()
+        raise
+
+
+def swap_sections(section_id, other_section_id, grid=None):
+    """
+    Exchange the classrooms and blocks of two sections with the same credits.
+    """
+    grid = grid or build_time_grid()
+    if section_id == other_section_id:
+        raise ScheduleEditError("No se puede intercambiar una sección consigo misma.")
+    version_id = _lock_active_version()
+    try:
+        slot = _load_slot(version_id, section_id)
+        other = _load_slot(version_id, other_section_id)
+        if slot.credits != other.credits:
+            raise ScheduleEditError(
+                f"Las secciones {section_id} y {other_section_id} no tienen los mismos créditos."
+            )
+        exclude = [section_id, other_section_id]
+        _check_slot(version_id, slot, other.classroom_id, other.block_ids, exclude=exclude)
+        _check_slot(version_id, other, slot.classroom_id, slot.block_ids, exclude=exclude)
+        _replace_slots(
+            version_id,
+            {
+                section_id: (other.classroom_id, other.block_ids),
+                other_section_id: (slot.classroom_id, slot.block_ids),
+            },
+            {section_id: slot.term, other_section_id: other.term},
+            grid,
+        )
+    except ScheduleEditError:
+        kanvas_db.session.rollback()
+        raise
+
+
+def swap_candidates(section_id):
+    """
+    (section id, course code, section code) of the scheduled sections a section can swap with.
+    """
+    length = (
+        kanvas_db.session.query(Course.credits)
+        .join(CourseInstance, CourseInstance.course_id == Course.id)
+        .join(Section, Section.course_instance_id == CourseInstance.id)
+        .filter(Section.id == section_id)
+        .scalar_subquery()
+    )
+    active_sections = (
+        kanvas_db.session.query(AssignedTimeBlock.section_id)
+        .join(ScheduleVersion, ScheduleVersion.id == AssignedTimeBlock.version_id)
+        .filter(ScheduleVersion.is_active.is_(True))
+    )
+    return (
+        kanvas_db.session.query(Section.id, Course.code, Section.code)
+        .join(CourseInstance, CourseInstance.id == Section.course_instance_id)
+        .join(Course, Course.id == CourseInstance.course_id)
+        .filter(
+            Course.credits == length,
+            Section.id != section_id,
+            Section.id.in_(active_sections),
+        )
+        .order_by(Course.code, Section.code)
+        .all()
+    )
+
+
+def _lock_active_version():
+    version_id = (
+        kanvas_db.session.query(ScheduleVersion.id)
+        .filter(ScheduleVersion.is_active.is_(True))
+        .with_for_update()
+        .scalar()
+    )
+    if version_id is None:
+        raise ScheduleEditError("No hay un horario activo para editar.")
+    return version_id
+
+
+def _load_slot(version_id, section_id):
+    enrollment = (
+        kanvas_db.session.query(kanvas_db.func.count(StudentSection.student_id))
+        .filter(StudentSection.section_id == Section.id)
+        .scalar_subquery()
+    )
+    section = (
+        kanvas_db.session.query(
+            Section.teacher_id,
+            Course.credits,
+            CourseInstance.year,
+            CourseInstance.semester,
+            enrollment,
+        )
+        .join(CourseInstance, CourseInstance.id == Section.course_instance_id)
+        .join(Course, Course.id == CourseInstance.course_id)
+        .filter(Section.id == section_id)
+        .first()
+    )
+    if section is None:
+        raise ScheduleEditError(f"La sección {section_id} no existe.")
+    teacher_id, length, year, semester, student_count = section
+
+    rows = (
+        kanvas_db.session.query(AssignedTimeBlock.classroom_id, AssignedTimeBlock.time_block_id)
+        .filter(
+            AssignedTimeBlock.version_id == version_id,
+            AssignedTimeBlock.section_id == section_id,
+        )
+        .order_by(AssignedTimeBlock.time_block_id)
+        .all()
+    )
+    if not rows:
+        raise ScheduleEditError(f"La sección {section_id} no está en el horario activo.")
+
+    return SectionSlot(
+        section_id,
+        teacher_id,
+        length,
+        student_count,
+        (year, semester),
+        rows[0][0],
+        tuple(time_block_id for _classroom_id, time_block_id in rows),
+    )
+
+
+def _window(grid, start_block_id, length):
+    """
+    The ids of the ``length`` blocks of ``grid`` starting at ``start_block_id``.
+
+    Only the grid's candidate windows are accepted, the same the generator
+    tries, so a section never lands on a block outside the configured days
+    and hours or runs over a break.
+    """
+    start = next((block for block in grid.blocks if block.id == start_block_id), None)
+    if start is None:
+        raise ScheduleEditError(f"El bloque {start_block_id} no está en la grilla del horario.")
+    for _day, block_ids, _mask in grid.candidates(length):
+        if block_ids[0] == start_block_id:
+            return block_ids
+    raise ScheduleEditError(
+        f"No hay {length} bloques seguidos desde el {start.weekday} "
+        f"a las {start.start_time.strftime('%H:%M')}."
+    )
+
+
+def _check_slot(version_id, slot, classroom_id, block_ids, exclude):
+    """
+    Raise ScheduleEditError listing every conflict of ``slot`` in the target room and blocks.
+    """
+    conflicts = []
+    classroom = kanvas_db.session.get(Classroom, classroom_id)
+    if classroom is None:
+        raise ScheduleEditError(f"La sala {classroom_id} no existe.")
+    if classroom.capacity < slot.enrollment:
+        conflicts.append(
+            f"La sala {classroom.name} tiene capacidad {classroom.capacity} y la sección "
+            f"{slot.section_id} tiene {slot.enrollment} estudiantes"
+        )
+
+    occupants = (
+        kanvas_db.session.query(
+            AssignedTimeBlock.section_id, AssignedTimeBlock.classroom_id, Section.teacher_id
+        )
+        .join(Section, Section.id == AssignedTimeBlock.section_id)
+        .filter(
+            AssignedTimeBlock.version_id == version_id,
+            AssignedTimeBlock.time_block_id.in_(block_ids),
+            AssignedTimeBlock.section_id.notin_(exclude),
+            # Terms never meet, so only sections of the same (year, semester) can clash.
+            AssignedTimeBlock.year == slot.term[0],
+            AssignedTimeBlock.semester == slot.term[1],
+        )
+        .distinct()
+        .all()
+    )
+    room_taken = sorted({section_id for section_id, room, _ in occupants if room == classroom_id})
+    if room_taken:
+        conflicts.append(
+            f"La sala {classroom.name} está ocupada por la sección {room_taken[0]} en ese horario"
+        )
+    teacher_busy = sorted(
+        {section_id for section_id, _, teacher_id in occupants if teacher_id == slot.teacher_id}
+    )
+    if teacher_busy:
+        conflicts.append(f"El profesor tiene la sección {teacher_busy[0]} en ese horario")
+    shared = _shared_students(slot.section_id, {section_id for section_id, _, _ in occupants})
+    if shared:
+        conflicts.append(f"{shared} estudiantes tienen otra clase en ese horario")
+
+    if conflicts:
+        raise ScheduleEditError("; ".join(conflicts))
+
+
+def _shared_students(section_id, other_section_ids):
+    if not other_section_ids:
+        return 0
+    other = aliased(StudentSection)
+    return (
+        kanvas_db.session.query(kanvas_db.func.count(kanvas_db.distinct(StudentSection.student_id)))
+        .join(other, other.student_id == StudentSection.student_id)
+        .filter(
+            StudentSection.section_id == section_id,
+            other.section_id.in_(other_section_ids),
+        )
+        .scalar()
+    )
+
+
+def _replace_slots(version_id, slots, terms, grid):
+    """
+    Rewrite the rows of the given sections as {section_id: (classroom_id, block_ids)} and commit.
+
+    ``terms`` maps each of those sections to its (year, semester) term,
+    whose score is recomputed on ``grid``.
+    """
+    try:
+        replace_version_rows(
+            version_id,
+            slots,
+            (
+                (section_id, classroom_id, time_block_id)
+                for section_id, (classroom_id, block_ids) in slots.items()
+                for time_block_id in block_ids
+            ),
+            terms,
+        )
+        rescore_version(version_id, grid, terms.values())
+        kanvas_db.session.commit()
+    except SQLAlchemyError as e:
+        kanvas_db.session.rollback()
+        raise ScheduleEditError(f"No se pudo guardar el cambio: {e}") from e
+    invalidate_schedule_cache()
@@ -0,0 +1,266 @@
+from collections import defaultdict, namedtuple
+
+from app.extensions import kanvas_db
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.classroom import Classroom
+from app.models.course import Course
+from app.models.course_instance import CourseInstance, Semester
+from app.models.section import Section
+from app.models.student_section import StudentSection
+from app.models.time_block import TimeBlock
+from app.services.schedule_conflict_graph import StudentConflictGraph
+from app.services.schedule_metrics import (
+    CAPACITY_REJECTION,
+    ROOM_REJECTION,
+    STUDENT_REJECTION,
+    TEACHER_REJECTION,
+    SolveStats,
+)
+from app.services.schedule_rooms import ClassroomIndex
+
+SectionData = namedtuple(
+    "SectionData", ["id", "teacher_id", "credits", "student_ids", "term"], defaults=(None,)
+)
+ClassroomData = namedtuple("ClassroomData", ["id", "name", "capacity"])
+TimeBlockData = namedtuple("TimeBlockData", ["id", "weekday", "start_time", "stop_time"])
+Placement = namedtuple("Placement", ["section_id", "classroom_id", "day", "block_ids"])
+OccupancyMasks = namedtuple("OccupancyMasks", ["teacher", "section", "blocked"])
+
+
+class ScheduleSnapshot:
+    """
+    Plain in-memory copy of everything the scheduler needs from the database.
+    """
+
+    def __init__(self, sections, classrooms, time_blocks, assignments=()):
+        self.sections = list(sections)
+        self.classrooms = list(classrooms)
+        self.time_blocks = list(time_blocks)
+        self.assignments = list(assignments)
+        self.conflict_graph = StudentConflictGraph(
+            (section.id, student_id)
+            for section in self.sections
+            for student_id in section.student_ids
+        )
+
+    @classmethod
+    def load(cls, version_id=None, time_blocks=None, term=None):
+        """
+        Load sections, enrollments, classrooms, time blocks and the assignments of ``version_id``.
+
+        ``time_blocks`` (usually a TimeGrid's blocks) skips reading them from the database.
+        With ``term`` only the sections, enrollments and assignments of that
+        (year, semester) are loaded.
+        """
+        section_query = (
+            kanvas_db.session.query(
+                Section.id,
+                Section.teacher_id,
+                Course.credits,
+                CourseInstance.year,
+                CourseInstance.semester,
+            )
+            .join(CourseInstance, Section.course_instance_id == CourseInstance.id)
+            .join(Course, CourseInstance.course_id == Course.id)
+        )
+        enrollment_query = kanvas_db.session.query(
+            StudentSection.section_id, StudentSection.student_id
+        )
+        if term is not None:
+            section_query = section_query.filter(
+                CourseInstance.year == term[0], CourseInstance.semester == Semester(term[1])
+            )
+            enrollment_query = enrollment_query.filter(
+                StudentSection.section_id.in_(section_query.with_entities(Section.id))
+            )
+
+        student_ids_by_section = defaultdict(set)
+        for section_id, student_id in enrollment_query:
+            student_ids_by_section[section_id].add(student_id)
+
+        sections = [
+            SectionData(
+                id=section_id,
+                teacher_id=teacher_id,
+                credits=length,
+                student_ids=frozenset(student_ids_by_section[section_id]),
+                term=(year, semester.value),
+            )
+            for section_id, teacher_id, length, year, semester in section_query.order_by(Section.id)
+        ]
+
+        classrooms = [
+            ClassroomData(*row)
+            for row in kanvas_db.session.query(
+                Classroom.id, Classroom.name, Classroom.capacity
+            ).order_by(Classroom.id)
+        ]
+
+        if time_blocks is None:
+            time_blocks = [
+                TimeBlockData(*row)
+                for row in kanvas_db.session.query(
+                    TimeBlock.id, TimeBlock.weekday, TimeBlock.start_time, TimeBlock.stop_time
+                ).order_by(TimeBlock.id)
+            ]
+
+        assignments = []
+        if version_id is not None:
+            assignments = kanvas_db.session.query(
+                AssignedTimeBlock.section_id,
+                AssignedTimeBlock.classroom_id,
+                AssignedTimeBlock.time_block_id,
+            ).filter(AssignedTimeBlock.version_id == version_id)
+            if term is not None:
+                assignments = assignments.filter(
+                    AssignedTimeBlock.year == term[0],
+                    AssignedTimeBlock.semester == Semester(term[1]),
+                )
+            assignments = assignments.all()
+
+        return cls(sections, classrooms, time_blocks, assignments)
+
+    def split_by_term(self):
+        """
+        One snapshot per (year, semester) term, with that term's sections and assignments.
+
+        Classrooms and time blocks are shared: sections of different terms never
+        meet, so each term can use every room and block.
+        """
+        sections_by_term = defaultdict(list)
+        for section in self.sections:
+            sections_by_term[section.term].append(section)
+
+        term_by_section = {section.id: section.term for section in self.sections}
+        assignments_by_term = defaultdict(list)
+        for row in self.assignments:
+            if row[0] in term_by_section:
+                assignments_by_term[term_by_section[row[0]]].append(row)
+
+        return {
+            term: ScheduleSnapshot(
+                sections, self.classrooms, self.time_blocks, assignments_by_term[term]
+            )
+            for term, sections in sorted(sections_by_term.items())
+        }
+
+    def sections_in_greedy_order(self):
+        """
+        Sections without an assignment, sorted by enrollment and credits, both descending.
+        """
+        assigned_section_ids = {row[0] for row in self.assignments}
+        return sorted(
+            (section for section in self.sections if section.id not in assigned_section_ids),
+            key=lambda section: (-len(section.student_ids), -section.credits),
+        )
+
+
+class ScheduleEngine:
+    """
+    Greedy placement over in-memory occupancy bitmasks.
+
+    Every time block gets one bit; a window of contiguous blocks is the OR of
+    its bits, so each teacher or student check is a single AND. Room
+    occupancy lives in ``rooms``, a ClassroomIndex. ``masks`` holds the busy
+    blocks of every teacher and section, and student conflicts are tracked
+    per section: ``masks.blocked[s]`` holds the blocks already given to the
+    sections that share a student with ``s``. Bits and candidate windows
+    come from the run's TimeGrid. Candidates and rejections of ``place`` are
+    counted on ``stats``, a SolveStats.
+    """
+
+    def __init__(self, snapshot, grid, stats=None):
+        self.snapshot = snapshot
+        self.grid = grid
+        self.stats = stats if stats is not None else SolveStats()
+        self.rooms = ClassroomIndex(snapshot.classrooms, len(grid.blocks))
+        self.masks = OccupancyMasks(defaultdict(int), defaultdict(int), defaultdict(int))
+        self.placements = []
+
+        sections_by_id = {section.id: section for section in snapshot.sections}
+        for section_id, classroom_id, time_block_id in snapshot.assignments:
+            section = sections_by_id.get(section_id)
+            bit = grid.block_bits.get(time_block_id, 0)
+            self.rooms.occupy(classroom_id, bit)
+            if section:
+                self._occupy_people(section, bit)
+
+    def _occupy_people(self, section, mask):
+        masks = self.masks
+        masks.teacher[section.teacher_id] |= mask
+        masks.section[section.id] |= mask
+        for neighbour_id in self.snapshot.conflict_graph.neighbours(section.id):
+            masks.blocked[neighbour_id] |= mask
+
+    def windows_of_length(self, length):
+        """
+        Candidate (day, block_ids, mask) windows of the given length, in greedy order.
+        """
+        return self.grid.candidates(length)
+
+    def is_valid(self, section, classroom, mask):
+        """
+        Check capacity, room, teacher and student availability for a window mask.
+        """
+        if classroom.capacity < len(section.student_ids):
+            return False
+        if not self.rooms.is_free(classroom.id, mask):
+            return False
+        if self.masks.teacher[section.teacher_id] & mask:
+            return False
+        return not self.masks.blocked[section.id] & mask
+
+    def place(self, section):
+        """
+        Place a section in the first window its teacher and students have free,
+        in the smallest free classroom that seats it, or return None.
+        """
+        size = len(section.student_ids)
+        rejections = self.stats.rejections
+        room_rejection = ROOM_REJECTION if self.rooms.seats(size) else CAPACITY_REJECTION
+        windows = self.windows_of_length(section.credits)
+        for candidates, (day, block_ids, mask) in enumerate(windows, start=1):
+            if self.masks.teacher[section.teacher_id] & mask:
+                rejections[TEACHER_REJECTION] += 1
+                continue
+            if self.masks.blocked[section.id] & mask:
+                rejections[STUDENT_REJECTION] += 1
+                continue
+            classroom = self.rooms.best_fit(size, mask)
+            if classroom is not None:
+                self.stats.record_section(candidates)
+                return self.assign(section, classroom.id, day, block_ids, mask)
+            rejections[room_rejection] += 1
+        self.stats.record_section(len(windows))
+        return None
+
+    def assign(self, section, classroom_id, day, block_ids, mask):
+        """
+        Record a placement and mark its room, teacher and students as busy.
+        """
+        self.rooms.occupy(classroom_id, mask)
+        self._occupy_people(section, mask)
+        placement = Placement(section.id, classroom_id, day, block_ids)
+        self.placements.append(placement)
+        return placement
+
+    def unassign(self, section, placement):
+        """
+        Undo a placement made with ``assign``.
+        """
+        mask = self.mask_of(placement.block_ids)
+        self.placements.remove(placement)
+        self.rooms.release(placement.classroom_id, mask)
+        masks = self.masks
+        masks.teacher[section.teacher_id] &= ~mask
+        masks.section[section.id] &= ~mask
+
+        graph = self.snapshot.conflict_graph
+        for neighbour_id in graph.neighbours(section.id):
+            blocked = 0
+            for other_id in graph.neighbours(neighbour_id):
+                blocked |= masks.section[other_id]
+            masks.blocked[neighbour_id] = blocked
+
+    def mask_of(self, block_ids):
+        return self.grid.mask_of(block_ids)
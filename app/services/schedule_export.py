@@ -0,0 +1,237 @@
+import csv
+import io
+import json
+import zipfile
+from xml.sax.saxutils import escape
+
+from app.extensions import kanvas_db
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.classroom import Classroom
+from app.models.course import Course
+from app.models.course_instance import CourseInstance, Semester
+from app.models.section import Section
+from app.models.student_section import StudentSection
+from app.models.time_block import TimeBlock
+from app.services.schedule_versions import get_active_version_id
+
+CSV_FORMAT = "csv"
+XLSX_FORMAT = "xlsx"
+JSONL_FORMAT = "jsonl"
+
+EXPORT_COLUMNS = [
+    "course_title",
+    "course_code",
+    "section_code",
+    "classroom",
+    "weekday",
+    "start_time",
+    "stop_time",
+]
+EXPORT_CHUNK_SIZE = 500
+
+
+def schedule_rows(
+    teacher_id=None,
+    classroom_id=None,
+    term=None,
+    student_id=None,
+    chunk_size=EXPORT_CHUNK_SIZE,
+):
+    """
+    Yield one dict per section of the active schedule, ordered by start time.
+
+    Sections are collapsed to their first and last block in SQL and read
+    through a server-side cursor ``chunk_size`` rows at a time, so memory
+    does not grow with the schedule. Filters narrow the rows to one teacher,
+    one classroom, one student's sections or one (year, semester) term.
+    """
+    query = (
+        kanvas_db.session.query(
+            AssignedTimeBlock.section_id,
+            Course.title.label("course_title"),
+            Course.code.label("course_code"),
+            Section.code.label("section_code"),
+            Classroom.name.label("classroom"),
+            kanvas_db.func.min(TimeBlock.weekday).label("weekday"),
+            kanvas_db.func.min(TimeBlock.start_time).label("start_time"),
+            kanvas_db.func.max(TimeBlock.stop_time).label("stop_time"),
+        )
+        .join(Section, Section.id == AssignedTimeBlock.section_id)
+        .join(CourseInstance, CourseInstance.id == Section.course_instance_id)
+        .join(Course, Course.id == CourseInstance.course_id)
+        .join(Classroom, Classroom.id == AssignedTimeBlock.classroom_id)
+        .join(TimeBlock, TimeBlock.id == AssignedTimeBlock.time_block_id)
+        .filter(AssignedTimeBlock.version_id == get_active_version_id())
+    )
+    if teacher_id is not None:
+        query = query.filter(Section.teacher_id == teacher_id)
+    if classroom_id is not None:
+        query = query.filter(AssignedTimeBlock.classroom_id == classroom_id)
+    if student_id is not None:
+        query = query.join(
+            StudentSection, StudentSection.section_id == AssignedTimeBlock.section_id
+        ).filter(StudentSection.student_id == student_id)
+    if term is not None:
+        year, semester = term
+        query = query.filter(
+            CourseInstance.year == year, CourseInstance.semester == Semester(semester)
+        )
+    query = query.group_by(
+        AssignedTimeBlock.section_id,
+        Course.title,
+        Course.code,
+        Section.code,
+        Classroom.name,
+    ).order_by(kanvas_db.func.min(TimeBlock.start_time), AssignedTimeBlock.section_id)
+
+    for row in query.yield_per(chunk_size):
+        yield {
+            "course_title": row.course_title,
+            "course_code": row.course_code,
+            "section_code": row.section_code,
+            "classroom": row.classroom,
+            "weekday": row.weekday,
+            "start_time": _format_time(row.start_time),
+            "stop_time": _format_time(row.stop_time),
+        }
+
+
+def _format_time(value):
+    # SQLite hands back aggregated times as strings
+    return value.strftime("%H:%M") if hasattr(value, "strftime") else str(value)[:5]
+
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def _drain(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def stream_jsonl(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False) + "\n")
+        if len(lines) == EXPORT_CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+
+class _ChunkSink:
+    """
+    Write-only file for zipfile that hands out what was written since the last ``pop``.
+
+    It has no ``tell``/``seek``, so zipfile streams entries with data descriptors.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Horario" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def stream_xlsx(rows):
+    """
+    Write a single-sheet workbook as it is downloaded, one chunk of rows at a time.
+
+    Cells are inline strings, so the workbook needs no shared string table and
+    nothing but the current chunk is held in memory.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        yield sink.pop()
+
+        with workbook.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(EXPORT_COLUMNS))
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row[column] for column in EXPORT_COLUMNS))
+                if count % EXPORT_CHUNK_SIZE == 0:
+                    yield sink.pop()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.pop()
+
+
+def _xlsx_row(values):
+    cells = "".join(
+        f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>' for value in values
+    )
+    return f"<row>{cells}</row>".encode("utf-8")
+
+
+EXPORT_FORMATS = {
+    CSV_FORMAT: (stream_csv, "text/csv; charset=utf-8", "horario.csv"),
+    XLSX_FORMAT: (
+        stream_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "horario.xlsx",
+    ),
+    JSONL_FORMAT: (stream_jsonl, "application/x-ndjson; charset=utf-8", "horario.jsonl"),
+}
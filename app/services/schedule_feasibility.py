@@ -0,0 +1,168 @@
+from collections import Counter, defaultdict, namedtuple
+
+FeasibilityIssue = namedtuple("FeasibilityIssue", ["kind", "message", "section_ids"])
+
+CAPACITY_ISSUE = "capacity"
+WINDOW_ISSUE = "window"
+TEACHER_ISSUE = "teacher"
+CLIQUE_ISSUE = "clique"
+
+MAX_LISTED_SECTIONS = 5
+MAX_CLIQUE_ISSUES = 10
+
+
+def check_feasibility(snapshot, grid):
+    """
+    Necessary conditions a schedule of ``snapshot`` on ``grid`` must meet, checked up front.
+
+    Works on aggregates only: enrollments against the largest classroom,
+    credits against the longest run of back-to-back blocks, each teacher's
+    credits against the blocks of the week, and groups of sections that pairwise
+    share a student or teacher (and so can never overlap) against the blocks
+    of the week. The groups come from each student's sections plus one greedy
+    clique grown from every section, so not every infeasible term is caught,
+    but every reported issue is real; only the ``MAX_CLIQUE_ISSUES`` heaviest
+    groups are reported. Returns a list of FeasibilityIssue.
+    """
+    issues = []
+    block_count = len(grid.blocks)
+    largest_room = max((classroom.capacity for classroom in snapshot.classrooms), default=0)
+    longest_window = max((len(block_ids) for _day, block_ids in grid.windows), default=0)
+
+    for section in snapshot.sections:
+        if len(section.student_ids) > largest_room:
+            issues.append(
+                FeasibilityIssue(
+                    CAPACITY_ISSUE,
+                    f"La sección {section.id} tiene {len(section.student_ids)} estudiantes "
+                    f"y la sala más grande tiene capacidad {largest_room}",
+                    [section.id],
+                )
+            )
+        if section.credits > longest_window:
+            issues.append(
+                FeasibilityIssue(
+                    WINDOW_ISSUE,
+                    f"La sección {section.id} necesita {section.credits} bloques seguidos "
+                    f"y el día más largo tiene {longest_window}",
+                    [section.id],
+                )
+            )
+
+    sections_by_teacher = defaultdict(list)
+    for section in snapshot.sections:
+        sections_by_teacher[section.teacher_id].append(section)
+    for teacher_id, sections in sorted(sections_by_teacher.items()):
+        needed_blocks = sum(section.credits for section in sections)
+        if needed_blocks > block_count:
+            issues.append(
+                FeasibilityIssue(
+                    TEACHER_ISSUE,
+                    f"El profesor {teacher_id} tiene {needed_blocks} créditos y la semana "
+                    f"tiene {block_count} bloques",
+                    sorted(section.id for section in sections),
+                )
+            )
+
+    teacher_groups = {
+        frozenset(section.id for section in sections) for sections in sections_by_teacher.values()
+    }
+    for clique in _overloaded_cliques(snapshot, sections_by_teacher, block_count):
+        if clique in teacher_groups:
+            continue
+        needed_blocks = sum(
+            section.credits for section in snapshot.sections if section.id in clique
+        )
+        section_ids = sorted(clique)
+        issues.append(
+            FeasibilityIssue(
+                CLIQUE_ISSUE,
+                f"Las secciones {_list_ids(section_ids)} comparten estudiantes o profesor, "
+                f"suman {needed_blocks} créditos y la semana tiene {block_count} bloques",
+                section_ids,
+            )
+        )
+    return issues
+
+
+def _overloaded_cliques(snapshot, sections_by_teacher, block_count):
+    sections_by_id = {section.id: section for section in snapshot.sections}
+    graph = snapshot.conflict_graph
+    neighbours = {
+        section.id: graph.neighbours(section.id)
+        | {other.id for other in sections_by_teacher[section.teacher_id]}
+        for section in snapshot.sections
+    }
+    for section_id, adjacent in neighbours.items():
+        adjacent.discard(section_id)
+
+    candidates = [
+        frozenset(section_ids & sections_by_id.keys())
+        for section_ids in graph.sections_by_student.values()
+    ]
+    for section_id, adjacent in neighbours.items():
+        clique = {section_id}
+        for other_id in sorted(adjacent, key=lambda other: -sections_by_id[other].credits):
+            if clique <= neighbours[other_id]:
+                clique.add(other_id)
+        candidates.append(frozenset(clique))
+
+    def credits_of(clique):
+        return sum(sections_by_id[section_id].credits for section_id in clique)
+
+    overloaded = sorted(
+        (clique for clique in set(candidates) if credits_of(clique) > block_count),
+        key=lambda clique: (-credits_of(clique), sorted(clique)),
+    )
+    reported = []
+    for clique in overloaded:
+        if len(reported) == MAX_CLIQUE_ISSUES:
+            break
+        if not any(clique <= other for other in reported):
+            reported.append(clique)
+    return reported
+
+
+def explain_unplaced(engine, section):
+    """
+    Why ``engine`` has no room and window left for ``section``, in a sentence.
+    """
+    size = len(section.student_ids)
+    windows = engine.windows_of_length(section.credits)
+    if not windows:
+        return f"no hay {section.credits} bloques seguidos en un mismo día"
+    if not engine.rooms.fitting(size):
+        return f"ninguna sala tiene capacidad para {size} estudiantes"
+
+    reasons = Counter()
+    blockers = Counter()
+    for _day, _block_ids, mask in windows:
+        if engine.masks.teacher[section.teacher_id] & mask:
+            reasons[TEACHER_ISSUE] += 1
+        elif engine.masks.blocked[section.id] & mask:
+            reasons[CLIQUE_ISSUE] += 1
+            blockers.update(
+                neighbour_id
+                for neighbour_id in engine.snapshot.conflict_graph.neighbours(section.id)
+                if engine.masks.section[neighbour_id] & mask
+            )
+        else:
+            reasons[CAPACITY_ISSUE] += 1
+
+    explanation = (
+        f"de {len(windows)} ventanas de {section.credits} bloques, "
+        f"{reasons[TEACHER_ISSUE]} chocan con otras clases del profesor, "
+        f"{reasons[CLIQUE_ISSUE]} con clases de sus estudiantes y "
+        f"{reasons[CAPACITY_ISSUE]} no tienen sala libre para {size} estudiantes"
+    )
+    if blockers:
+        top = [section_id for section_id, _count in blockers.most_common(MAX_LISTED_SECTIONS)]
+        explanation += f" (secciones que más chocan: {_list_ids(top)})"
+    return explanation
+
+
+def _list_ids(section_ids):
+    listed = ", ".join(str(section_id) for section_id in section_ids[:MAX_LISTED_SECTIONS])
+    if len(section_ids) > MAX_LISTED_SECTIONS:
+        listed += f" y {len(section_ids) - MAX_LISTED_SECTIONS} más"
+    return listed
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import time
+
+from app.services.schedule_engine import TimeBlockData
+
+WEEKDAYS = {
+    1: "Lunes",
+    2: "Martes",
+    3: "Miércoles",
+    4: "Jueves",
+    5: "Viernes",
+    6: "Sábado",
+}
+
+LEGACY_DURATION = 60
+LEGACY_LAST_DAY = 5
+MINUTES_PER_DAY = 24 * 60
+
+
+def block_id(day_num, start_minutes, duration):
+    """
+    Stable id of a time block.
+
+    One hour blocks from Monday to Friday keep the ids the schedule has always
+    used; any other block gets an id derived from its duration, start and day,
+    so grids of different shapes never overwrite each other's rows.
+    """
+    if duration == LEGACY_DURATION and day_num <= LEGACY_LAST_DAY:
+        return (start_minutes // duration - 1) * LEGACY_LAST_DAY + day_num
+    return 1000 + (duration * MINUTES_PER_DAY + start_minutes) * len(WEEKDAYS) + day_num
+
+
+class TimeGrid:
+    """
+    The week's time blocks, computed once per run.
+
+    ``windows`` holds every run of back-to-back blocks of a day as
+    ``(day, block_ids)``. For each length up to the longest run, the
+    candidate windows are precomputed as ``(day, block_ids, mask)``, where the
+    mask has one bit per block in ``blocks`` order.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = list(blocks)
+        self.block_bits = {block.id: 1 << index for index, block in enumerate(self.blocks)}
+        self.windows = _contiguous_windows(self.blocks)
+
+        self._candidates = defaultdict(list)
+        for day, sequence in self.windows:
+            for length in range(1, len(sequence) + 1):
+                for start in range(len(sequence) - length + 1):
+                    block_ids = tuple(sequence[start : start + length])
+                    self._candidates[length].append((day, block_ids, self.mask_of(block_ids)))
+
+    @classmethod
+    def build(cls, days, sessions, block_duration):
+        """
+        Grid for ``days`` ({number: name}) with ``sessions`` given as (start_hour, end_hour).
+        """
+        blocks = []
+        for start_hour, end_hour in sessions:
+            session_minutes = (end_hour - start_hour) * 60
+            if block_duration <= 0 or session_minutes % block_duration:
+                raise ValueError(
+                    f"Bloques de {block_duration} minutos no dividen la jornada "
+                    f"de {start_hour}:00 a {end_hour}:00"
+                )
+            for start in range(start_hour * 60, end_hour * 60, block_duration):
+                stop = start + block_duration
+                for day_num, day_name in days.items():
+                    blocks.append(
+                        TimeBlockData(
+                            block_id(day_num, start, block_duration),
+                            day_name,
+                            time(start // 60, start % 60),
+                            time(stop // 60 % 24, stop % 60),
+                        )
+                    )
+        blocks.sort(key=lambda block: block.id)
+        return cls(blocks)
+
+    def candidates(self, length):
+        """
+        Candidate (day, block_ids, mask) windows of ``length`` blocks, in greedy order.
+        """
+        return self._candidates.get(length, [])
+
+    def mask_of(self, block_ids):
+        mask = 0
+        for time_block_id in block_ids:
+            mask |= self.block_bits.get(time_block_id, 0)
+        return mask
+
+    def rows(self):
+        """
+        TimeBlock rows for every block of the grid.
+        """
+        return [block._asdict() for block in self.blocks]
+
+
+def _contiguous_windows(blocks):
+    blocks_by_day = defaultdict(list)
+    for block in blocks:
+        blocks_by_day[block.weekday].append(block)
+
+    windows = []
+    for day, day_blocks in blocks_by_day.items():
+        day_blocks.sort(key=lambda block: block.start_time)
+        sequence = [day_blocks[0].id]
+        for previous, block in zip(day_blocks, day_blocks[1:]):
+            if block.start_time == previous.stop_time:
+                sequence.append(block.id)
+            else:
+                windows.append((day, sequence))
+                sequence = [block.id]
+        windows.append((day, sequence))
+    return windows
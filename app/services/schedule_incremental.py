@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from app.services.schedule_engine import ScheduleEngine, ScheduleSnapshot
+
+
+def split_assignments(snapshot, grid):
+    """
+    Split the current assignments into the ones that are still valid and the stale sections.
+
+    A section keeps its slot when all its rows use one classroom that still
+    fits its enrollment, the blocks form one window of ``credits`` length and
+    nothing it shares a room, teacher or student with has already claimed those
+    blocks. Sections are checked in greedy order, so larger sections win ties.
+    Returns ``(kept_rows, stale_section_ids)``.
+    """
+    rows_by_section = defaultdict(list)
+    for row in snapshot.assignments:
+        rows_by_section[row[0]].append(row)
+
+    checker = ScheduleEngine(
+        ScheduleSnapshot(snapshot.sections, snapshot.classrooms, snapshot.time_blocks), grid
+    )
+    classrooms_by_id = {classroom.id: classroom for classroom in snapshot.classrooms}
+    sections_by_id = {section.id: section for section in snapshot.sections}
+
+    kept_rows = []
+    stale_section_ids = {
+        section_id for section_id in rows_by_section if section_id not in sections_by_id
+    }
+
+    for section in checker.snapshot.sections_in_greedy_order():
+        rows = rows_by_section.get(section.id)
+        if not rows:
+            continue
+
+        window = matching_window(checker, section, rows)
+        classroom = classrooms_by_id.get(rows[0][1])
+        if (
+            window is None
+            or classroom is None
+            or not checker.is_valid(section, classroom, window[2])
+        ):
+            stale_section_ids.add(section.id)
+            continue
+
+        checker.assign(section, classroom.id, *window)
+        kept_rows.extend(rows)
+
+    return kept_rows, stale_section_ids
+
+
+def matching_window(engine, section, rows):
+    """
+    The (day, block_ids, mask) window a section's rows fill in one classroom, or None.
+    """
+    if len({classroom_id for _, classroom_id, _ in rows}) != 1:
+        return None
+    block_ids = frozenset(time_block_id for _, _, time_block_id in rows)
+    if len(block_ids) != len(rows):
+        return None
+    for window in engine.windows_of_length(section.credits):
+        if frozenset(window[1]) == block_ids:
+            return window
+    return None
@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import cache
+
+from flask import current_app
+
+from app.extensions import kanvas_db
+from app.models.schedule_job import ScheduleJob, ScheduleJobStatus
+from app.services.generate_schedule import ScheduleGenerationCancelled, generate_schedule
+
+DEFAULT_JOB_WORKERS = 1
+PROGRESS_INTERVAL = 0.5
+
+INTERRUPTED_JOB_ERROR = "La aplicación se reinició antes de que el trabajo terminara."
+
+_executor_lock = threading.Lock()
+
+
+class ScheduleJobError(Exception):
+    pass
+
+
+def submit_generation_job(options=None, incremental=False, term=None):
+    """
+    Queue a schedule generation and return its job id without waiting for it.
+
+    ``options`` (a GenerationOptions) and ``term`` are passed on to generate_schedule.
+
+    Jobs run on a thread pool of ``SCHEDULE_JOB_WORKERS`` threads, or in the
+    calling thread when ``SCHEDULE_JOBS_INLINE`` is set.
+    """
+    job = ScheduleJob(status=ScheduleJobStatus.PENDING, incremental=incremental)
+    kanvas_db.session.add(job)
+    kanvas_db.session.commit()
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    if app.config.get("SCHEDULE_JOBS_INLINE", False):
+        run_generation_job(job.id, options, term)
+    else:
+        executor = _get_executor(app.config.get("SCHEDULE_JOB_WORKERS", DEFAULT_JOB_WORKERS))
+        executor.submit(_run_in_app_context, app, job.id, options, term)
+    return job.id
+
+
+def _get_executor(workers):
+    with _executor_lock:
+        return _job_executor(workers)
+
+
+@cache
+def _job_executor(workers):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="schedule-job")
+
+
+def _run_in_app_context(app, job_id, options, term):
+    with app.app_context():
+        run_generation_job(job_id, options, term)
+
+
+def run_generation_job(job_id, options=None, term=None):
+    """
+    Run a queued job to completion, recording its outcome on the job row.
+    """
+    started = (
+        kanvas_db.session.query(ScheduleJob)
+        .filter(
+            ScheduleJob.id == job_id,
+            ScheduleJob.status == ScheduleJobStatus.PENDING,
+        )
+        .update(
+            {ScheduleJob.status: ScheduleJobStatus.RUNNING, ScheduleJob.started_at: datetime.now()},
+            synchronize_session=False,
+        )
+    )
+    kanvas_db.session.commit()
+    if not started:
+        return
+
+    incremental = (
+        kanvas_db.session.query(ScheduleJob.incremental).filter(ScheduleJob.id == job_id).scalar()
+    )
+    try:
+        placements = generate_schedule(
+            options, incremental=incremental, term=term, progress=_JobProgress(job_id)
+        )
+    except ScheduleGenerationCancelled:
+        _finish_job(job_id, ScheduleJobStatus.CANCELLED)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        kanvas_db.session.rollback()
+        _finish_job(job_id, ScheduleJobStatus.FAILED, error=str(e))
+    else:
+        _finish_job(job_id, ScheduleJobStatus.DONE, placed=len(placements))
+
+
+def fail_interrupted_jobs():
+    """
+    Mark the jobs a previous run of the app left queued or running as failed.
+
+    Jobs only live in the thread pool of the process that queued them, so
+    none of them can still be making progress once every process of the app
+    has stopped. Only safe then: a worker that is still up would keep
+    running its jobs. Called by ``app.db.fail_schedule_jobs`` as a deployment
+    step; returns the number of jobs marked.
+    """
+    failed = (
+        kanvas_db.session.query(ScheduleJob)
+        .filter(ScheduleJob.status.in_([ScheduleJobStatus.PENDING, ScheduleJobStatus.RUNNING]))
+        .update(
+            {
+                ScheduleJob.status: ScheduleJobStatus.FAILED,
+                ScheduleJob.error: INTERRUPTED_JOB_ERROR,
+                ScheduleJob.finished_at: datetime.now(),
+            },
+            synchronize_session=False,
+        )
+    )
+    kanvas_db.session.commit()
+    return failed
+
+
+def _finish_job(job_id, status, **values):
+    kanvas_db.session.query(ScheduleJob).filter(ScheduleJob.id == job_id).update(
+        {"status": status, "finished_at": datetime.now(), **values},
+        synchronize_session=False,
+    )
+    kanvas_db.session.commit()
+
+
+class _JobProgress:
+    """
+    Progress callback for generate_schedule that writes to the job row at most every ``interval``.
+
+    Each write also reads the cancellation flag and aborts the run if it is set.
+    """
+
+    def __init__(self, job_id, interval=PROGRESS_INTERVAL):
+        self.job_id = job_id
+        self.interval = interval
+        self._phase = None
+        self._last_write = 0.0
+
+    def __call__(self, phase, placed, total):
+        now = time.monotonic()
+        if phase == self._phase and now - self._last_write < self.interval:
+            return
+        self._phase = phase
+        self._last_write = now
+
+        kanvas_db.session.query(ScheduleJob).filter(ScheduleJob.id == self.job_id).update(
+            {"phase": phase, "placed": placed, "total": total}, synchronize_session=False
+        )
+        kanvas_db.session.commit()
+        cancel_requested = (
+            kanvas_db.session.query(ScheduleJob.cancel_requested)
+            .filter(ScheduleJob.id == self.job_id)
+            .scalar()
+        )
+        if cancel_requested:
+            raise ScheduleGenerationCancelled(f"Trabajo {self.job_id} cancelado.")
+
+
+def cancel_job(job_id):
+    """
+    Ask a job to stop.
+
+    Queued jobs are cancelled at once, running ones at their next progress report.
+    """
+    job = kanvas_db.session.get(ScheduleJob, job_id)
+    if job is None or job.is_finished:
+        raise ScheduleJobError(f"El trabajo {job_id} ya terminó.")
+
+    job.cancel_requested = True
+    if job.status == ScheduleJobStatus.PENDING:
+        job.status = ScheduleJobStatus.CANCELLED
+        job.finished_at = datetime.now()
+    kanvas_db.session.commit()
+
+
+def job_status(job):
+    return {
+        "id": job.id,
+        "status": job.status.name.lower(),
+        "status_label": str(job.status),
+        "phase": job.phase,
+        "placed": job.placed,
+        "total": job.total,
+        "elapsed": round(job.elapsed_seconds, 2),
+        "cancel_requested": job.cancel_requested,
+        "error": job.error,
+        "finished": job.is_finished,
+    }
@@ -0,0 +1,183 @@
+import math
+import random
+import time
+from collections import defaultdict, namedtuple
+
+from app.services.schedule_engine import ScheduleEngine
+from app.services.schedule_quality import ScheduleQuality, placements_from_rows
+
+DEFAULT_IMPROVE_TIME_BUDGET = 2.0
+DEFAULT_MAX_STALLED_MOVES = 5000
+DEFAULT_INITIAL_TEMPERATURE = 10.0
+SWAP_PROBABILITY = 0.3
+
+AnnealingConfig = namedtuple(
+    "AnnealingConfig",
+    ["time_budget", "max_stalled", "initial_temperature", "seed"],
+    defaults=(
+        DEFAULT_IMPROVE_TIME_BUDGET,
+        DEFAULT_MAX_STALLED_MOVES,
+        DEFAULT_INITIAL_TEMPERATURE,
+        0,
+    ),
+)
+
+
+def improve_schedule(snapshot, grid, placements, config=AnnealingConfig()):
+    """
+    Lower the ScheduleQuality score of a complete schedule with simulated annealing.
+
+    A move sends one section to another window of its length, in the
+    smallest free room that seats it; a swap exchanges the windows of two
+    sections with the same credits. Hard constraints are checked on the
+    engine's bitmasks and each move's score delta comes from ScheduleQuality,
+    so a move costs about as much as the section's enrollment. Worse moves are
+    accepted with a probability that falls as the temperature cools linearly
+    from ``config.initial_temperature`` over ``config.time_budget`` seconds;
+    the search also stops after ``config.max_stalled`` moves without a new
+    best. The snapshot's kept assignments never move.
+
+    Returns the best placements found, in the order of ``placements``.
+    """
+    if not placements or not config.time_budget:
+        return list(placements)
+
+    sections = {section.id: section for section in snapshot.sections}
+    engine = ScheduleEngine(snapshot, grid)
+    for placement in placements:
+        engine.assign(
+            sections[placement.section_id],
+            placement.classroom_id,
+            placement.day,
+            placement.block_ids,
+            engine.mask_of(placement.block_ids),
+        )
+    quality = ScheduleQuality(snapshot, grid, placements_from_rows(snapshot.assignments, grid))
+    for placement in engine.placements:
+        quality.add(placement)
+
+    best = _LocalSearch(engine, quality, sections, random.Random(config.seed)).anneal(config)
+    return [best[placement.section_id] for placement in placements]
+
+
+class _LocalSearch:
+    def __init__(self, engine, quality, sections, rng):
+        self.engine = engine
+        self.quality = quality
+        self.sections = sections
+        self.rng = rng
+        self.current = {placement.section_id: placement for placement in engine.placements}
+        self.movable = sorted(self.current)
+
+        by_credits = defaultdict(list)
+        for section_id in self.movable:
+            by_credits[sections[section_id].credits].append(section_id)
+        self.swappable = [ids for ids in by_credits.values() if len(ids) > 1]
+
+    def anneal(self, config):
+        """
+        Anneal as ``config`` says and return the best {section_id: placement} found.
+        """
+        best_total = self.quality.total
+        best = dict(self.current)
+        stalled = 0
+        started = time.monotonic()
+        while stalled < config.max_stalled:
+            elapsed = time.monotonic() - started
+            if elapsed >= config.time_budget:
+                break
+            temperature = config.initial_temperature * (1 - elapsed / config.time_budget)
+
+            delta, undo = self.random_neighbour()
+            if undo is None:
+                stalled += 1
+                continue
+            if delta > 0 and (
+                temperature <= 0 or self.rng.random() >= math.exp(-delta / temperature)
+            ):
+                undo()
+                stalled += 1
+                continue
+
+            if self.quality.total < best_total:
+                best_total = self.quality.total
+                best = dict(self.current)
+                stalled = 0
+            else:
+                stalled += 1
+        return best
+
+    def random_neighbour(self):
+        """
+        Apply a random move or swap; return (delta, undo), or (0, None) if it was infeasible.
+        """
+        if self.swappable and self.rng.random() < SWAP_PROBABILITY:
+            first_id, second_id = self.rng.sample(self.rng.choice(self.swappable), 2)
+            return self._swap(self.sections[first_id], self.sections[second_id])
+
+        section = self.sections[self.rng.choice(self.movable)]
+        day, block_ids, mask = self.rng.choice(self.engine.windows_of_length(section.credits))
+        return self._move([(section, day, block_ids, mask)])
+
+    def _swap(self, first, second):
+        first_slot = self.current[first.id]
+        second_slot = self.current[second.id]
+        if first_slot.block_ids == second_slot.block_ids:
+            return 0, None
+        return self._move(
+            [
+                (first, second_slot.day, second_slot.block_ids, None),
+                (second, first_slot.day, first_slot.block_ids, None),
+            ]
+        )
+
+    def _move(self, targets):
+        """
+        Move every (section, day, block_ids, mask) target at once, or none of them.
+        """
+        old = [self.current[section.id] for section, *_ in targets]
+        delta = 0
+        for (section, *_), placement in zip(targets, old):
+            self.engine.unassign(section, placement)
+            delta += self.quality.remove(placement)
+
+        new = []
+        for section, day, block_ids, mask in targets:
+            mask = mask if mask is not None else self.engine.mask_of(block_ids)
+            placement = self._try_assign(section, day, block_ids, mask)
+            if placement is None:
+                self._replace(new, old)
+                return 0, None
+            new.append(placement)
+            delta += self.quality.add(placement)
+
+        return delta, lambda: self._replace(new, old)
+
+    def _try_assign(self, section, day, block_ids, mask):
+        engine = self.engine
+        if engine.masks.teacher[section.teacher_id] & mask:
+            return None
+        if engine.masks.blocked[section.id] & mask:
+            return None
+        classroom = engine.rooms.best_fit(len(section.student_ids), mask)
+        if classroom is None:
+            return None
+        placement = engine.assign(section, classroom.id, day, block_ids, mask)
+        self.current[section.id] = placement
+        return placement
+
+    def _replace(self, removed, restored):
+        for placement in removed:
+            self.engine.unassign(self.sections[placement.section_id], placement)
+            self.quality.remove(placement)
+        for placement in restored:
+            section = self.sections[placement.section_id]
+            self.engine.assign(
+                section,
+                placement.classroom_id,
+                placement.day,
+                placement.block_ids,
+                self.engine.mask_of(placement.block_ids),
+            )
+            self.quality.add(placement)
+            self.current[section.id] = placement
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+CAPACITY_REJECTION = "capacity"
+ROOM_REJECTION = "room"
+TEACHER_REJECTION = "teacher"
+STUDENT_REJECTION = "student"
+REJECTION_REASONS = (CAPACITY_REJECTION, ROOM_REJECTION, TEACHER_REJECTION, STUDENT_REJECTION)
+
+
+class SolveStats:
+    """
+    Placement counters and phase times of one term's solve.
+
+    Engines count every candidate window they evaluate and why each rejected
+    window was rejected: no room seats the section at all (capacity), every
+    room that seats it is taken (room), or its teacher or one of its students
+    is busy. The object is plain and picklable, so terms solved in other
+    processes send it back with their placements.
+    """
+
+    def __init__(self):
+        self.sections = 0
+        self.candidates = 0
+        self.max_candidates = 0
+        self.rejections = dict.fromkeys(REJECTION_REASONS, 0)
+        self.seconds = defaultdict(float)
+
+    def record_section(self, candidates):
+        self.sections += 1
+        self.candidates += candidates
+        self.max_candidates = max(self.max_candidates, candidates)
+
+    @contextmanager
+    def timed(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - started
+
+    def merge(self, other):
+        self.sections += other.sections
+        self.candidates += other.candidates
+        self.max_candidates = max(self.max_candidates, other.max_candidates)
+        for reason, count in other.rejections.items():
+            self.rejections[reason] += count
+        for phase, seconds in other.seconds.items():
+            self.seconds[phase] += seconds
+
+
+class RunReport:
+    """
+    Wall time and SQL statements per phase of a generation run, plus its SolveStats.
+
+    Used as a context manager around the run: while it is open, every
+    statement the current thread sends through ``engine`` is counted towards
+    the open phase and the total. Phases solved in worker processes issue no
+    SQL and are added from their SolveStats with ``add_solve_stats``; their
+    seconds are summed over terms, so with parallel terms they can exceed the
+    wall time of the run.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.phases = {}
+        self.stats = SolveStats()
+        self.queries = 0
+        self._thread = None
+        self._started = None
+        self._seconds = None
+
+    def _count_query(self, *_args):
+        if threading.get_ident() == self._thread:
+            self.queries += 1
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        self._started = time.perf_counter()
+        event.listen(self.engine, "before_cursor_execute", self._count_query)
+        return self
+
+    def __exit__(self, *_exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._count_query)
+        self._seconds = time.perf_counter() - self._started
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        queries = self.queries
+        try:
+            yield
+        finally:
+            self._add_phase(name, time.perf_counter() - started, self.queries - queries)
+
+    def add_solve_stats(self, stats, phases):
+        self.stats.merge(stats)
+        for name in phases:
+            if name in stats.seconds:
+                self._add_phase(name, stats.seconds[name], 0)
+
+    def _add_phase(self, name, seconds, queries):
+        phase = self.phases.setdefault(name, {"seconds": 0.0, "queries": 0})
+        phase["seconds"] = round(phase["seconds"] + seconds, 6)
+        phase["queries"] += queries
+
+    def as_dict(self):
+        """
+        JSON-ready summary of the run, as stored on its schedule version.
+        """
+        stats = self.stats
+        seconds = self._seconds
+        if seconds is None:
+            seconds = time.perf_counter() - self._started
+        return {
+            "seconds": round(seconds, 6),
+            "queries": self.queries,
+            "phases": self.phases,
+            "sections": stats.sections,
+            "candidates": stats.candidates,
+            "candidates_per_section": (
+                round(stats.candidates / stats.sections, 2) if stats.sections else 0
+            ),
+            "max_candidates": stats.max_candidates,
+            "rejections": dict(stats.rejections),
+        }
@@ -0,0 +1,123 @@
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from app.services.schedule_engine import ScheduleEngine
+
+DEFAULT_ATTEMPTS = 16
+
+AttemptResult = namedtuple(
+    "AttemptResult", ["seed", "placements", "unplaced", "room_slack", "stats"], defaults=(None,)
+)
+MultistartOptions = namedtuple(
+    "MultistartOptions",
+    ["attempts", "workers", "time_budget", "stop_at_first_feasible"],
+    defaults=(DEFAULT_ATTEMPTS, None, None, True),
+)
+
+_worker_problem = {}
+
+
+def attempt_score(result):
+    """
+    Lower is better: fewest unplaced sections first, then least wasted seats.
+    """
+    return (len(result.unplaced), result.room_slack, result.seed)
+
+
+def run_greedy_attempt(snapshot, grid, seed):
+    """
+    Run one greedy pass, breaking enrollment/credit ties at random for seeds other than 0.
+    """
+    sections = snapshot.sections_in_greedy_order()
+    if seed:
+        rng = random.Random(seed)
+        tie_breaks = {section.id: rng.random() for section in sections}
+        sections.sort(
+            key=lambda section: (
+                -len(section.student_ids),
+                -section.credits,
+                tie_breaks[section.id],
+            )
+        )
+
+    engine = ScheduleEngine(snapshot, grid)
+    unplaced = [section.id for section in sections if engine.place(section) is None]
+
+    capacities = {classroom.id: classroom.capacity for classroom in snapshot.classrooms}
+    enrollments = {section.id: len(section.student_ids) for section in sections}
+    room_slack = sum(
+        capacities[placement.classroom_id] - enrollments[placement.section_id]
+        for placement in engine.placements
+    )
+    return AttemptResult(seed, engine.placements, unplaced, room_slack, engine.stats)
+
+
+def _init_worker(snapshot, grid):
+    _worker_problem["snapshot"] = snapshot
+    _worker_problem["grid"] = grid
+
+
+def _run_worker_attempt(seed):
+    return run_greedy_attempt(_worker_problem["snapshot"], _worker_problem["grid"], seed)
+
+
+def run_multistart(snapshot, grid, options=MultistartOptions(), on_result=None):
+    """
+    Run ``options.attempts`` randomized greedy passes and return the best AttemptResult.
+
+    The snapshot is shipped once to each worker process. Seed 0 is the plain
+    greedy order, so the result is never worse than a single greedy pass.
+    With ``stop_at_first_feasible`` the first complete schedule wins, and no
+    attempt starts after ``time_budget`` seconds; either way the pool is shut
+    down without waiting for the attempts still running. Returns None when
+    the budget ran out before any attempt finished. ``on_result`` is called
+    with the best result so far after every finished attempt.
+    """
+    on_result = on_result or (lambda _best: None)
+    deadline = time.monotonic() + options.time_budget if options.time_budget else None
+    workers = options.workers or os.cpu_count() or 1
+    if workers == 1:
+        return _run_sequential(snapshot, grid, options, deadline, on_result)
+
+    best = None
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, options.attempts),
+        initializer=_init_worker,
+        initargs=(snapshot, grid),
+    )
+    try:
+        pending = {executor.submit(_run_worker_attempt, seed) for seed in range(options.attempts)}
+        while pending:
+            timeout = max(deadline - time.monotonic(), 0) if deadline else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                best = _better(best, future.result())
+            on_result(best)
+            if options.stop_at_first_feasible and not best.unplaced:
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return best
+
+
+def _run_sequential(snapshot, grid, options, deadline, on_result):
+    best = None
+    for seed in range(options.attempts):
+        if deadline and time.monotonic() >= deadline:
+            break
+        best = _better(best, run_greedy_attempt(snapshot, grid, seed))
+        on_result(best)
+        if options.stop_at_first_feasible and not best.unplaced:
+            break
+    return best
+
+
+def _better(best, result):
+    if best is None or attempt_score(result) < attempt_score(best):
+        return result
+    return best
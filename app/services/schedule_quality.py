@@ -0,0 +1,172 @@
+from collections import Counter, defaultdict, namedtuple
+
+from app.services.schedule_engine import Placement
+
+IDLE_GAP_WEIGHT = 10
+TEACHER_DAY_WEIGHT = 5
+ROOM_SLACK_WEIGHT = 1
+
+ScheduleScore = namedtuple("ScheduleScore", ["total", "idle_gaps", "teacher_days", "room_slack"])
+
+
+class ScheduleQuality:
+    """
+    Soft-constraint score of a schedule, kept up to date as placements come and go.
+
+    Lower is better. The score adds up, with the weights above:
+
+    - idle gaps: free blocks between a student's first and last class of a day,
+    - teacher days: days on which each teacher has to come in,
+    - room slack: empty seats of every placement.
+
+    Each student keeps one bitmask per day with a bit per block position of
+    that day, so adding or removing a placement only touches the days of its
+    students and teacher, and ``add`` / ``remove`` return the score delta.
+    """
+
+    def __init__(self, snapshot, grid, placements=()):
+        self.sections = {section.id: section for section in snapshot.sections}
+        self.capacities = {classroom.id: classroom.capacity for classroom in snapshot.classrooms}
+        self.positions = _day_positions(grid)
+
+        self.student_days = defaultdict(int)
+        self.teacher_days = defaultdict(int)
+        # Running idle_gaps, teacher_days and room_slack, as in ScheduleScore.
+        self.counts = Counter()
+        for placement in placements:
+            self.add(placement)
+
+    @property
+    def total(self):
+        return (
+            IDLE_GAP_WEIGHT * self.counts["idle_gaps"]
+            + TEACHER_DAY_WEIGHT * self.counts["teacher_days"]
+            + ROOM_SLACK_WEIGHT * self.counts["room_slack"]
+        )
+
+    def score(self):
+        return ScheduleScore(
+            self.total,
+            self.counts["idle_gaps"],
+            self.counts["teacher_days"],
+            self.counts["room_slack"],
+        )
+
+    def add(self, placement):
+        """
+        Count ``placement`` in the score and return how much the total changed.
+        """
+        return self._update(placement, 1)
+
+    def remove(self, placement):
+        """
+        Stop counting ``placement`` and return how much the total changed.
+        """
+        return self._update(placement, -1)
+
+    def _update(self, placement, sign):
+        section = self.sections.get(placement.section_id)
+        if section is None or placement.classroom_id not in self.capacities:
+            return 0
+        day = placement.day
+        bits = 0
+        for time_block_id in placement.block_ids:
+            bits |= self.positions.get(time_block_id, 0)
+
+        gaps = 0
+        for student_id in section.student_ids:
+            key = (student_id, day)
+            before = self.student_days[key]
+            after = before | bits if sign > 0 else before & ~bits
+            self.student_days[key] = after
+            gaps += _idle_gaps(after) - _idle_gaps(before)
+
+        key = (section.teacher_id, day)
+        before = self.teacher_days[key]
+        self.teacher_days[key] = before + sign
+        days = int(self.teacher_days[key] > 0) - int(before > 0)
+
+        slack = sign * (self.capacities[placement.classroom_id] - len(section.student_ids))
+
+        self.counts.update(idle_gaps=gaps, teacher_days=days, room_slack=slack)
+        return IDLE_GAP_WEIGHT * gaps + TEACHER_DAY_WEIGHT * days + ROOM_SLACK_WEIGHT * slack
+
+
+def _day_positions(grid):
+    """
+    Bit of every block within its day, in start time order.
+    """
+    blocks_by_day = defaultdict(list)
+    for block in grid.blocks:
+        blocks_by_day[block.weekday].append(block)
+    return {
+        block.id: 1 << position
+        for day_blocks in blocks_by_day.values()
+        for position, block in enumerate(sorted(day_blocks, key=lambda block: block.start_time))
+    }
+
+
+def _idle_gaps(mask):
+    if not mask:
+        return 0
+    span = mask.bit_length() - (mask & -mask).bit_length() + 1
+    return span - bin(mask).count("1")
+
+
+def placements_from_rows(rows, grid):
+    """
+    Rebuild placements from (section_id, classroom_id, time_block_id) rows on ``grid``.
+
+    Rows of blocks outside the grid are skipped.
+    """
+    weekdays = {block.id: block.weekday for block in grid.blocks}
+    slots = {}
+    for section_id, classroom_id, time_block_id in rows:
+        if time_block_id not in weekdays:
+            continue
+        _classroom_id, _day, block_ids = slots.setdefault(
+            section_id, (classroom_id, weekdays[time_block_id], [])
+        )
+        block_ids.append(time_block_id)
+    return [
+        Placement(section_id, classroom_id, day, tuple(sorted(block_ids)))
+        for section_id, (classroom_id, day, block_ids) in slots.items()
+    ]
+
+
+def score_schedule(snapshot, grid, placements):
+    """
+    ScheduleScore of ``placements`` plus the snapshot's kept assignments.
+
+    Each (year, semester) term is scored on its own and the scores are
+    added up, so a student's or teacher's classes of different terms never
+    share a day.
+    """
+    return add_scores(score_terms(snapshot, grid, placements).values())
+
+
+def score_terms(snapshot, grid, placements):
+    """
+    {(year, semester): ScheduleScore} of ``placements`` plus the snapshot's kept assignments.
+    """
+    term_by_section = {section.id: section.term for section in snapshot.sections}
+    placements_by_term = defaultdict(list)
+    for placement in placements:
+        placements_by_term[term_by_section.get(placement.section_id)].append(placement)
+
+    scores = {}
+    for term, term_snapshot in snapshot.split_by_term().items():
+        quality = ScheduleQuality(
+            term_snapshot, grid, placements_from_rows(term_snapshot.assignments, grid)
+        )
+        for placement in placements_by_term[term]:
+            quality.add(placement)
+        scores[term] = quality.score()
+    return scores
+
+
+def add_scores(scores):
+    total = ScheduleScore(0, 0, 0, 0)
+    for score in scores:
+        total = ScheduleScore(*map(sum, zip(total, score)))
+    return total
@@ -0,0 +1,239 @@
+from collections import defaultdict, namedtuple
+
+from app.services.schedule_engine import ScheduleEngine, ScheduleSnapshot
+from app.services.schedule_incremental import matching_window
+from app.services.schedule_versions import (
+    get_active_version_id,
+    replace_version_rows,
+    rescore_version,
+)
+
+RepairResult = namedtuple(
+    "RepairResult", ["placements", "displaced_section_ids", "unplaced_section_ids"]
+)
+
+DEFAULT_MAX_DISPLACED = 1
+
+
+def repair_schedule(
+    snapshot,
+    grid,
+    removed_classroom_ids=(),
+    removed_teacher_blocks=(),
+    max_displaced=DEFAULT_MAX_DISPLACED,
+):
+    """
+    Place again the sections of ``snapshot.assignments`` that lost their classroom or teacher.
+
+    ``removed_teacher_blocks`` holds (teacher_id, time_block_id) pairs the
+    teacher can no longer teach. Every other section keeps its slot: an
+    affected section first goes to the earliest window with a free room, as
+    in the greedy pass, and only when there is none may it take a slot held by
+    up to ``max_displaced`` sections, which are then placed again elsewhere.
+    Options displacing fewer sections are tried first. Occupancy is the
+    engine's bitmasks plus an index of the sections in each block, so no
+    candidate scans the whole schedule.
+
+    Returns a RepairResult with the new placements of every section that
+    moved, the ids of the unaffected sections that had to move and the ids of
+    the affected sections that could not be placed.
+    """
+    removed_classroom_ids = set(removed_classroom_ids)
+    unavailable = defaultdict(int)
+    for teacher_id, time_block_id in removed_teacher_blocks:
+        unavailable[teacher_id] |= grid.mask_of([time_block_id])
+
+    engine = ScheduleEngine(
+        ScheduleSnapshot(
+            snapshot.sections,
+            [
+                classroom
+                for classroom in snapshot.classrooms
+                if classroom.id not in removed_classroom_ids
+            ],
+            snapshot.time_blocks,
+        ),
+        grid,
+    )
+    repair = _Repair(engine, unavailable, max_displaced)
+
+    affected = repair.keep_unaffected(snapshot.assignments, removed_classroom_ids)
+
+    moved = set()
+    unplaced = []
+    for section in sorted(
+        affected, key=lambda section: (-len(section.student_ids), -section.credits)
+    ):
+        if repair.place(section) or repair.place_displacing(section):
+            moved.add(section.id)
+        else:
+            unplaced.append(section.id)
+
+    return RepairResult(
+        [repair.placed[section_id] for section_id in sorted(moved | repair.displaced)],
+        sorted(repair.displaced - moved),
+        unplaced,
+    )
+
+
+class _Repair:
+    def __init__(self, engine, unavailable, max_displaced):
+        self.engine = engine
+        self.unavailable = unavailable
+        self.max_displaced = max_displaced
+        self.sections = {section.id: section for section in engine.snapshot.sections}
+        self.placed = {}
+        self.displaced = set()
+        self.occupants = {block.id: set() for block in engine.grid.blocks}
+
+    def keep_unaffected(self, assignments, removed_classroom_ids):
+        """
+        Assign again the sections whose slot survives, and return the affected ones.
+
+        The removed teacher blocks are then marked busy for the search of new slots.
+        """
+        engine = self.engine
+        rows_by_section = defaultdict(list)
+        for row in assignments:
+            rows_by_section[row[0]].append(row)
+        affected = []
+        for section_id, rows in rows_by_section.items():
+            section = self.sections.get(section_id)
+            if section is None:
+                continue
+            window = matching_window(engine, section, rows)
+            if (
+                window is None
+                or rows[0][1] in removed_classroom_ids
+                or self.unavailable[section.teacher_id] & window[2]
+            ):
+                affected.append(section)
+                continue
+            self.assign(section, rows[0][1], *window)
+        for teacher_id, mask in self.unavailable.items():
+            engine.masks.teacher[teacher_id] |= mask
+        return affected
+
+    def assign(self, section, classroom_id, day, block_ids, mask):
+        return self._track(self.engine.assign(section, classroom_id, day, block_ids, mask))
+
+    def place(self, section):
+        placement = self.engine.place(section)
+        return placement and self._track(placement)
+
+    def unassign(self, section_id):
+        placement = self.placed.pop(section_id)
+        self.engine.unassign(self.sections[section_id], placement)
+        for time_block_id in placement.block_ids:
+            self.occupants[time_block_id].discard(section_id)
+        return placement
+
+    def _track(self, placement):
+        self.placed[placement.section_id] = placement
+        for time_block_id in placement.block_ids:
+            self.occupants[time_block_id].add(placement.section_id)
+        return placement
+
+    def place_displacing(self, section):
+        """
+        Place ``section`` where it displaces the fewest sections that can move elsewhere.
+        """
+        for blockers, classroom_id, window in self._displacing_options(section):
+            old = [self.unassign(section_id) for section_id in blockers]
+            placement = self.assign(section, classroom_id, *window)
+            relocated = []
+            for section_id in sorted(
+                blockers, key=lambda section_id: -len(self.sections[section_id].student_ids)
+            ):
+                if not self.place(self.sections[section_id]):
+                    break
+                relocated.append(section_id)
+            if len(relocated) == len(blockers):
+                self.displaced |= blockers
+                return placement
+
+            for section_id in relocated + [section.id]:
+                self.unassign(section_id)
+            for previous in old:
+                self.assign(
+                    self.sections[previous.section_id],
+                    previous.classroom_id,
+                    previous.day,
+                    previous.block_ids,
+                    self.engine.mask_of(previous.block_ids),
+                )
+        return None
+
+    def _displacing_options(self, section):
+        """
+        (blockers, classroom_id, window) options for ``section``, fewest blockers first.
+        """
+        engine = self.engine
+        rooms = engine.rooms.fitting(len(section.student_ids))
+        neighbours = engine.snapshot.conflict_graph.neighbours(section.id)
+        options = []
+        for window in engine.windows_of_length(section.credits):
+            if self.unavailable[section.teacher_id] & window[2]:
+                continue
+            overlapping = set()
+            for time_block_id in window[1]:
+                overlapping |= self.occupants[time_block_id]
+            people = {
+                section_id
+                for section_id in overlapping
+                if section_id in neighbours
+                or self.sections[section_id].teacher_id == section.teacher_id
+            }
+            if len(people) > self.max_displaced:
+                continue
+            rooms_taken = defaultdict(set)
+            for section_id in overlapping:
+                rooms_taken[self.placed[section_id].classroom_id].add(section_id)
+            for classroom in rooms:
+                blockers = people | rooms_taken[classroom.id]
+                if len(blockers) <= self.max_displaced:
+                    options.append((len(blockers), len(options), blockers, classroom.id, window))
+        options.sort(key=lambda option: option[:2])
+        return [
+            (blockers, classroom_id, window) for _, _, blockers, classroom_id, window in options
+        ]
+
+
+def repair_active_schedule(grid, classroom_ids=(), teacher_blocks=()):
+    """
+    Repair the active schedule in place for removed classrooms and (teacher_id, time_block_id)s.
+
+    Each term is repaired on its own with repair_schedule and only the rows
+    of the sections that moved or could not be placed are rewritten; the
+    quality score of their terms is recomputed. Does not commit, so the
+    caller can delete the resources in the same transaction; call
+    invalidate_schedule_cache after committing. Returns a RepairResult,
+    or None without an active schedule.
+    """
+    version_id = get_active_version_id()
+    if version_id is None:
+        return None
+
+    snapshot = ScheduleSnapshot.load(version_id, time_blocks=grid.blocks)
+    placements, displaced, unplaced = [], [], []
+    for term_snapshot in snapshot.split_by_term().values():
+        result = repair_schedule(term_snapshot, grid, classroom_ids, teacher_blocks)
+        placements.extend(result.placements)
+        displaced.extend(result.displaced_section_ids)
+        unplaced.extend(result.unplaced_section_ids)
+
+    changed = [placement.section_id for placement in placements] + unplaced
+    if changed:
+        terms = {section.id: section.term for section in snapshot.sections}
+        replace_version_rows(
+            version_id,
+            changed,
+            (
+                (placement.section_id, placement.classroom_id, time_block_id)
+                for placement in placements
+                for time_block_id in placement.block_ids
+            ),
+            terms,
+        )
+        rescore_version(version_id, grid, {terms[section_id] for section_id in changed})
+    return RepairResult(placements, displaced, unplaced)
@@ -0,0 +1,74 @@
+from bisect import bisect_left
+
+
+class ClassroomIndex:
+    """
+    Classrooms sorted by capacity, with the free rooms of every time block as a bitmask.
+
+    Bit ``i`` of a free-room set stands for ``rooms[i]``, so the rooms free for
+    a whole window are the AND of its blocks' sets, and the smallest free room
+    that seats a section is the lowest set bit at or above the bisected
+    capacity position.
+    """
+
+    def __init__(self, classrooms, block_count):
+        self.rooms = sorted(classrooms, key=lambda classroom: (classroom.capacity, classroom.id))
+        self.capacities = [classroom.capacity for classroom in self.rooms]
+        self.positions = {classroom.id: index for index, classroom in enumerate(self.rooms)}
+        self._all_rooms = (1 << len(self.rooms)) - 1
+        self.free = [self._all_rooms] * block_count
+
+    def fitting(self, size):
+        """
+        Rooms that seat ``size`` students, smallest first.
+        """
+        return self.rooms[bisect_left(self.capacities, size) :]
+
+    def seats(self, size):
+        """
+        Whether any room seats ``size`` students, free or not.
+        """
+        return bisect_left(self.capacities, size) < len(self.rooms)
+
+    def best_fit(self, size, mask):
+        """
+        The smallest room seating ``size`` students that is free in every block of ``mask``.
+        """
+        free = self._all_rooms
+        for index in _bit_indices(mask):
+            free &= self.free[index]
+        free &= ~((1 << bisect_left(self.capacities, size)) - 1)
+        if not free:
+            return None
+        return self.rooms[(free & -free).bit_length() - 1]
+
+    def is_free(self, classroom_id, mask):
+        """
+        Whether the classroom is free in every block of ``mask``; unknown rooms never are.
+        """
+        position = self.positions.get(classroom_id)
+        if position is None:
+            return False
+        bit = 1 << position
+        return all(self.free[index] & bit for index in _bit_indices(mask))
+
+    def occupy(self, classroom_id, mask):
+        position = self.positions.get(classroom_id)
+        if position is None:
+            return
+        for index in _bit_indices(mask):
+            self.free[index] &= ~(1 << position)
+
+    def release(self, classroom_id, mask):
+        position = self.positions.get(classroom_id)
+        if position is None:
+            return
+        for index in _bit_indices(mask):
+            self.free[index] |= 1 << position
+
+
+def _bit_indices(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
@@ -0,0 +1,230 @@
+import time
+from collections import defaultdict, namedtuple
+
+DEFAULT_TIME_BUDGET = 30.0
+DEFAULT_MAX_BACKTRACKS = 100000
+
+# What one ``solve`` call searches over: sections, suitable rooms (smallest
+# first) and related sections (shared teacher or student), all by section id.
+_Problem = namedtuple("_Problem", ["sections", "rooms", "related"])
+
+
+class _SearchAborted(Exception):
+    pass
+
+
+class BacktrackingSolver:
+    """
+    Complete search over the same occupancy engine used by the greedy scheduler.
+
+    Sections are picked most-constrained first (fewest remaining windows, then
+    most conflicts). After each placement the windows of the sections sharing
+    its teacher or a student are pruned, and any window left without a free
+    classroom is dropped, so dead ends are detected before recursing. The search
+    stops after ``max_backtracks`` undone placements or ``time_budget`` seconds.
+    ``on_progress`` is called with the number of placed sections at every node.
+    Every window tried is counted as a candidate on the engine's SolveStats.
+    """
+
+    def __init__(
+        self,
+        engine,
+        time_budget=DEFAULT_TIME_BUDGET,
+        max_backtracks=DEFAULT_MAX_BACKTRACKS,
+        on_progress=None,
+    ):
+        self.engine = engine
+        self.time_budget = time_budget
+        self.max_backtracks = max_backtracks
+        self.on_progress = on_progress
+        self.backtracks = 0
+        self._deadline = None
+        self._problem = _Problem({}, {}, {})
+
+    def solve(self, sections):
+        """
+        Place every section, returning True on success and False if the search gave up.
+        """
+        self._deadline = time.monotonic() + self.time_budget
+        self.backtracks = 0
+        self._problem = _Problem(
+            {section.id: section for section in sections},
+            {section.id: self._suitable_rooms(section) for section in sections},
+            self._related_sections(sections),
+        )
+        self.engine.stats.sections += len(sections)
+
+        domains = {}
+        for section in sections:
+            domain = [
+                window
+                for window in self.engine.windows_of_length(section.credits)
+                if self._is_open(section, window[2])
+            ]
+            if not domain:
+                return False
+            domains[section.id] = domain
+
+        try:
+            return self._search(domains)
+        except _SearchAborted:
+            return False
+
+    def _suitable_rooms(self, section):
+        return self.engine.rooms.fitting(len(section.student_ids))
+
+    def _related_sections(self, sections):
+        by_teacher = defaultdict(set)
+        for section in sections:
+            by_teacher[section.teacher_id].add(section.id)
+
+        graph = self.engine.snapshot.conflict_graph
+        return {
+            section.id: (by_teacher[section.teacher_id] | graph.neighbours(section.id))
+            - {section.id}
+            for section in sections
+        }
+
+    def _is_open(self, section, mask):
+        engine = self.engine
+        if engine.masks.teacher[section.teacher_id] & mask:
+            return False
+        if engine.masks.blocked[section.id] & mask:
+            return False
+        return self._free_room(section, mask) is not None
+
+    def _free_room(self, section, mask, start=0):
+        rooms = self._problem.rooms[section.id]
+        for index in range(start, len(rooms)):
+            if self.engine.rooms.is_free(rooms[index].id, mask):
+                return index
+        return None
+
+    def _check_limits(self):
+        if self.on_progress is not None:
+            self.on_progress(len(self.engine.placements))
+        if self.backtracks > self.max_backtracks or time.monotonic() > self._deadline:
+            raise _SearchAborted()
+
+    def _pick_section(self, domains):
+        return min(
+            domains,
+            key=lambda section_id: (
+                len(domains[section_id]),
+                -len(self._problem.related[section_id]),
+                section_id,
+            ),
+        )
+
+    def _search(self, domains):
+        """
+        Depth-first search over an explicit stack of _Node, one per placed section.
+
+        ``domains`` holds the windows of the sections still to place and is
+        narrowed and restored in place, so the search needs no recursion and
+        copies only the domains a placement actually prunes.
+        """
+        if not domains:
+            return True
+        self._check_limits()
+        stack = [self._open_node(domains)]
+        while stack:
+            node = stack[-1]
+            if not self._advance(node, domains):
+                stack.pop()
+                domains[node.section.id] = node.windows
+                continue
+            if not domains:
+                return True
+            self._check_limits()
+            stack.append(self._open_node(domains))
+        return False
+
+    def _open_node(self, domains):
+        section_id = self._pick_section(domains)
+        return _Node(self._problem.sections[section_id], domains.pop(section_id))
+
+    def _advance(self, node, domains):
+        """
+        Move ``node`` to its next window and room that survives forward checking.
+
+        Undoes the node's current placement first, if any. Returns False once
+        every window and room of the section has been tried.
+        """
+        section = node.section
+        resume = node.placement is not None
+        room_index = None
+        if resume:
+            domains.update(node.trail)
+            self.engine.unassign(section, node.placement)
+            node.placement = None
+            self.backtracks += 1
+            self._check_limits()
+            room_index = self._free_room(section, node.windows[node.window][2], node.room + 1)
+
+        while node.window < len(node.windows):
+            day, block_ids, mask = node.windows[node.window]
+            if not resume:
+                self.engine.stats.candidates += 1
+                room_index = self._free_room(section, mask)
+            resume = False
+            while room_index is not None:
+                classroom = self._problem.rooms[section.id][room_index]
+                placement = self.engine.assign(section, classroom.id, day, block_ids, mask)
+
+                trail = self._forward_check(section.id, mask, domains)
+                if trail is not None:
+                    node.room, node.placement, node.trail = room_index, placement, trail
+                    return True
+
+                self.engine.unassign(section, placement)
+                self.backtracks += 1
+                self._check_limits()
+                room_index = self._free_room(section, mask, room_index + 1)
+            node.window += 1
+        return False
+
+    def _forward_check(self, section_id, mask, domains):
+        """
+        Drop windows made impossible by the last placement from ``domains``, in place.
+
+        Returns the replaced domains as {section_id: previous domain}, to undo
+        the pruning with ``domains.update``, or None on a wipe-out, in which
+        case ``domains`` is left untouched.
+        """
+        related = self._problem.related[section_id]
+        pruned = {}
+        for other_id, domain in domains.items():
+            if not any(window[2] & mask for window in domain):
+                continue
+
+            other = self._problem.sections[other_id]
+            if other_id in related:
+                domain = [window for window in domain if not window[2] & mask]
+            else:
+                domain = [
+                    window
+                    for window in domain
+                    if not window[2] & mask or self._free_room(other, window[2]) is not None
+                ]
+            if not domain:
+                return None
+            pruned[other_id] = domain
+        trail = {other_id: domains[other_id] for other_id in pruned}
+        domains.update(pruned)
+        return trail
+
+
+class _Node:
+    """
+    One section on the search stack: its windows, the window and room being tried, and the
+    domains its placement pruned.
+    """
+
+    def __init__(self, section, windows):
+        self.section = section
+        self.windows = windows
+        self.window = 0
+        self.room = None
+        self.placement = None
+        self.trail = {}
@@ -0,0 +1,66 @@
+from app.extensions import kanvas_db
+from app.models.classroom import Classroom
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.models.user import User
+from app.services.schedule_export import schedule_rows
+from app.services.schedule_grid import LEGACY_LAST_DAY, WEEKDAYS
+
+STUDENT_TIMETABLE = "student"
+TEACHER_TIMETABLE = "teacher"
+CLASSROOM_TIMETABLE = "classroom"
+
+TIMETABLE_LABELS = {
+    STUDENT_TIMETABLE: "Estudiante",
+    TEACHER_TIMETABLE: "Profesor",
+    CLASSROOM_TIMETABLE: "Sala",
+}
+
+
+def timetable_for(kind, owner_id, term=None):
+    """
+    Return (owner name, weekly timetable) for a student, teacher or classroom, or None.
+
+    Three queries whatever the size of the term: the owner's name, the active
+    version and the owner's sections, found through the student_sections
+    student index or the assigned_time_blocks indexes.
+    """
+    name = _owner_name(kind, owner_id)
+    if name is None:
+        return None
+    filters = {
+        STUDENT_TIMETABLE: {"student_id": owner_id},
+        TEACHER_TIMETABLE: {"teacher_id": owner_id},
+        CLASSROOM_TIMETABLE: {"classroom_id": owner_id},
+    }[kind]
+    return name, weekly_timetable(schedule_rows(term=term, **filters))
+
+
+def _owner_name(kind, owner_id):
+    if kind == CLASSROOM_TIMETABLE:
+        return kanvas_db.session.query(Classroom.name).filter(Classroom.id == owner_id).scalar()
+    model = Student if kind == STUDENT_TIMETABLE else Teacher
+    row = (
+        kanvas_db.session.query(User.first_name, User.last_name)
+        .join(model, model.user_id == User.id)
+        .filter(model.id == owner_id)
+        .first()
+    )
+    return f"{row.first_name} {row.last_name}" if row else None
+
+
+def weekly_timetable(rows):
+    """
+    Group schedule rows by weekday, in week order and by start time within a day.
+
+    Monday to Friday are always present; other days only when they have classes.
+    """
+    days = {day_name: [] for day_num, day_name in WEEKDAYS.items() if day_num <= LEGACY_LAST_DAY}
+    for row in rows:
+        days.setdefault(row["weekday"], []).append(row)
+
+    order = {day_name: day_num for day_num, day_name in WEEKDAYS.items()}
+    return {
+        day_name: sorted(entries, key=lambda entry: entry["start_time"])
+        for day_name, entries in sorted(days.items(), key=lambda day: order.get(day[0], 0))
+    }
@@ -0,0 +1,295 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, insert, literal, not_, select
+
+from app.extensions import kanvas_db
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.course_instance import Semester
+from app.models.schedule_version import ScheduleVersion, ScheduleVersionStatus
+from app.services.schedule_engine import ScheduleSnapshot
+from app.services.schedule_quality import ScheduleScore, add_scores, score_terms
+from app.utils.bulk_sql import insert_rows
+
+DEFAULT_VERSIONS_KEPT = 5
+STALE_BUILD_AGE = timedelta(hours=1)
+
+
+class ScheduleVersionError(Exception):
+    pass
+
+
+def version_rows(version_id, assignments, terms):
+    """
+    AssignedTimeBlock rows of ``version_id`` for (section_id, classroom_id, time_block_id) triples.
+
+    ``terms`` maps every section id to its (year, semester) term.
+    """
+    return [
+        {
+            "version_id": version_id,
+            "section_id": section_id,
+            "classroom_id": classroom_id,
+            "time_block_id": time_block_id,
+            "year": terms[section_id][0],
+            "semester": Semester(terms[section_id][1]),
+        }
+        for section_id, classroom_id, time_block_id in assignments
+    ]
+
+
+def copy_version_rows(source_version_id, version_id, skipped_terms=(), skipped_section_ids=()):
+    """
+    Copy the rows of ``source_version_id`` into ``version_id`` with one INSERT ... SELECT.
+
+    Rows of the ``skipped_terms`` (year, semester)s and ``skipped_section_ids``
+    are left out. The rows never leave the database.
+    """
+    query = select(
+        literal(version_id),
+        AssignedTimeBlock.section_id,
+        AssignedTimeBlock.classroom_id,
+        AssignedTimeBlock.time_block_id,
+        AssignedTimeBlock.year,
+        AssignedTimeBlock.semester,
+    ).where(AssignedTimeBlock.version_id == source_version_id)
+    for year, semester in skipped_terms:
+        query = query.where(
+            not_(
+                and_(
+                    AssignedTimeBlock.year == year,
+                    AssignedTimeBlock.semester == Semester(semester),
+                )
+            )
+        )
+    if skipped_section_ids:
+        query = query.where(AssignedTimeBlock.section_id.notin_(list(skipped_section_ids)))
+    kanvas_db.session.execute(
+        insert(AssignedTimeBlock).from_select(
+            ["version_id", "section_id", "classroom_id", "time_block_id", "year", "semester"],
+            query,
+        )
+    )
+
+
+def replace_version_rows(version_id, removed, added, terms):
+    """
+    Replace the rows of the ``removed`` section ids of ``version_id`` by the ``added`` triples.
+
+    ``added`` holds (section_id, classroom_id, time_block_id) triples and
+    ``terms`` maps their sections to their (year, semester) term. The
+    version is marked as edited. The caller commits.
+    """
+    kanvas_db.session.query(AssignedTimeBlock).filter(
+        AssignedTimeBlock.version_id == version_id,
+        AssignedTimeBlock.section_id.in_(list(removed)),
+    ).delete(synchronize_session=False)
+    insert_rows(AssignedTimeBlock, version_rows(version_id, added, terms))
+    kanvas_db.session.query(ScheduleVersion).filter(ScheduleVersion.id == version_id).update(
+        {ScheduleVersion.edited_at: datetime.now()}, synchronize_session=False
+    )
+
+
+def get_active_version_id():
+    """
+    Return the id of the schedule version readers should see, or None.
+    """
+    return (
+        kanvas_db.session.query(ScheduleVersion.id)
+        .filter(ScheduleVersion.is_active.is_(True))
+        .scalar()
+    )
+
+
+def create_version():
+    """
+    Open a new, inactive version for a generation run and commit it.
+    """
+    version = ScheduleVersion(status=ScheduleVersionStatus.BUILDING, is_active=False)
+    kanvas_db.session.add(version)
+    kanvas_db.session.commit()
+    return version.id
+
+
+def activate_version(version_id):
+    """
+    Point readers at ``version_id``. The caller commits, so the flip lands with its rows.
+    """
+    kanvas_db.session.query(ScheduleVersion).filter(ScheduleVersion.id == version_id).update(
+        {
+            ScheduleVersion.status: ScheduleVersionStatus.READY,
+            ScheduleVersion.activated_at: datetime.now(),
+        },
+        synchronize_session=False,
+    )
+    kanvas_db.session.query(ScheduleVersion).update(
+        {ScheduleVersion.is_active: ScheduleVersion.id == version_id},
+        synchronize_session=False,
+    )
+
+
+def record_version_score(version_id, term_scores):
+    """
+    Store {(year, semester): ScheduleScore} on ``version_id``, with their sum. The caller commits.
+
+    The per-term scores are kept under ``terms`` so an edit only rescores
+    the terms it touched, see rescore_version.
+    """
+    score = {
+        **add_scores(term_scores.values())._asdict(),
+        "terms": {
+            _term_key(term): term_score._asdict() for term, term_score in term_scores.items()
+        },
+    }
+    kanvas_db.session.query(ScheduleVersion).filter(ScheduleVersion.id == version_id).update(
+        {ScheduleVersion.score: score}, synchronize_session=False
+    )
+
+
+def rescore_version(version_id, grid, terms):
+    """
+    Recompute the stored score of ``version_id`` after its rows of ``terms`` changed.
+
+    Only the sections and rows of those (year, semester) terms are loaded
+    and scored; the other terms keep their stored scores. A version stored
+    without per-term scores is scored whole. The caller commits.
+    """
+    stored = (
+        kanvas_db.session.query(ScheduleVersion.score)
+        .filter(ScheduleVersion.id == version_id)
+        .scalar()
+    )
+    if not stored or "terms" not in stored:
+        snapshot = ScheduleSnapshot.load(version_id, time_blocks=grid.blocks)
+        record_version_score(version_id, score_terms(snapshot, grid, []))
+        return
+
+    term_scores = {
+        _parse_term_key(key): ScheduleScore(**value) for key, value in stored["terms"].items()
+    }
+    for term in set(terms):
+        snapshot = ScheduleSnapshot.load(version_id, time_blocks=grid.blocks, term=term)
+        term_scores.update(score_terms(snapshot, grid, []))
+    record_version_score(version_id, term_scores)
+
+
+def _term_key(term):
+    return f"{term[0]}-{term[1]}"
+
+
+def _parse_term_key(key):
+    year, _, semester = key.partition("-")
+    return (int(year), int(semester))
+
+
+def record_version_report(version_id, report):
+    """
+    Store the RunReport summary of the run that built ``version_id``. The caller commits.
+    """
+    kanvas_db.session.query(ScheduleVersion).filter(ScheduleVersion.id == version_id).update(
+        {ScheduleVersion.report: report}, synchronize_session=False
+    )
+
+
+def get_active_version():
+    return ScheduleVersion.query.filter(ScheduleVersion.is_active.is_(True)).first()
+
+
+def rollback_to_version(version_id):
+    """
+    Make a previous ready version the active one again.
+    """
+    version = kanvas_db.session.get(ScheduleVersion, version_id)
+    if version is None or version.status != ScheduleVersionStatus.READY:
+        raise ScheduleVersionError(f"La versión {version_id} no está disponible.")
+    activate_version(version_id)
+    kanvas_db.session.commit()
+
+
+def mark_version_failed(version_id):
+    kanvas_db.session.query(ScheduleVersion).filter(ScheduleVersion.id == version_id).update(
+        {ScheduleVersion.status: ScheduleVersionStatus.FAILED}, synchronize_session=False
+    )
+    kanvas_db.session.commit()
+
+
+def prune_versions(keep=DEFAULT_VERSIONS_KEPT, stale_after=STALE_BUILD_AGE):
+    """
+    Delete old versions and their rows; the active one always stays.
+
+    The ``keep`` newest ready versions are kept for rollback and, counted
+    apart so failed runs never push them out, the ``keep`` newest failed
+    ones for their reports. Versions still building after ``stale_after``
+    were left behind by a crashed run and are deleted as well.
+    """
+    obsolete_ids = [
+        version_id
+        for status in (ScheduleVersionStatus.READY, ScheduleVersionStatus.FAILED)
+        for version_id, is_active in kanvas_db.session.query(
+            ScheduleVersion.id, ScheduleVersion.is_active
+        )
+        .filter(ScheduleVersion.status == status)
+        .order_by(ScheduleVersion.id.desc())
+        .offset(keep)
+        if not is_active
+    ]
+    obsolete_ids.extend(
+        version_id
+        for (version_id,) in kanvas_db.session.query(ScheduleVersion.id).filter(
+            ScheduleVersion.status == ScheduleVersionStatus.BUILDING,
+            ScheduleVersion.created_at < datetime.now() - stale_after,
+        )
+    )
+    if not obsolete_ids:
+        return
+
+    kanvas_db.session.query(AssignedTimeBlock).filter(
+        AssignedTimeBlock.version_id.in_(obsolete_ids)
+    ).delete(synchronize_session=False)
+    kanvas_db.session.query(ScheduleVersion).filter(ScheduleVersion.id.in_(obsolete_ids)).delete(
+        synchronize_session=False
+    )
+    kanvas_db.session.commit()
+
+
+def list_versions():
+    """
+    Return (version, section_count) pairs, newest first.
+    """
+    counts = dict(
+        kanvas_db.session.query(
+            AssignedTimeBlock.version_id,
+            kanvas_db.func.count(kanvas_db.distinct(AssignedTimeBlock.section_id)),
+        ).group_by(AssignedTimeBlock.version_id)
+    )
+    versions = ScheduleVersion.query.order_by(ScheduleVersion.id.desc()).all()
+    return [(version, counts.get(version.id, 0)) for version in versions]
+
+
+def _slots_by_section(version_id):
+    slots = defaultdict(lambda: [None, set()])
+    for section_id, classroom_id, time_block_id in kanvas_db.session.query(
+        AssignedTimeBlock.section_id,
+        AssignedTimeBlock.classroom_id,
+        AssignedTimeBlock.time_block_id,
+    ).filter(AssignedTimeBlock.version_id == version_id):
+        slots[section_id][0] = classroom_id
+        slots[section_id][1].add(time_block_id)
+    return {section_id: (room, frozenset(blocks)) for section_id, (room, blocks) in slots.items()}
+
+
+def diff_versions(old_version_id, new_version_id):
+    """
+    Compare two versions section by section: added, removed and moved section ids.
+    """
+    old = _slots_by_section(old_version_id)
+    new = _slots_by_section(new_version_id)
+    return {
+        "added": sorted(new.keys() - old.keys()),
+        "removed": sorted(old.keys() - new.keys()),
+        "moved": sorted(
+            section_id
+            for section_id in old.keys() & new.keys()
+            if old[section_id] != new[section_id]
+        ),
+    }
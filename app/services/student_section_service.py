@@ -5,6 +5,7 @@ from app.extensions import kanvas_db
 from app.models.section import Section
 from app.models.student import Student
 from app.models.student_section import StudentSection
+from app.services.grade_subtotals import refresh_subtotals
 
 
 def get_students_not_in_section(section_id):
@@ -28,6 +29,7 @@ def add_student_to_section(student_id, section_id):
     new_student_section = StudentSection(student_id=student_id, section_id=section_id)
     try:
         kanvas_db.session.add(new_student_section)
+        refresh_subtotals([section_id], [student_id])
         kanvas_db.session.commit()
         return True
     except SQLAlchemyError as e:
@@ -42,6 +44,7 @@ def remove_student_from_section(section_id, student_id):
     ).first()
     try:
         kanvas_db.session.delete(student_section)
+        refresh_subtotals([section_id], [student_id])
         kanvas_db.session.commit()
         return True
     except SQLAlchemyError as e:
@@ -0,0 +1,43 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app.extensions import kanvas_db
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def insert_rows(model, rows):
+    """
+    Insert many rows of ``model`` as one executemany instead of one ORM add per row.
+    """
+    if rows:
+        kanvas_db.session.execute(insert(model), rows)
+
+
+def upsert_rows(model, rows, key_columns, update_columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert rows, updating ``update_columns`` of the rows whose ``key_columns`` already exist.
+
+    Every chunk is a single multi-row INSERT ... ON DUPLICATE KEY UPDATE (MySQL)
+    or INSERT ... ON CONFLICT DO UPDATE (SQLite, PostgreSQL).
+    """
+    dialect = kanvas_db.session.get_bind().dialect.name
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        if dialect == "mysql":
+            statement = mysql.insert(model).values(chunk)
+            statement = statement.on_duplicate_key_update(
+                {column: statement.inserted[column] for column in update_columns}
+            )
+        elif dialect in ("sqlite", "postgresql"):
+            dialect_module = sqlite if dialect == "sqlite" else postgresql
+            statement = dialect_module.insert(model).values(chunk)
+            statement = statement.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={column: statement.excluded[column] for column in update_columns},
+            )
+        else:
+            for row in chunk:
+                kanvas_db.session.merge(model(**row))
+            continue
+        kanvas_db.session.execute(statement)
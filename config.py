@@ -16,3 +16,26 @@ class Config:
     SECRET_KEY = os.urandom(24)
 
     DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
+
+    SCHEDULE_SOLVER_FALLBACK = os.getenv("SCHEDULE_SOLVER_FALLBACK", "True").lower() in (
+        "true",
+        "1",
+        "t",
+    )
+    SCHEDULE_SOLVER_TIME_BUDGET = float(os.getenv("SCHEDULE_SOLVER_TIME_BUDGET", "30"))
+    SCHEDULE_MODE = os.getenv("SCHEDULE_MODE", "greedy")
+    SCHEDULE_MULTISTART_ATTEMPTS = int(os.getenv("SCHEDULE_MULTISTART_ATTEMPTS", "16"))
+    SCHEDULE_WORKERS = int(os.getenv("SCHEDULE_WORKERS", "0")) or None
+    SCHEDULE_BLOCK_DURATION = int(os.getenv("SCHEDULE_BLOCK_DURATION", "60"))
+    SCHEDULE_SATURDAY = os.getenv("SCHEDULE_SATURDAY", "False").lower() in ("true", "1", "t")
+    SCHEDULE_IMPROVE_TIME_BUDGET = float(os.getenv("SCHEDULE_IMPROVE_TIME_BUDGET", "2"))
+    SCHEDULE_TERM_WORKERS = int(os.getenv("SCHEDULE_TERM_WORKERS", "0")) or None
+    SCHEDULE_VERSIONS_KEPT = int(os.getenv("SCHEDULE_VERSIONS_KEPT", "5"))
+    SCHEDULE_JOB_WORKERS = int(os.getenv("SCHEDULE_JOB_WORKERS", "1"))
+    SECTION_CLOSE_WORKERS = int(os.getenv("SECTION_CLOSE_WORKERS", "0")) or None
+    SECTION_CLOSE_CHUNK_SIZE = int(os.getenv("SECTION_CLOSE_CHUNK_SIZE", "50"))
+    SCHEDULE_JOBS_INLINE = os.getenv("SCHEDULE_JOBS_INLINE", "False").lower() in (
+        "true",
+        "1",
+        "t",
+    )
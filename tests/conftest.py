@@ -5,6 +5,7 @@ import pytest
 
 from app import create_app
 from app.extensions import kanvas_db
+from app.models.classroom import Classroom
 from app.models.course import Course
 from app.models.course_instance import CourseInstance, Semester
 from app.models.evaluation import Evaluation
@@ -300,6 +301,14 @@ def test_grade(_db, test_evaluation_instance, test_student):
 
 
 # 7. Schedule testing fixtures
+@pytest.fixture(scope="function")
+def test_classroom(_db):
+    classroom = Classroom(name="Sala 1", capacity=30)
+    _db.session.add(classroom)
+    _db.session.commit()
+    return classroom
+
+
 @pytest.fixture(scope="function")
 def sample_sections_no_conflict(
     _db, test_course, test_teacher, test_teacher2, test_student, test_student2
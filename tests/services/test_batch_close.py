@@ -0,0 +1,160 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.db import close_term
+from app.extensions import kanvas_db
+from app.models.course import Course
+from app.models.course_instance import CourseInstance, Semester
+from app.models.evaluation import Evaluation
+from app.models.evaluation_instance import EvaluationInstance
+from app.models.section import Section, WeighingType
+from app.models.section_grade import SectionGrade
+from app.models.student import Student
+from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.models.student_section import StudentSection
+from app.models.teacher import Teacher
+from app.models.user import User
+from app.services import batch_close
+from app.services.batch_close import close_sections, open_section_ids
+
+
+def _graded_section(db, course_instance, teacher, student, code, grade):
+    section = Section(
+        course_instance_id=course_instance.id,
+        teacher_id=teacher.id,
+        code=code,
+        closed=False,
+        weighing_type=WeighingType.WEIGHT,
+    )
+    db.session.add(section)
+    db.session.flush()
+    evaluation = Evaluation(
+        title="Prueba", section_id=section.id, weighing=1, weighing_system=WeighingType.WEIGHT
+    )
+    db.session.add(evaluation)
+    db.session.flush()
+    instance = EvaluationInstance(
+        title="Prueba 1", evaluation_id=evaluation.id, index_in_evaluation=1, instance_weighing=1
+    )
+    db.session.add_all([instance, StudentSection(student_id=student.id, section_id=section.id)])
+    db.session.flush()
+    db.session.add(
+        StudentEvaluationInstance(
+            student_id=student.id, evaluation_instance_id=instance.id, grade=grade
+        )
+    )
+    db.session.commit()
+    return section.id
+
+
+@pytest.fixture
+def term_sections(_db, test_course_instance, test_teacher, test_student):
+    return [
+        _graded_section(_db, test_course_instance, test_teacher, test_student, 100 + index, grade)
+        for index, grade in enumerate([4.0, 5.5, 6.0, 7.0])
+    ]
+
+
+def _final_grades():
+    return dict(kanvas_db.session.query(SectionGrade.section_id, SectionGrade.grade))
+
+
+def test_close_term_closes_only_its_open_sections(
+    _db, term_sections, test_closed_section, test_course, test_teacher, test_student
+):
+    other_term = CourseInstance(course_id=test_course.id, year=2025, semester=Semester.SECOND)
+    _db.session.add(other_term)
+    _db.session.commit()
+    other_id = _graded_section(_db, other_term, test_teacher, test_student, 200, 3.0)
+
+    assert open_section_ids(term=(2025, 1)) == term_sections
+
+    result = close_sections(term=(2025, 1), chunk_size=3)
+
+    assert result.closed == term_sections
+    assert not result.skipped and not result.failed
+    assert _final_grades() == dict(zip(term_sections, [4.0, 5.5, 6.0, 7.0]))
+    assert kanvas_db.session.get(Section, other_id).closed is False
+
+
+def test_close_by_ids_skips_closed_and_reports_failures(_db, term_sections, test_closed_section):
+    _db.session.query(Evaluation).filter(Evaluation.section_id == term_sections[1]).update(
+        {Evaluation.weighing: 0}
+    )
+    _db.session.commit()
+    progress = []
+
+    result = close_sections(
+        section_ids=[term_sections[0], term_sections[1], test_closed_section.id, 999],
+        progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert result.closed == [term_sections[0]]
+    assert result.skipped == [test_closed_section.id, 999]
+    assert list(result.failed) == [term_sections[1]]
+    assert kanvas_db.session.get(Section, term_sections[1]).closed is False
+    assert progress == [(0, 2), (2, 2)]
+
+
+def test_failed_chunk_is_rolled_back_and_others_stay_closed(_db, term_sections, monkeypatch):
+    write_section_grades = batch_close.write_section_grades
+
+    def failing_write(section_ids, rows):
+        write_section_grades(section_ids, rows)
+        if term_sections[2] in section_ids:
+            raise OperationalError("INSERT", {}, Exception("lock wait timeout"))
+
+    monkeypatch.setattr(batch_close, "write_section_grades", failing_write)
+
+    result = close_sections(term=(2025, 1), chunk_size=2)
+
+    assert result.closed == term_sections[:2]
+    assert sorted(result.failed) == term_sections[2:]
+    assert set(_final_grades()) == set(term_sections[:2])
+    assert open_section_ids(term=(2025, 1)) == term_sections[2:]
+
+
+def test_worker_pool_gives_the_serial_grades(_db, term_sections):
+    result = close_sections(term=(2025, 1), workers=2)
+
+    assert result.closed == term_sections
+    assert _final_grades() == dict(zip(term_sections, [4.0, 5.5, 6.0, 7.0]))
+
+
+def test_close_needs_a_term_or_sections(_db):
+    with pytest.raises(ValueError):
+        close_sections()
+
+
+def test_close_term_cli(tmp_path, capsys):
+    database_uri = f"sqlite:///{tmp_path / 'kanvas.db'}"
+    with create_app(database_uri=database_uri).app_context():
+        kanvas_db.create_all()
+        section_id = _graded_section(kanvas_db, *_cli_fixtures(), 100, 6.5)
+
+    close_term.main(["--year", "2025", "--semester", "1", "--database-uri", database_uri])
+
+    output = capsys.readouterr().out
+    assert "1/1 secciones procesadas" in output
+    assert "Secciones cerradas: 1" in output
+    with create_app(database_uri=database_uri).app_context():
+        assert kanvas_db.session.get(Section, section_id).closed is True
+        assert _final_grades() == {section_id: 6.5}
+
+
+def _cli_fixtures():
+    users = []
+    for name in ("profesor", "estudiante"):
+        user = User(first_name=name, last_name="Prueba", email=f"{name}@test.cl")
+        user.set_password("password")
+        users.append(user)
+    course = Course(title="Curso", code="CUR100", credits=2)
+    kanvas_db.session.add_all(users + [course])
+    kanvas_db.session.flush()
+    teacher = Teacher(user_id=users[0].id)
+    student = Student(user_id=users[1].id, university_entry_year=2025)
+    course_instance = CourseInstance(course_id=course.id, year=2025, semester=Semester.FIRST)
+    kanvas_db.session.add_all([teacher, student, course_instance])
+    kanvas_db.session.commit()
+    return course_instance, teacher, student
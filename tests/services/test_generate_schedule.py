@@ -1,71 +1,47 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+from app.models.course_instance import Semester
 from app.services import generate_schedule
+from app.services.schedule_engine import Placement
 
 
-@patch("app.services.generate_schedule.kanvas_db")
-@patch("app.services.generate_schedule.AssignedTimeBlock")
-def test_delete_assigned_time_blocks(mock_assigned_time_block, mock_db):
-    mock_db.session.query.return_value.delete.return_value = None
-    generate_schedule.delete_assigned_time_blocks()
-    mock_db.session.query.assert_called_once_with(mock_assigned_time_block)
-    mock_db.session.commit.assert_called_once()
-
-
-@patch("app.services.generate_schedule.TimeBlock")
-@patch("app.services.generate_schedule.kanvas_db")
-def test_create_block_range(mock_db, mock_time_block):
-    mock_time_block.query.filter_by.return_value.first.return_value = None
-    generate_schedule._create_block_range(9, 11, 60)
-    assert mock_db.session.add.call_count > 0
+def test_build_time_grid_keeps_block_ids():
+    grid = generate_schedule.build_time_grid()
+    assert len(grid.blocks) == 40
+    first = grid.blocks[0]
+    assert (first.id, first.weekday) == (41, "Lunes")
+    assert first.start_time.strftime("%H:%M") == "09:00"
+    assert grid.blocks[-1].stop_time.strftime("%H:%M") == "18:00"
 
 
-@patch("app.services.generate_schedule._create_block_range")
-@patch("app.services.generate_schedule.kanvas_db")
-def test_create_time_blocks(mock_db, mock_create_block_range):
-    generate_schedule._create_time_blocks()
-    mock_create_block_range.assert_any_call(9, 13, 60)
-    mock_create_block_range.assert_any_call(14, 18, 60)
-    mock_db.session.commit.assert_called_once()
-
-@patch("app.services.generate_schedule.TimeBlock")
-def test_group_blocks_by_day(mock_time_block):
-    mock_time_block.weekday = "Lunes"
-    mock_time_block.start_time = "09:00"
-    blocks = [mock_time_block]
-    result = generate_schedule._group_blocks_by_day(blocks)
-    assert "Lunes" in result
-    assert len(result["Lunes"]) == 1
+def test_build_time_grid_with_half_hours_and_saturday():
+    grid = generate_schedule.build_time_grid(block_duration=30, saturday=True)
+    assert len(grid.blocks) == 16 * 6
+    saturday = [sequence for day, sequence in grid.windows if day == "Sábado"]
+    assert [len(sequence) for sequence in saturday] == [8, 8]
 
 
-@patch("app.services.generate_schedule.TimeBlock")
-def test_get_contiguous_sequences(mock_time_block):
-    mock_time_block.start_time = "09:00"
-    mock_time_block.stop_time = "10:00"
-    blocks = [mock_time_block]
-    result = generate_schedule._get_contiguous_sequences(blocks)
-    assert len(result) == 1
-    assert len(result[0]) == 1
+def test_build_time_grid_rejects_uneven_blocks():
+    with pytest.raises(ValueError):
+        generate_schedule.build_time_grid(block_duration=45)
 
 
-@patch("app.services.generate_schedule.Section")
-@patch("app.services.generate_schedule.Classroom")
-@patch("app.services.generate_schedule.TimeBlock")
+@patch("app.services.generate_schedule.upsert_rows")
 @patch("app.services.generate_schedule.kanvas_db")
-def test_assign_section_if_possible(mock_db, mock_time_block, mock_classroom, mock_section):
-    mock_section.course_instance.course.credits = 3
-    mock_time_block.weekday = "Lunes"
-    mock_time_block.start_time = "09:00"
-    mock_time_block.stop_time = "10:00"
-    blocks = [mock_time_block]
-    classrooms = [mock_classroom]
-    result = generate_schedule._assign_section_if_possible(mock_section, classrooms, blocks)
-    assert result is False
+def test_create_time_blocks(mock_db, mock_upsert_rows):
+    grid = generate_schedule.build_time_grid()
+    generate_schedule._create_time_blocks(grid)
+    mock_upsert_rows.assert_called_once()
+    assert len(mock_upsert_rows.call_args.args[1]) == 40
+    mock_db.session.commit.assert_called_once()
 
 
-@patch("app.services.generate_schedule.AssignedTimeBlock")
-@patch("app.services.generate_schedule.kanvas_db")
-def test_assign_blocks(mock_db, mock_assigned_time_block):
-    mock_time_block = MagicMock(id=1)
-    generate_schedule._assign_blocks(1, 1, [mock_time_block])
-    mock_db.session.add.assert_called_once()
\ No newline at end of file
+@patch("app.services.generate_schedule.insert_rows")
+def test_assign_blocks(mock_insert_rows):
+    placements = [Placement(1, 1, "Lunes", (41, 46)), Placement(2, 1, "Martes", (42,))]
+    generate_schedule._assign_blocks(placements, 7, {1: (2025, 1), 2: (2025, 2)})
+    mock_insert_rows.assert_called_once()
+    _, rows = mock_insert_rows.call_args.args
+    assert [row["time_block_id"] for row in rows] == [41, 46, 42]
+    assert {row["version_id"] for row in rows} == {7}
+    assert [row["semester"] for row in rows] == [Semester.FIRST, Semester.FIRST, Semester.SECOND]
@@ -0,0 +1,204 @@
+import math
+import random
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+from app.models.evaluation import Evaluation
+from app.models.evaluation_instance import EvaluationInstance
+from app.models.section import Section, WeighingType
+from app.models.section_grade import SectionGrade
+from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.models.student_section import StudentSection
+from app.services.grade_engine import (
+    MINIMUM_GRADE,
+    EvaluationColumn,
+    GradeComputationError,
+    GradeMatrix,
+    InstanceColumn,
+    close_section,
+    compute_grades,
+    grade_sheet,
+    load_grade_matrix,
+    section_grade_rows,
+)
+from app.services.grade_subtotals import refresh_subtotals
+
+
+def _loop_final_grade(matrix, row):
+    # The per-student loop section close used before the engine existed.
+    total_grade = 0.0
+    total_weighing = 0.0
+    for evaluation in matrix.evaluations:
+        evaluation_grade = 0.0
+        total_instance_weight = 0.0
+        for index, instance in enumerate(matrix.instances):
+            if instance.evaluation_id != evaluation.id:
+                continue
+            grade = matrix.grades[row, index]
+            if not math.isnan(grade):
+                evaluation_grade += float(grade) * instance.weighing
+                total_instance_weight += instance.weighing
+            elif not instance.optional:
+                evaluation_grade += MINIMUM_GRADE * instance.weighing
+                total_instance_weight += instance.weighing
+        if total_instance_weight > 0:
+            evaluation_grade /= total_instance_weight
+            total_grade += evaluation_grade * evaluation.weighing
+            total_weighing += evaluation.weighing
+    return total_grade / total_weighing
+
+
+def _random_matrix(rng, students=40):
+    evaluations = [
+        EvaluationColumn(evaluation_id, f"E{evaluation_id}", rng.choice([10.0, 25.0, 33.3, 1.0]))
+        for evaluation_id in range(1, 5)
+    ]
+    instances = [
+        InstanceColumn(
+            instance_id,
+            evaluation.id,
+            f"I{instance_id}",
+            rng.choice([1.0, 2.5, 0.3, 7.0]),
+            rng.random() < 0.3,
+        )
+        for instance_id, evaluation in enumerate(
+            (evaluation for evaluation in evaluations for _ in range(rng.randint(1, 6))), start=1
+        )
+    ]
+    grades = np.array(
+        [
+            [rng.choice([math.nan, round(rng.uniform(1, 7), 1)]) for _instance in instances]
+            for _student in range(students)
+        ]
+    )
+    return GradeMatrix(1, list(range(1, students + 1)), evaluations, instances, grades)
+
+
+def test_matches_per_student_loop_exactly():
+    rng = random.Random(0)
+    for _ in range(50):
+        matrix = _random_matrix(rng)
+        computed = compute_grades(matrix)
+        for row in range(len(matrix.student_ids)):
+            assert computed.final_grades[row] == _loop_final_grade(matrix, row)
+
+
+def test_optional_instances_without_grade_are_left_out():
+    matrix = GradeMatrix(
+        1,
+        [1, 2],
+        [EvaluationColumn(1, "Tareas", 1.0), EvaluationColumn(2, "Bonus", 1.0)],
+        [
+            InstanceColumn(1, 1, "T1", 1.0, False),
+            InstanceColumn(2, 1, "T2", 1.0, False),
+            InstanceColumn(3, 2, "B1", 1.0, True),
+        ],
+        np.array([[7.0, math.nan, math.nan], [4.0, 6.0, 7.0]]),
+    )
+
+    computed = compute_grades(matrix)
+
+    assert computed.final_grades.tolist() == [4.0, 6.0]
+    assert math.isnan(computed.evaluation_grades[0, 1])
+
+
+def test_section_without_weighted_evaluations_cannot_close():
+    matrix = GradeMatrix(1, [1], [EvaluationColumn(1, "Bonus", 1.0)], [], np.empty((1, 0)))
+
+    with pytest.raises(GradeComputationError):
+        section_grade_rows(matrix)
+
+
+def _add_instances(db, section, count, optional=False):
+    evaluation = Evaluation(
+        title=f"Evaluación {count}",
+        section_id=section.id,
+        weighing=2,
+        weighing_system=WeighingType.WEIGHT,
+    )
+    db.session.add(evaluation)
+    db.session.flush()
+    instances = [
+        EvaluationInstance(
+            title=f"Instancia {index}",
+            evaluation_id=evaluation.id,
+            index_in_evaluation=index,
+            instance_weighing=index,
+            optional=optional,
+        )
+        for index in range(1, count + 1)
+    ]
+    db.session.add_all(instances)
+    db.session.commit()
+    return instances
+
+
+def test_close_section_in_constant_queries(_db, test_open_section, _test_student_in_section):
+    student_id = _test_student_in_section.student.id
+    section_id = test_open_section.id
+    instances = _add_instances(_db, test_open_section, 5)
+    _add_instances(_db, test_open_section, 3, optional=True)
+    _db.session.add_all(
+        StudentEvaluationInstance(
+            student_id=student_id, evaluation_instance_id=instance.id, grade=grade
+        )
+        for instance, grade in zip(instances, [7.0, 5.0, 4.0])
+    )
+    _db.session.commit()
+    matrix = load_grade_matrix(section_id)
+    assert matrix.grades.shape == (1, 8)
+
+    queries = []
+
+    def count(*_args):
+        queries.append(1)
+
+    event.listen(_db.engine, "before_cursor_execute", count)
+    try:
+        close_section(section_id)
+    finally:
+        event.remove(_db.engine, "before_cursor_execute", count)
+
+    assert len(queries) <= 5
+    expected = (7.0 * 1 + 5.0 * 2 + 4.0 * 3 + MINIMUM_GRADE * 4 + MINIMUM_GRADE * 5) / 15
+    grade = SectionGrade.query.filter_by(section_id=section_id, student_id=student_id).one()
+    assert grade.grade == expected
+    assert _db.session.get(Section, section_id).closed is True
+
+
+def test_grade_sheet_uses_constant_queries(
+    _db, test_open_section, _test_student_in_section, test_student2
+):
+    instances = _add_instances(_db, test_open_section, 4, optional=True)
+    section = test_open_section
+    _db.session.add(StudentSection(student_id=test_student2.id, section_id=section.id))
+    _db.session.add(
+        StudentEvaluationInstance(
+            student_id=test_student2.id, evaluation_instance_id=instances[1].id, grade=5.0
+        )
+    )
+    refresh_subtotals([section.id])
+    _db.session.commit()
+    section = _db.session.get(Section, section.id)
+
+    queries = []
+
+    def count(*_args):
+        queries.append(1)
+
+    event.listen(_db.engine, "before_cursor_execute", count)
+    try:
+        sheet = grade_sheet(section)
+    finally:
+        event.remove(_db.engine, "before_cursor_execute", count)
+
+    assert len(queries) == 5
+    assert [len(evaluation.instances) for evaluation in sheet.evaluations] == [4]
+    first, second = sheet.rows
+    assert first.name == "John Doe"
+    assert first.evaluations == [([None, None, None, None], None)]
+    assert first.final_grade is None
+    assert second.evaluations == [([None, 5.0, None, None], 5.0)]
+    assert second.final_grade == 5.0
@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import event
+
+from app.models.evaluation_instance import EvaluationInstance
+from app.models.student import Student
+from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.models.student_section import StudentSection
+from app.models.user import User
+from app.services.grade_entry import GradeEntryError, grade_entry_sheet, save_grades
+from app.services.grade_subtotals import provisional_grade
+from app.utils.bulk_sql import insert_rows
+
+
+@pytest.fixture
+def enrolled_students(_db, test_open_section):
+    insert_rows(
+        User,
+        [
+            {
+                "first_name": f"Estudiante{index}",
+                "last_name": "Prueba",
+                "email": f"estudiante{index}@test.cl",
+                "password_hash": "x",
+            }
+            for index in range(40)
+        ],
+    )
+    user_ids = [user.id for user in User.query.order_by(User.id)]
+    insert_rows(
+        Student, [{"user_id": user_id, "university_entry_year": 2025} for user_id in user_ids]
+    )
+    student_ids = [student.id for student in Student.query.order_by(Student.id)]
+    insert_rows(
+        StudentSection,
+        [
+            {"student_id": student_id, "section_id": test_open_section.id}
+            for student_id in student_ids
+        ],
+    )
+    _db.session.commit()
+    return student_ids
+
+
+def _grades(instance_id):
+    return dict(
+        StudentEvaluationInstance.query.with_entities(
+            StudentEvaluationInstance.student_id, StudentEvaluationInstance.grade
+        ).filter_by(evaluation_instance_id=instance_id)
+    )
+
+
+def test_save_grades_writes_a_whole_sheet_in_constant_queries(
+    _db, test_open_section, test_evaluation_instance, enrolled_students
+):
+    instance_id = test_evaluation_instance.id
+    section_id = test_open_section.id
+    _db.session.add(
+        StudentEvaluationInstance(
+            student_id=enrolled_students[0], evaluation_instance_id=instance_id, grade=2.0
+        )
+    )
+    _db.session.commit()
+    entries = [
+        (instance_id, student_id, str(4.0 + (index % 30) / 10))
+        for index, student_id in enumerate(enrolled_students)
+    ]
+    entries[1] = (instance_id, enrolled_students[1], " ")
+
+    queries = []
+
+    def count(*_args):
+        queries.append(1)
+
+    event.listen(_db.engine, "before_cursor_execute", count)
+    try:
+        saved = save_grades(section_id, [instance_id], entries)
+    finally:
+        event.remove(_db.engine, "before_cursor_execute", count)
+
+    assert saved == len(enrolled_students) - 1
+    assert len(queries) <= 9
+    grades = _grades(instance_id)
+    assert grades[enrolled_students[0]] == 4.0
+    assert enrolled_students[1] not in grades
+    assert provisional_grade(enrolled_students[2], section_id) == 4.2
+    assert provisional_grade(enrolled_students[0], section_id) == 4.0
+
+
+def test_save_grades_rejects_the_whole_sheet_on_any_invalid_entry(
+    _db,
+    test_open_section,
+    test_evaluation_instance,
+    _test_student_in_section,
+    test_student_not_in_section,
+):
+    other_instance = EvaluationInstance(
+        title="Otra", evaluation_id=test_evaluation_instance.evaluation_id, index_in_evaluation=2
+    )
+    _db.session.add(other_instance)
+    _db.session.commit()
+    student_id = _test_student_in_section.student.id
+
+    with pytest.raises(GradeEntryError) as error:
+        save_grades(
+            test_open_section.id,
+            [test_evaluation_instance.id],
+            [
+                (test_evaluation_instance.id, student_id, "6.0"),
+                (test_evaluation_instance.id, test_student_not_in_section.id, "5.0"),
+                (other_instance.id, student_id, "5.0"),
+                (test_evaluation_instance.id, student_id, "siete"),
+            ],
+        )
+
+    assert len(error.value.errors) == 3
+    assert _grades(test_evaluation_instance.id) == {}
+
+
+def test_grade_entry_sheet_lists_enrolled_students_and_grades(
+    _db, test_open_section, test_evaluation_instance, _test_student_in_section, test_grade
+):
+    students, grades = grade_entry_sheet(test_open_section.id, [test_evaluation_instance.id])
+
+    assert students == [(_test_student_in_section.student.id, "John Doe")]
+    assert grades == {(test_evaluation_instance.id, test_grade.student_id): test_grade.grade}
@@ -0,0 +1,202 @@
+import pytest
+from flask import url_for
+from sqlalchemy import event
+
+from app import create_app
+from app.db import rebuild_grade_subtotals
+from app.extensions import kanvas_db
+from app.models.evaluation_instance import EvaluationInstance
+from app.models.section import Section
+from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.models.student_evaluation_subtotal import StudentEvaluationSubtotal
+from app.models.student_section import StudentSection
+from app.models.student_section_subtotal import StudentSectionSubtotal
+from app.services.grade_engine import (
+    MINIMUM_GRADE,
+    close_section,
+    compute_grades,
+    grade_sheet,
+    load_grade_matrix,
+)
+from app.services.grade_subtotals import (
+    provisional_grade,
+    rebuild_subtotals,
+    refresh_grade_subtotals,
+    refresh_subtotals,
+)
+
+
+@pytest.fixture
+def two_instances(_db, test_evaluation_instance):
+    second = EvaluationInstance(
+        title="Final",
+        evaluation_id=test_evaluation_instance.evaluation_id,
+        index_in_evaluation=2,
+        instance_weighing=3,
+    )
+    _db.session.add(second)
+    _db.session.commit()
+    return test_evaluation_instance, second
+
+
+@pytest.fixture
+def two_students(_db, test_open_section, _test_student_in_section, test_student2):
+    _db.session.add(StudentSection(student_id=test_student2.id, section_id=test_open_section.id))
+    refresh_subtotals([test_open_section.id])
+    _db.session.commit()
+    return _test_student_in_section.student.id, test_student2.id
+
+
+def _post_grade(client, instance_id, student_id, grade):
+    return client.post(
+        url_for(
+            "grades.assign_or_edit_grade",
+            evaluation_instance_id=instance_id,
+            student_id=student_id,
+        ),
+        data={"grade": grade},
+    )
+
+
+def _engine_finals(section_id):
+    matrix = load_grade_matrix(section_id)
+    return dict(zip(matrix.student_ids, compute_grades(matrix).final_grades.tolist()))
+
+
+def test_grade_writes_keep_the_store_equal_to_a_rebuild(
+    client, test_open_section, two_instances, two_students
+):
+    first, second = two_instances
+    student_id, other_id = two_students
+
+    _post_grade(client, first.id, student_id, "6.5")
+    _post_grade(client, second.id, student_id, "4.0")
+    _post_grade(client, second.id, other_id, "7.0")
+    _post_grade(client, second.id, student_id, "5.2")
+    client.post(
+        url_for("grades.delete_grade", evaluation_instance_id=second.id, student_id=other_id)
+    )
+
+    finals = _engine_finals(test_open_section.id)
+    assert provisional_grade(student_id, test_open_section.id) == finals[student_id]
+    assert provisional_grade(other_id, test_open_section.id) == MINIMUM_GRADE
+    assert rebuild_subtotals(dry_run=True) == []
+
+
+def test_grade_write_only_recomputes_its_student(
+    _db, test_open_section, two_instances, two_students
+):
+    first, _second = two_instances
+    student_id, other_id = two_students
+    other_row = _db.session.get(StudentSectionSubtotal, (other_id, test_open_section.id))
+    other_row.weighted_sum = 99.0
+    _db.session.add(
+        StudentEvaluationInstance(student_id=student_id, evaluation_instance_id=first.id, grade=7.0)
+    )
+    _db.session.commit()
+    grade_keys = [(first.id, student_id)]
+
+    queries = []
+
+    def count(*_args):
+        queries.append(1)
+
+    event.listen(_db.engine, "before_cursor_execute", count)
+    try:
+        refresh_grade_subtotals(grade_keys)
+    finally:
+        event.remove(_db.engine, "before_cursor_execute", count)
+    _db.session.commit()
+
+    assert len(queries) <= 8
+    assert provisional_grade(student_id, test_open_section.id) == (7.0 + 3 * MINIMUM_GRADE) / 4
+    assert (
+        _db.session.get(StudentSectionSubtotal, (other_id, test_open_section.id)).weighted_sum
+        == 99.0
+    )
+    assert rebuild_subtotals() == [test_open_section.id]
+    assert provisional_grade(other_id, test_open_section.id) == MINIMUM_GRADE
+
+
+def test_weight_edit_updates_every_student(client, test_open_section, two_instances, two_students):
+    first, second = two_instances
+    student_id, other_id = two_students
+    _post_grade(client, first.id, student_id, "7.0")
+    _post_grade(client, first.id, other_id, "3.0")
+
+    client.post(
+        url_for("evaluation.edit_instance_weights", evaluation_id=first.evaluation_id),
+        data={f"instance_{first.id}": "1", f"instance_{second.id}": "0"},
+    )
+
+    assert provisional_grade(student_id, test_open_section.id) == 7.0
+    assert provisional_grade(other_id, test_open_section.id) == 3.0
+    subtotal = kanvas_db.session.get(StudentEvaluationSubtotal, (other_id, first.evaluation_id))
+    assert (subtotal.weighted_sum, subtotal.weight_total) == (3.0, 1.0)
+
+
+def test_unenrolled_students_lose_their_subtotals(_db, test_open_section, two_students):
+    student_id, _other_id = two_students
+    _db.session.query(StudentSection).filter_by(student_id=student_id).delete()
+
+    refresh_subtotals([test_open_section.id], [student_id])
+    _db.session.commit()
+
+    assert _db.session.get(StudentSectionSubtotal, (student_id, test_open_section.id)) is None
+
+
+def test_close_ignores_a_stale_store(_db, test_open_section, two_instances, two_students):
+    first, _second = two_instances
+    student_id, other_id = two_students
+    _db.session.add(
+        StudentEvaluationInstance(student_id=student_id, evaluation_instance_id=first.id, grade=6.0)
+    )
+    _db.session.get(StudentSectionSubtotal, (other_id, test_open_section.id)).weighted_sum = 99.0
+    _db.session.commit()
+    finals = _engine_finals(test_open_section.id)
+
+    rows = close_section(test_open_section.id)
+
+    assert {row["student_id"]: row["grade"] for row in rows} == finals
+    assert finals[other_id] == MINIMUM_GRADE
+
+
+def test_grade_sheet_without_subtotals_computes_from_grades(
+    _db, test_open_section, two_instances, two_students
+):
+    first, _second = two_instances
+    student_id, _other_id = two_students
+    _db.session.add(
+        StudentEvaluationInstance(student_id=student_id, evaluation_instance_id=first.id, grade=7.0)
+    )
+    _db.session.query(StudentEvaluationSubtotal).delete()
+    _db.session.query(StudentSectionSubtotal).delete()
+    _db.session.commit()
+
+    sheet = grade_sheet(_db.session.get(Section, test_open_section.id))
+
+    finals = _engine_finals(test_open_section.id)
+    assert {row.student_id: row.final_grade for row in sheet.rows} == finals
+    averages = {row.student_id: row.evaluations[0][1] for row in sheet.rows}
+    assert averages[student_id] == finals[student_id]
+
+
+def test_dry_run_rebuild_reports_without_writing(_db, test_open_section, two_students):
+    student_id, _other_id = two_students
+    _db.session.query(StudentSectionSubtotal).filter_by(student_id=student_id).delete()
+    _db.session.commit()
+
+    assert rebuild_subtotals(dry_run=True) == [test_open_section.id]
+    assert _db.session.get(StudentSectionSubtotal, (student_id, test_open_section.id)) is None
+    assert rebuild_subtotals(chunk_size=1) == [test_open_section.id]
+    assert rebuild_subtotals(dry_run=True) == []
+
+
+def test_rebuild_cli(tmp_path, capsys):
+    database_uri = f"sqlite:///{tmp_path / 'kanvas.db'}"
+    with create_app(database_uri=database_uri).app_context():
+        kanvas_db.create_all()
+
+    rebuild_grade_subtotals.main(["--check", "--database-uri", database_uri])
+
+    assert "Los subtotales están al día." in capsys.readouterr().out
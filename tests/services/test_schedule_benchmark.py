@@ -0,0 +1,65 @@
+import json
+
+from app.db import benchmark
+from app.models.section import Section
+from app.models.student_section import StudentSection
+from app.services.schedule_benchmark import (
+    SyntheticTerm,
+    benchmark_record,
+    generate_synthetic_term,
+    run_benchmark,
+)
+
+SMALL_TERM = SyntheticTerm(
+    sections=12, students_per_section=5, student_load=2, cohort_size=4, rooms=6, teacher_load=2
+)
+
+
+def test_generate_synthetic_term(_db):
+    counts = generate_synthetic_term(SMALL_TERM)
+
+    assert counts["sections"] == Section.query.count() == 12
+    assert counts["teachers"] == 6
+    assert counts["enrollments"] == StudentSection.query.count() == 30 * 2
+
+
+def test_synthetic_term_is_reproducible(_db):
+    generate_synthetic_term(SMALL_TERM)
+    first = sorted((row.student_id, row.section_id) for row in StudentSection.query.all())
+    _db.drop_all()
+    _db.create_all()
+
+    generate_synthetic_term(SMALL_TERM)
+    second = sorted((row.student_id, row.section_id) for row in StudentSection.query.all())
+
+    assert first == second
+
+
+def test_run_benchmark_records_phases(_db):
+    generate_synthetic_term(SMALL_TERM)
+
+    runs = run_benchmark(repeat=2)
+
+    assert len(runs) == 2
+    for run in runs:
+        assert run["status"] == "ok"
+        assert run["placed"] == 12
+        assert {"load", "place", "persist"} <= set(run["phases"])
+        assert run["phases"]["load"]["queries"] > 0
+        assert run["queries"] >= run["phases"]["load"]["queries"]
+        assert run["sections"] == 12
+        assert run["peak_memory_bytes"] > 0
+    json.dumps(benchmark_record(SMALL_TERM, {}, runs))
+
+
+def test_benchmark_cli_appends_json_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    args = ["--sections", "8", "--rooms", "4", "--repeat", "1", "--output", str(output)]
+
+    benchmark.main(args)
+    benchmark.main(args)
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 2
+    assert records[0]["database"] == "sqlite"
+    assert records[0]["runs"][0]["status"] == "ok"
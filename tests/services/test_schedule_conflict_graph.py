@@ -0,0 +1,29 @@
+from app.services.schedule_conflict_graph import StudentConflictGraph
+
+
+def test_sections_sharing_a_student_are_neighbours():
+    graph = StudentConflictGraph([(1, 10), (2, 10), (3, 11), (2, 11)])
+
+    assert graph.neighbours(1) == {2}
+    assert graph.neighbours(2) == {1, 3}
+    assert graph.conflicts(3, 2)
+    assert not graph.conflicts(1, 3)
+
+
+def test_section_without_students_has_no_neighbours():
+    graph = StudentConflictGraph([(1, 10)])
+    assert graph.neighbours(1) == set()
+    assert graph.neighbours(42) == set()
+    assert graph.degree(1) == 0
+
+
+def test_sections_of_student():
+    graph = StudentConflictGraph([(1, 10), (2, 10)])
+    assert graph.sections_of(10) == {1, 2}
+
+
+def test_load_from_database(_db, sample_sections_student_conflict):
+    graph = StudentConflictGraph.load()
+    section_ids = list(graph.sections_by_student.values())[0]
+    first, second = sorted(section_ids)
+    assert graph.conflicts(first, second)
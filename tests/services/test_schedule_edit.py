@@ -0,0 +1,151 @@
+from datetime import time
+
+import pytest
+from sqlalchemy import event
+
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.classroom import Classroom
+from app.models.schedule_version import ScheduleVersion
+from app.models.section import Section
+from app.models.time_block import TimeBlock
+from app.services import generate_schedule
+from app.services.schedule_edit import (
+    ScheduleEditError,
+    move_section,
+    swap_candidates,
+    swap_sections,
+)
+from app.services.schedule_engine import ScheduleSnapshot
+from app.services.schedule_quality import score_schedule
+from app.services.schedule_versions import get_active_version_id
+
+
+def _block_id(weekday, hour):
+    return TimeBlock.query.filter_by(weekday=weekday, start_time=time(hour)).one().id
+
+
+def _slot(section_id):
+    rows = (
+        AssignedTimeBlock.query.filter_by(version_id=get_active_version_id(), section_id=section_id)
+        .order_by(AssignedTimeBlock.time_block_id)
+        .all()
+    )
+    return rows[0].classroom_id, [row.time_block_id for row in rows]
+
+
+def _sections():
+    return [section.id for section in Section.query.order_by(Section.id)]
+
+
+def test_move_to_free_slot(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, _second = _sections()
+
+    move_section(first, test_classroom.id, _block_id("Viernes", 14))
+
+    assert _slot(first) == (
+        test_classroom.id,
+        [_block_id("Viernes", 14), _block_id("Viernes", 15), _block_id("Viernes", 16)],
+    )
+    assert generate_schedule.get_schedule()[first]["weekday"] == "Viernes"
+    grid = generate_schedule.build_time_grid()
+    rescored = score_schedule(
+        ScheduleSnapshot.load(get_active_version_id(), time_blocks=grid.blocks), grid, []
+    )
+    score = ScheduleVersion.query.filter_by(is_active=True).one().score
+    assert score["total"] == rescored.total
+    assert score["terms"]["2025-1"]["total"] == rescored.total
+
+
+def test_move_into_occupied_room_is_rejected(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, second = _sections()
+    before = _slot(first)
+
+    with pytest.raises(ScheduleEditError, match="ocupada por la sección"):
+        move_section(first, test_classroom.id, _slot(second)[1][0])
+
+    assert _slot(first) == before
+
+
+def test_move_checks_teacher(_db, sample_sections_teacher_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, second = _sections()
+    other_room = Classroom(name="Sala 2", capacity=30)
+    _db.session.add(other_room)
+    _db.session.commit()
+
+    with pytest.raises(ScheduleEditError, match="El profesor tiene la sección"):
+        move_section(first, other_room.id, _slot(second)[1][0])
+
+
+def test_move_checks_students_and_capacity(_db, sample_sections_student_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, second = _sections()
+    small = Classroom(name="Sala Chica", capacity=0)
+    _db.session.add(small)
+    _db.session.commit()
+
+    with pytest.raises(ScheduleEditError) as error:
+        move_section(first, small.id, _slot(second)[1][0])
+
+    assert "capacidad 0" in str(error.value)
+    assert "estudiantes tienen otra clase" in str(error.value)
+
+
+def test_move_needs_enough_contiguous_blocks(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, _second = _sections()
+
+    with pytest.raises(ScheduleEditError, match="bloques seguidos"):
+        move_section(first, test_classroom.id, _block_id("Lunes", 12))
+
+
+def test_move_outside_the_grid_is_rejected(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, _second = _sections()
+    evening = TimeBlock(id=9999, weekday="Lunes", start_time=time(19), stop_time=time(20))
+    _db.session.add(evening)
+    _db.session.commit()
+
+    with pytest.raises(ScheduleEditError, match="no está en la grilla"):
+        move_section(first, test_classroom.id, evening.id)
+
+
+def test_move_uses_a_fixed_number_of_queries(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, _second = _sections()
+    classroom_id = test_classroom.id
+    start = _block_id("Viernes", 9)
+    queries = []
+
+    def count(*_args):
+        queries.append(1)
+
+    event.listen(_db.engine, "before_cursor_execute", count)
+    try:
+        move_section(first, classroom_id, start)
+    finally:
+        event.remove(_db.engine, "before_cursor_execute", count)
+
+    # The checks and writes, plus the reads that rescore the section's term.
+    assert len(queries) <= 16
+
+
+def test_swap_exchanges_slots(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    first, second = _sections()
+    first_slot, second_slot = _slot(first), _slot(second)
+
+    assert [row[0] for row in swap_candidates(first)] == [second]
+    swap_sections(first, second)
+
+    assert _slot(first) == second_slot
+    assert _slot(second) == first_slot
+
+
+def test_edit_without_active_schedule(_db, sample_sections_no_conflict, test_classroom):
+    first, second = _sections()
+
+    with pytest.raises(ScheduleEditError, match="No hay un horario activo"):
+        swap_sections(first, second)
@@ -0,0 +1,97 @@
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.services import generate_schedule
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Martes", "09:00", "10:00"),
+    TimeBlockData(4, "Martes", "10:00", "11:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _snapshot(sections, classrooms, assignments=()):
+    return ScheduleSnapshot(sections, classrooms, TIME_BLOCKS, assignments)
+
+
+def test_greedy_order_by_enrollment_then_credits():
+    sections = [
+        SectionData(1, 1, 1, frozenset()),
+        SectionData(2, 1, 2, frozenset()),
+        SectionData(3, 1, 1, frozenset({1, 2})),
+    ]
+    snapshot = _snapshot(sections, [])
+    assert [s.id for s in snapshot.sections_in_greedy_order()] == [3, 2, 1]
+
+
+def test_place_skips_room_without_capacity():
+    section = SectionData(1, 1, 2, frozenset({1, 2}))
+    classrooms = [ClassroomData(1, "Chica", 1), ClassroomData(2, "Grande", 10)]
+    engine = ScheduleEngine(_snapshot([section], classrooms), GRID)
+
+    placement = engine.place(section)
+
+    assert placement.classroom_id == 2
+    assert placement.block_ids == (1, 2)
+
+
+def test_place_avoids_teacher_conflict():
+    first = SectionData(1, 1, 2, frozenset())
+    second = SectionData(2, 1, 2, frozenset())
+    classrooms = [ClassroomData(1, "A", 10), ClassroomData(2, "B", 10)]
+    engine = ScheduleEngine(_snapshot([first, second], classrooms), GRID)
+
+    engine.place(first)
+    placement = engine.place(second)
+
+    assert placement.day == "Martes"
+
+
+def test_place_avoids_student_conflict():
+    first = SectionData(1, 1, 1, frozenset({7}))
+    second = SectionData(2, 2, 1, frozenset({7}))
+    classrooms = [ClassroomData(1, "A", 10), ClassroomData(2, "B", 10)]
+    engine = ScheduleEngine(_snapshot([first, second], classrooms), GRID)
+
+    engine.place(first)
+    placement = engine.place(second)
+
+    assert placement.block_ids == (2,)
+
+
+def test_existing_assignments_are_occupied():
+    section = SectionData(1, 1, 2, frozenset())
+    classrooms = [ClassroomData(1, "A", 10)]
+    snapshot = _snapshot([section], classrooms, assignments=[(99, 1, 1)])
+    engine = ScheduleEngine(snapshot, GRID)
+
+    assert engine.place(section).day == "Martes"
+
+
+def test_place_returns_none_when_no_window_fits():
+    section = SectionData(1, 1, 3, frozenset())
+    engine = ScheduleEngine(_snapshot([section], [ClassroomData(1, "A", 10)]), GRID)
+    assert engine.place(section) is None
+
+
+def test_generate_schedule_student_conflict(_db, sample_sections_student_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+
+    rows = _db.session.query(AssignedTimeBlock).all()
+    blocks_by_section = {}
+    for row in rows:
+        blocks_by_section.setdefault(row.section_id, set()).add(row.time_block_id)
+
+    assert len(blocks_by_section) == 2
+    first, second = blocks_by_section.values()
+    assert len(first) == 3 and len(second) == 3
+    assert not first & second
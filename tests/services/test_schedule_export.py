@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+import zipfile
+
+from app.models.section import Section
+from app.services import generate_schedule
+from app.services.schedule_export import (
+    EXPORT_COLUMNS,
+    schedule_rows,
+    stream_csv,
+    stream_jsonl,
+    stream_xlsx,
+)
+
+
+def _rows():
+    return [{column: f"{column}-{index}" for column in EXPORT_COLUMNS} for index in range(1201)]
+
+
+def test_schedule_rows_match_get_schedule(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+
+    rows = list(schedule_rows(chunk_size=1))
+
+    assert rows == list(generate_schedule.get_schedule().values())
+
+
+def test_schedule_rows_filters(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    section = Section.query.order_by(Section.id).first()
+
+    by_teacher = list(schedule_rows(teacher_id=section.teacher_id))
+
+    assert [row["section_code"] for row in by_teacher] == [section.code]
+    assert len(list(schedule_rows(classroom_id=test_classroom.id))) == 2
+    assert not list(schedule_rows(classroom_id=test_classroom.id + 1))
+    assert len(list(schedule_rows(term=(2025, 1)))) == 2
+    assert not list(schedule_rows(term=(2025, 2)))
+
+
+def test_stream_csv_in_chunks():
+    chunks = list(stream_csv(iter(_rows())))
+
+    assert len(chunks) == 3
+    parsed = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert parsed == _rows()
+
+
+def test_stream_jsonl_in_chunks():
+    chunks = list(stream_jsonl(iter(_rows())))
+
+    assert len(chunks) == 3
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == _rows()
+
+
+def test_stream_xlsx_is_a_valid_workbook():
+    rows = _rows()
+    rows[0]["course_title"] = "Cálculo <I> & II"
+
+    chunks = list(stream_xlsx(iter(rows)))
+
+    assert len(chunks) > 2
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as workbook:
+        assert workbook.testzip() is None
+        assert "xl/workbook.xml" in workbook.namelist()
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row>") == len(rows) + 1
+    assert "Cálculo &lt;I&gt; &amp; II" in sheet
@@ -0,0 +1,84 @@
+import pytest
+
+from app.services import generate_schedule
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_feasibility import (
+    CAPACITY_ISSUE,
+    CLIQUE_ISSUE,
+    TEACHER_ISSUE,
+    WINDOW_ISSUE,
+    check_feasibility,
+    explain_unplaced,
+)
+from app.services.schedule_grid import TimeGrid
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Martes", "09:00", "10:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+ROOMS = [ClassroomData(1, "Sala", 10)]
+
+
+def _kinds(sections, classrooms=ROOMS):
+    snapshot = ScheduleSnapshot(sections, classrooms, TIME_BLOCKS)
+    return {issue.kind: issue.section_ids for issue in check_feasibility(snapshot, GRID)}
+
+
+def test_feasible_term_has_no_issues():
+    assert not _kinds([SectionData(1, 1, 2, frozenset({1})), SectionData(2, 2, 1, frozenset({1}))])
+
+
+def test_section_larger_than_largest_room():
+    assert _kinds([SectionData(1, 1, 1, frozenset(range(11)))]) == {CAPACITY_ISSUE: [1]}
+
+
+def test_section_longer_than_longest_window():
+    assert _kinds([SectionData(1, 1, 3, frozenset({1}))]) == {WINDOW_ISSUE: [1]}
+
+
+def test_teacher_with_more_credits_than_blocks():
+    sections = [SectionData(1, 1, 2, frozenset()), SectionData(2, 1, 2, frozenset())]
+
+    assert _kinds(sections) == {TEACHER_ISSUE: [1, 2]}
+
+
+def test_sections_sharing_students_need_more_blocks_than_exist():
+    sections = [
+        SectionData(1, 1, 1, frozenset({1, 2})),
+        SectionData(2, 2, 2, frozenset({2, 3})),
+        SectionData(3, 3, 1, frozenset({1, 3})),
+    ]
+
+    assert _kinds(sections) == {CLIQUE_ISSUE: [1, 2, 3]}
+
+
+def test_explain_unplaced_names_blocking_constraint():
+    first = SectionData(1, 1, 2, frozenset({1}))
+    second = SectionData(2, 2, 1, frozenset({1}))
+    third = SectionData(3, 1, 1, frozenset())
+    engine = ScheduleEngine(ScheduleSnapshot([first, second, third], ROOMS, TIME_BLOCKS), GRID)
+    engine.place(first)
+    engine.assign(third, 1, "Martes", (3,), engine.mask_of((3,)))
+
+    explanation = explain_unplaced(engine, second)
+
+    assert "1 chocan con otras clases del profesor" not in explanation
+    assert "2 con clases de sus estudiantes" in explanation
+    assert "1 no tienen sala libre" in explanation
+    assert "secciones que más chocan: 1" in explanation
+
+
+def test_generate_schedule_reports_issues_before_solving(_db, sample_sections_no_conflict):
+    with pytest.raises(generate_schedule.ScheduleInfeasibleError) as error:
+        generate_schedule.generate_schedule()
+
+    assert {issue.kind for _term, issue in error.value.issues} == {CAPACITY_ISSUE}
+    assert "sala más grande tiene capacidad 0" in str(error.value)
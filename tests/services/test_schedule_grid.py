@@ -0,0 +1,46 @@
+from app.models.time_block import TimeBlock
+from app.services import generate_schedule
+from app.services.schedule_engine import TimeBlockData
+from app.services.schedule_grid import TimeGrid, block_id
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Lunes", "14:00", "15:00"),
+    TimeBlockData(4, "Martes", "09:00", "10:00"),
+]
+
+
+def test_windows_split_days_and_gaps():
+    grid = TimeGrid(TIME_BLOCKS)
+    assert grid.windows == [("Lunes", [1, 2]), ("Lunes", [3]), ("Martes", [4])]
+
+
+def test_candidates_are_precomputed_masks():
+    grid = TimeGrid(TIME_BLOCKS)
+    assert grid.candidates(2) == [("Lunes", (1, 2), 0b11)]
+    assert [mask for _, _, mask in grid.candidates(1)] == [0b1, 0b10, 0b100, 0b1000]
+    assert grid.candidates(3) == []
+
+
+def test_mask_of_ignores_blocks_outside_the_grid():
+    grid = TimeGrid(TIME_BLOCKS)
+    assert grid.mask_of((2, 99)) == 0b10
+
+
+def test_block_ids_of_other_grids_do_not_collide():
+    legacy = {block_id(day, hour * 60, 60) for day in range(1, 6) for hour in range(9, 18)}
+    others = {block_id(6, hour * 60, 60) for hour in range(9, 18)}
+    others |= {block_id(day, minute, 30) for day in range(1, 7) for minute in range(540, 1080, 30)}
+    assert block_id(1, 9 * 60, 60) == 41
+    assert not legacy & others
+
+
+def test_generate_schedule_on_a_custom_grid(_db, sample_sections_no_conflict, test_classroom):
+    grid = generate_schedule.build_time_grid(block_duration=30, saturday=True)
+
+    placements = generate_schedule.generate_schedule(generate_schedule.GenerationOptions(grid=grid))
+
+    grid_ids = {block.id for block in grid.blocks}
+    assert {block for placement in placements for block in placement.block_ids} <= grid_ids
+    assert TimeBlock.query.filter(TimeBlock.id.in_(grid_ids)).count() == len(grid_ids)
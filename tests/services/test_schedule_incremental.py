@@ -0,0 +1,88 @@
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.section import Section, WeighingType
+from app.services import generate_schedule
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_incremental import split_assignments
+from app.services.schedule_versions import get_active_version_id
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Martes", "09:00", "10:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _split(sections, classrooms, assignments):
+    return split_assignments(
+        ScheduleSnapshot(sections, classrooms, TIME_BLOCKS, assignments), GRID
+    )
+
+
+def test_valid_assignments_are_kept():
+    sections = [SectionData(1, 1, 2, frozenset({5}))]
+    kept, stale = _split(sections, [ClassroomData(1, "A", 10)], [(1, 1, 1), (1, 1, 2)])
+    assert kept == [(1, 1, 1), (1, 1, 2)]
+    assert stale == set()
+
+
+def test_section_that_outgrew_its_room_is_stale():
+    sections = [SectionData(1, 1, 1, frozenset({5, 6}))]
+    kept, stale = _split(sections, [ClassroomData(1, "A", 1)], [(1, 1, 3)])
+    assert kept == []
+    assert stale == {1}
+
+
+def test_section_whose_credits_changed_is_stale():
+    sections = [SectionData(1, 1, 2, frozenset())]
+    _, stale = _split(sections, [ClassroomData(1, "A", 10)], [(1, 1, 3)])
+    assert stale == {1}
+
+
+def test_new_student_conflict_invalidates_smaller_section():
+    big = SectionData(1, 1, 1, frozenset({5, 6}))
+    small = SectionData(2, 2, 1, frozenset({5}))
+    classrooms = [ClassroomData(1, "A", 10), ClassroomData(2, "B", 10)]
+    kept, stale = _split([big, small], classrooms, [(1, 1, 3), (2, 2, 3)])
+    assert kept == [(1, 1, 3)]
+    assert stale == {2}
+
+
+def test_rows_of_deleted_sections_are_stale():
+    _, stale = _split([], [ClassroomData(1, "A", 10)], [(9, 1, 3)])
+    assert stale == {9}
+
+
+def test_incremental_generation_only_places_new_sections(
+    _db, sample_sections_no_conflict, test_classroom
+):
+    generate_schedule.generate_schedule()
+    before = {
+        (row.section_id, row.classroom_id, row.time_block_id)
+        for row in AssignedTimeBlock.query.filter_by(version_id=get_active_version_id())
+    }
+
+    existing = Section.query.first()
+    new_section = Section(
+        course_instance_id=existing.course_instance_id,
+        teacher_id=existing.teacher_id,
+        code=4001,
+        weighing_type=WeighingType.WEIGHT,
+    )
+    _db.session.add(new_section)
+    _db.session.commit()
+
+    placements = generate_schedule.generate_schedule(incremental=True)
+
+    after = {
+        (row.section_id, row.classroom_id, row.time_block_id)
+        for row in AssignedTimeBlock.query.filter_by(version_id=get_active_version_id())
+    }
+    assert [placement.section_id for placement in placements] == [new_section.id]
+    assert before < after
@@ -0,0 +1,111 @@
+import pytest
+
+from app import create_app
+from app.db import fail_schedule_jobs
+from app.extensions import kanvas_db
+from app.models.schedule_job import ScheduleJob, ScheduleJobStatus
+from app.models.schedule_version import ScheduleVersion
+from app.services.generate_schedule import ScheduleGenerationCancelled
+from app.services.schedule_jobs import (
+    ScheduleJobError,
+    _JobProgress,
+    cancel_job,
+    fail_interrupted_jobs,
+    run_generation_job,
+    submit_generation_job,
+)
+
+
+@pytest.fixture
+def inline_jobs(app, monkeypatch):
+    monkeypatch.setitem(app.config, "SCHEDULE_JOBS_INLINE", True)
+
+
+def _pending_job(_db, **values):
+    job = ScheduleJob(status=ScheduleJobStatus.PENDING, **values)
+    _db.session.add(job)
+    _db.session.commit()
+    return job
+
+
+def test_submitted_job_records_progress(
+    _db, inline_jobs, sample_sections_no_conflict, test_classroom
+):
+    job_id = submit_generation_job()
+
+    job = _db.session.get(ScheduleJob, job_id)
+    assert job.status == ScheduleJobStatus.DONE
+    assert job.phase == "persist"
+    assert (job.placed, job.total) == (2, 2)
+    assert job.started_at is not None and job.finished_at is not None
+
+
+def test_failed_job_keeps_error(_db, inline_jobs, sample_sections_no_conflict):
+    job_id = submit_generation_job()
+
+    job = _db.session.get(ScheduleJob, job_id)
+    assert job.status == ScheduleJobStatus.FAILED
+    assert "sala más grande" in job.error
+
+
+def test_cancelled_pending_job_never_runs(_db, sample_sections_no_conflict, test_classroom):
+    job = _pending_job(_db)
+
+    cancel_job(job.id)
+    run_generation_job(job.id)
+
+    assert _db.session.get(ScheduleJob, job.id).status == ScheduleJobStatus.CANCELLED
+    assert ScheduleVersion.query.count() == 0
+
+
+def test_progress_raises_once_cancel_is_requested(_db):
+    job = _pending_job(_db, cancel_requested=True)
+
+    with pytest.raises(ScheduleGenerationCancelled):
+        _JobProgress(job.id)("solve", 1, 2)
+
+    assert _db.session.get(ScheduleJob, job.id).placed == 1
+
+
+def test_progress_writes_are_throttled_within_a_phase(_db):
+    job = _pending_job(_db)
+    progress = _JobProgress(job.id, interval=60)
+
+    progress("solve", 1, 3)
+    progress("solve", 2, 3)
+
+    assert _db.session.get(ScheduleJob, job.id).placed == 1
+
+
+def test_cancel_finished_job_fails(_db):
+    job = _pending_job(_db)
+    cancel_job(job.id)
+
+    with pytest.raises(ScheduleJobError):
+        cancel_job(job.id)
+
+
+def test_startup_fails_jobs_left_unfinished(_db):
+    running = ScheduleJob(status=ScheduleJobStatus.RUNNING)
+    done = ScheduleJob(status=ScheduleJobStatus.DONE)
+    _db.session.add_all([running, done])
+    pending = _pending_job(_db)
+
+    assert fail_interrupted_jobs() == 2
+
+    _db.session.expire_all()
+    assert running.status == pending.status == ScheduleJobStatus.FAILED
+    assert running.error and running.finished_at is not None
+    assert done.status == ScheduleJobStatus.DONE
+
+
+def test_fail_jobs_cli(tmp_path, capsys):
+    database_uri = f"sqlite:///{tmp_path / 'kanvas.db'}"
+    with create_app(database_uri=database_uri).app_context():
+        kanvas_db.create_all()
+        kanvas_db.session.add(ScheduleJob(status=ScheduleJobStatus.RUNNING))
+        kanvas_db.session.commit()
+
+    fail_schedule_jobs.main(["--database-uri", database_uri])
+
+    assert "Trabajos marcados como fallidos: 1" in capsys.readouterr().out
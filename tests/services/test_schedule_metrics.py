@@ -0,0 +1,88 @@
+from app.models.schedule_version import ScheduleVersion
+from app.services import generate_schedule
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_metrics import (
+    CAPACITY_REJECTION,
+    ROOM_REJECTION,
+    STUDENT_REJECTION,
+    TEACHER_REJECTION,
+    SolveStats,
+)
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Lunes", "11:00", "12:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _engine(sections, capacity=5):
+    snapshot = ScheduleSnapshot(sections, [ClassroomData(1, "Sala", capacity)], TIME_BLOCKS)
+    return ScheduleEngine(snapshot, GRID)
+
+
+def test_place_counts_candidates_and_rejections():
+    sections = [
+        SectionData(1, 1, 1, frozenset({1})),
+        SectionData(2, 1, 1, frozenset({2})),
+        SectionData(3, 2, 1, frozenset({1})),
+        SectionData(4, 3, 1, frozenset({4})),
+    ]
+    engine = _engine(sections)
+    for section in sections:
+        engine.place(section)
+
+    stats = engine.stats
+    assert stats.sections == 4
+    assert stats.candidates == 1 + 2 + 3 + 3
+    assert stats.max_candidates == 3
+    assert stats.rejections == {
+        CAPACITY_REJECTION: 0,
+        ROOM_REJECTION: 4,
+        TEACHER_REJECTION: 1,
+        STUDENT_REJECTION: 1,
+    }
+
+
+def test_section_no_room_seats_is_a_capacity_rejection():
+    engine = _engine([SectionData(1, 1, 1, frozenset(range(10)))])
+
+    assert engine.place(engine.snapshot.sections[0]) is None
+    assert engine.stats.rejections[CAPACITY_REJECTION] == 3
+    assert engine.stats.max_candidates == 3
+
+
+def test_merge_adds_counters_and_times():
+    first, second = SolveStats(), SolveStats()
+    first.record_section(2)
+    second.record_section(5)
+    second.rejections[TEACHER_REJECTION] = 4
+    second.seconds["place"] = 0.5
+
+    first.merge(second)
+
+    assert (first.sections, first.candidates, first.max_candidates) == (2, 7, 5)
+    assert first.rejections[TEACHER_REJECTION] == 4
+    assert first.seconds["place"] == 0.5
+
+
+def test_generation_stores_run_report(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+
+    report = ScheduleVersion.query.filter_by(is_active=True).one().report
+    assert list(report["phases"]) == ["load", "sort", "place", "persist"]
+    assert report["phases"]["load"]["queries"] > 0
+    assert report["phases"]["persist"]["queries"] > 0
+    assert report["phases"]["place"]["queries"] == 0
+    assert report["queries"] >= sum(phase["queries"] for phase in report["phases"].values())
+    assert report["sections"] == 2
+    assert report["candidates_per_section"] >= 1
+    assert set(report["rejections"]) == {"capacity", "room", "teacher", "student"}
@@ -0,0 +1,70 @@
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_multistart import (
+    MultistartOptions,
+    attempt_score,
+    run_greedy_attempt,
+    run_multistart,
+)
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _snapshot():
+    sections = [SectionData(i, i, 1, frozenset()) for i in range(1, 4)]
+    classrooms = [ClassroomData(1, "Grande", 50), ClassroomData(2, "Chica", 5)]
+    return ScheduleSnapshot(sections, classrooms, TIME_BLOCKS)
+
+
+def test_seed_zero_matches_greedy_order():
+    result = run_greedy_attempt(_snapshot(), GRID, 0)
+    assert [placement.section_id for placement in result.placements] == [1, 2, 3]
+    assert result.unplaced == []
+
+
+def test_random_seed_changes_tie_break_order():
+    orders = {
+        tuple(p.section_id for p in run_greedy_attempt(_snapshot(), GRID, seed).placements)
+        for seed in range(1, 10)
+    }
+    assert len(orders) > 1
+
+
+def test_score_prefers_fewer_unplaced_then_less_slack():
+    snapshot = _snapshot()
+    result = run_greedy_attempt(snapshot, GRID, 0)
+    worse = result._replace(unplaced=[99], room_slack=0)
+    assert attempt_score(result) < attempt_score(worse)
+
+
+def test_multistart_in_process_pool():
+    result = run_multistart(_snapshot(), GRID, MultistartOptions(attempts=4, workers=2))
+    assert result.unplaced == []
+    assert len(result.placements) == 3
+
+
+def test_multistart_keeps_best_infeasible_attempt():
+    snapshot = _snapshot()
+    snapshot.classrooms = [ClassroomData(1, "Unica", 50)]
+    result = run_multistart(snapshot, GRID, MultistartOptions(attempts=3, workers=1))
+    assert len(result.unplaced) == 1
+
+
+def test_sequential_multistart_stops_at_the_time_budget(monkeypatch):
+    clock = iter([0.0, 0.5, 2.0])
+    monkeypatch.setattr("app.services.schedule_multistart.time.monotonic", lambda: next(clock))
+    snapshot = _snapshot()
+    snapshot.classrooms = [ClassroomData(1, "Unica", 50)]
+
+    result = run_multistart(snapshot, GRID, MultistartOptions(attempts=5, workers=1, time_budget=1))
+
+    assert result.seed == 0
@@ -0,0 +1,120 @@
+from app.services.schedule_engine import (
+    ClassroomData,
+    Placement,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_local_search import AnnealingConfig, improve_schedule
+from app.services.schedule_quality import (
+    IDLE_GAP_WEIGHT,
+    ROOM_SLACK_WEIGHT,
+    TEACHER_DAY_WEIGHT,
+    ScheduleQuality,
+    placements_from_rows,
+    score_schedule,
+)
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Lunes", "11:00", "12:00"),
+    TimeBlockData(4, "Martes", "09:00", "10:00"),
+    TimeBlockData(5, "Martes", "10:00", "11:00"),
+    TimeBlockData(6, "Martes", "11:00", "12:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _snapshot(sections, classrooms, assignments=()):
+    return ScheduleSnapshot(sections, classrooms, TIME_BLOCKS, assignments)
+
+
+def test_score_counts_gaps_teacher_days_and_slack():
+    first = SectionData(1, 1, 1, frozenset({1, 2}))
+    second = SectionData(2, 1, 1, frozenset({1}))
+    snapshot = _snapshot([first, second], [ClassroomData(1, "Sala", 5)])
+    placements = [Placement(1, 1, "Lunes", (1,)), Placement(2, 1, "Lunes", (3,))]
+
+    score = score_schedule(snapshot, GRID, placements)
+
+    assert score.idle_gaps == 1
+    assert score.teacher_days == 1
+    assert score.room_slack == 3 + 4
+    assert score.total == IDLE_GAP_WEIGHT + TEACHER_DAY_WEIGHT + 7 * ROOM_SLACK_WEIGHT
+
+
+def test_score_adds_up_terms_scored_apart():
+    first = SectionData(1, 1, 1, frozenset({1}), (2025, 1))
+    second = SectionData(2, 1, 1, frozenset({1}), (2025, 2))
+    snapshot = _snapshot([first, second], [ClassroomData(1, "Sala", 1)])
+    placements = [Placement(1, 1, "Lunes", (1,)), Placement(2, 1, "Lunes", (3,))]
+
+    score = score_schedule(snapshot, GRID, placements)
+
+    assert score.idle_gaps == 0
+    assert score.teacher_days == 2
+    assert score.total == 2 * TEACHER_DAY_WEIGHT
+
+
+def test_deltas_match_full_recomputation():
+    sections = [
+        SectionData(1, 1, 1, frozenset({1, 2})),
+        SectionData(2, 2, 2, frozenset({1, 3})),
+        SectionData(3, 1, 1, frozenset({2, 3})),
+    ]
+    snapshot = _snapshot(sections, [ClassroomData(1, "Sala", 5), ClassroomData(2, "Aula", 9)])
+    placements = [
+        Placement(1, 1, "Lunes", (1,)),
+        Placement(2, 2, "Lunes", (2, 3)),
+        Placement(3, 1, "Martes", (6,)),
+    ]
+    quality = ScheduleQuality(snapshot, GRID, placements)
+    moved = Placement(3, 2, "Lunes", (3,))
+
+    delta = quality.remove(placements[2]) + quality.add(moved)
+
+    expected = ScheduleQuality(snapshot, GRID, placements[:2] + [moved]).score()
+    assert quality.score() == expected
+    assert delta == expected.total - ScheduleQuality(snapshot, GRID, placements).total
+
+
+def test_placements_from_rows_groups_blocks_by_section():
+    rows = [(1, 2, 5), (1, 2, 4), (2, 1, 99)]
+
+    assert placements_from_rows(rows, GRID) == [Placement(1, 2, "Martes", (4, 5))]
+
+
+def test_improve_closes_student_gap_and_keeps_constraints():
+    first = SectionData(1, 1, 1, frozenset({1}))
+    second = SectionData(2, 2, 1, frozenset({1}))
+    classrooms = [ClassroomData(1, "Sala", 1)]
+    snapshot = _snapshot([first, second], classrooms)
+    placements = [Placement(1, 1, "Lunes", (1,)), Placement(2, 1, "Lunes", (3,))]
+
+    improved = improve_schedule(snapshot, GRID, placements, AnnealingConfig(time_budget=1, seed=3))
+
+    before = score_schedule(snapshot, GRID, placements)
+    after = score_schedule(snapshot, GRID, improved)
+    assert after.idle_gaps == 0
+    assert after.total < before.total
+    assert [placement.section_id for placement in improved] == [1, 2]
+
+    engine = ScheduleEngine(snapshot, GRID)
+    for placement in improved:
+        section = first if placement.section_id == 1 else second
+        mask = engine.mask_of(placement.block_ids)
+        assert engine.is_valid(section, classrooms[0], mask)
+        engine.assign(section, placement.classroom_id, placement.day, placement.block_ids, mask)
+
+
+def test_improve_without_budget_returns_placements_unchanged():
+    section = SectionData(1, 1, 1, frozenset({1}))
+    snapshot = _snapshot([section], [ClassroomData(1, "Sala", 1)])
+    placements = [Placement(1, 1, "Martes", (6,))]
+
+    assert (
+        improve_schedule(snapshot, GRID, placements, AnnealingConfig(time_budget=0)) == placements
+    )
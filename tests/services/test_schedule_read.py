@@ -0,0 +1,69 @@
+from sqlalchemy import event
+
+from app.models.section import Section
+from app.services import generate_schedule
+from app.services.schedule_versions import get_active_version_id, rollback_to_version
+
+
+class _QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *_args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *_exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def test_get_schedule_builds_entries(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+
+    schedule = generate_schedule.get_schedule()
+
+    sections = Section.query.order_by(Section.id).all()
+    assert sorted(schedule) == [section.id for section in sections]
+    entry = schedule[sections[0].id]
+    assert entry["course_code"] == sections[0].course_instance.course.code
+    assert entry["section_code"] == sections[0].code
+    assert entry["classroom"] == test_classroom.name
+    assert entry["start_time"] < entry["stop_time"]
+
+
+def test_get_schedule_is_two_queries_then_one(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    _db.session.expire_all()
+
+    with _QueryCounter(_db.engine) as cold:
+        first = generate_schedule.get_schedule()
+    with _QueryCounter(_db.engine) as warm:
+        second = generate_schedule.get_schedule()
+
+    assert cold.count == 2
+    assert warm.count == 1
+    assert second is first
+
+
+def test_new_generation_and_rollback_refresh_cache(
+    _db, sample_sections_no_conflict, test_classroom
+):
+    generate_schedule.generate_schedule()
+    first_version = get_active_version_id()
+    first = generate_schedule.get_schedule()
+
+    generate_schedule.generate_schedule()
+    second = generate_schedule.get_schedule()
+    assert second is not first
+
+    rollback_to_version(first_version)
+    assert generate_schedule.get_schedule() is not second
+    assert generate_schedule.get_schedule() == first
+
+
+def test_get_schedule_without_active_version(_db):
+    assert not generate_schedule.get_schedule()
@@ -0,0 +1,175 @@
+import random
+import time
+from collections import Counter
+
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.classroom import Classroom
+from app.models.schedule_version import ScheduleVersion
+from app.models.section import Section
+from app.services import generate_schedule
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_quality import score_schedule
+from app.services.schedule_repair import repair_active_schedule, repair_schedule
+from app.services.schedule_versions import get_active_version_id
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Lunes", "11:00", "12:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _students(size, first=0):
+    return frozenset(range(first, first + size))
+
+
+def _slots(result):
+    return {
+        placement.section_id: (placement.classroom_id, placement.block_ids)
+        for placement in result.placements
+    }
+
+
+def test_lost_room_moves_only_its_sections():
+    sections = [SectionData(1, 1, 1, _students(2)), SectionData(2, 2, 1, _students(2, 10))]
+    rooms = [ClassroomData(1, "A", 5), ClassroomData(2, "B", 5)]
+    snapshot = ScheduleSnapshot(sections, rooms, TIME_BLOCKS, [(1, 1, 1), (2, 2, 1)])
+
+    result = repair_schedule(snapshot, GRID, removed_classroom_ids=[2])
+
+    assert _slots(result) == {2: (1, (2,))}
+    assert result.displaced_section_ids == []
+    assert result.unplaced_section_ids == []
+
+
+def test_unavailable_teacher_block_moves_section():
+    sections = [SectionData(1, 1, 2, _students(2))]
+    snapshot = ScheduleSnapshot(
+        sections, [ClassroomData(1, "A", 5)], TIME_BLOCKS, [(1, 1, 1), (1, 1, 2)]
+    )
+
+    result = repair_schedule(snapshot, GRID, removed_teacher_blocks=[(1, 1)])
+
+    assert _slots(result) == {1: (1, (2, 3))}
+
+
+def _crowded_snapshot():
+    # Only room 1 seats section 4 once room 3 is gone, and room 1 is full.
+    sections = [
+        SectionData(1, 1, 1, _students(8)),
+        SectionData(2, 2, 1, _students(2, 10)),
+        SectionData(3, 3, 1, _students(2, 20)),
+        SectionData(4, 4, 1, _students(5, 30)),
+    ]
+    rooms = [ClassroomData(1, "Grande", 10), ClassroomData(2, "Chica", 3)]
+    rooms.append(ClassroomData(3, "Mediana", 5))
+    assignments = [(1, 1, 1), (2, 1, 2), (3, 1, 3), (4, 3, 1)]
+    return ScheduleSnapshot(sections, rooms, TIME_BLOCKS, assignments)
+
+
+def test_displaces_one_section_when_no_room_is_free():
+    result = repair_schedule(_crowded_snapshot(), GRID, removed_classroom_ids=[3])
+
+    assert _slots(result) == {2: (2, (1,)), 4: (1, (2,))}
+    assert result.displaced_section_ids == [2]
+    assert result.unplaced_section_ids == []
+
+
+def test_reports_sections_it_cannot_place():
+    result = repair_schedule(_crowded_snapshot(), GRID, removed_classroom_ids=[3], max_displaced=0)
+
+    assert result.placements == []
+    assert result.unplaced_section_ids == [4]
+
+
+def test_room_loss_in_full_term_is_fast_and_local():
+    rng = random.Random(0)
+    grid = generate_schedule.build_time_grid()
+    rooms = [
+        ClassroomData(room_id, f"Sala {room_id}", rng.choice([30, 35, 40, 45]))
+        for room_id in range(1, 37)
+    ]
+    # Cohorts of five sections share a pool of 40 students.
+    sections = [
+        SectionData(
+            section_id,
+            section_id % 150,
+            rng.choice([2, 3, 4]),
+            frozenset(rng.sample(range(section_id // 5 * 40, section_id // 5 * 40 + 40), 30)),
+        )
+        for section_id in range(1, 401)
+    ]
+    snapshot = ScheduleSnapshot(sections, rooms, grid.blocks)
+    engine = ScheduleEngine(snapshot, grid)
+    for section in snapshot.sections_in_greedy_order():
+        engine.place(section)
+    snapshot.assignments = [
+        (placement.section_id, placement.classroom_id, time_block_id)
+        for placement in engine.placements
+        for time_block_id in placement.block_ids
+    ]
+    rooms_used = Counter(placement.classroom_id for placement in engine.placements)
+    lost_room = rooms_used.most_common(1)[0][0]
+    affected = {
+        placement.section_id
+        for placement in engine.placements
+        if placement.classroom_id == lost_room
+    }
+
+    started = time.perf_counter()
+    result = repair_schedule(snapshot, grid, removed_classroom_ids=[lost_room])
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert result.unplaced_section_ids == []
+    moved = _slots(result)
+    assert set(moved) == affected | set(result.displaced_section_ids)
+    assert len(result.displaced_section_ids) < len(affected)
+
+    checker = ScheduleEngine(ScheduleSnapshot(sections, rooms, grid.blocks), grid)
+    rooms_by_id = {room.id: room for room in rooms}
+    sections_by_id = {section.id: section for section in sections}
+    for placement in engine.placements:
+        classroom_id, block_ids = moved.get(
+            placement.section_id, (placement.classroom_id, placement.block_ids)
+        )
+        section = sections_by_id[placement.section_id]
+        mask = grid.mask_of(block_ids)
+        assert classroom_id != lost_room
+        assert checker.is_valid(section, rooms_by_id[classroom_id], mask)
+        checker.assign(section, classroom_id, None, block_ids, mask)
+
+
+def test_repair_active_schedule_rewrites_moved_sections(
+    _db, sample_sections_no_conflict, test_classroom
+):
+    other_room = Classroom(name="Sala 2", capacity=30)
+    _db.session.add(other_room)
+    _db.session.commit()
+    generate_schedule.generate_schedule()
+    section_ids = [section.id for section in Section.query]
+    lost_room = AssignedTimeBlock.query.filter_by(section_id=section_ids[0]).first().classroom_id
+
+    grid = generate_schedule.build_time_grid()
+
+    result = repair_active_schedule(grid, classroom_ids=[lost_room])
+    _db.session.commit()
+
+    assert result.unplaced_section_ids == []
+    rooms = {
+        row.classroom_id
+        for row in AssignedTimeBlock.query.filter_by(version_id=get_active_version_id())
+    }
+    assert lost_room not in rooms
+    assert AssignedTimeBlock.query.filter_by(version_id=get_active_version_id()).count() == 6
+    version = _db.session.get(ScheduleVersion, get_active_version_id())
+    snapshot = ScheduleSnapshot.load(version.id, time_blocks=grid.blocks)
+    assert version.score["total"] == score_schedule(snapshot, grid, []).total
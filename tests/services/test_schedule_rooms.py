@@ -0,0 +1,81 @@
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_rooms import ClassroomIndex
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+CLASSROOMS = [
+    ClassroomData(1, "Auditorio", 100),
+    ClassroomData(2, "Sala", 20),
+    ClassroomData(3, "Taller", 40),
+]
+
+
+def test_fitting_returns_rooms_smallest_first():
+    index = ClassroomIndex(CLASSROOMS, 2)
+
+    assert [classroom.id for classroom in index.fitting(25)] == [3, 1]
+    assert index.fitting(101) == []
+
+
+def test_best_fit_picks_smallest_free_room():
+    index = ClassroomIndex(CLASSROOMS, 2)
+
+    assert index.best_fit(10, 0b11).id == 2
+
+    index.occupy(2, 0b01)
+    assert index.best_fit(10, 0b11).id == 3
+    assert index.best_fit(10, 0b10).id == 2
+
+
+def test_release_frees_room_again():
+    index = ClassroomIndex(CLASSROOMS, 2)
+    index.occupy(1, 0b11)
+    assert index.best_fit(50, 0b01) is None
+
+    index.release(1, 0b01)
+
+    assert index.best_fit(50, 0b01).id == 1
+    assert index.best_fit(50, 0b10) is None
+
+
+def test_is_free_needs_every_block_of_the_window():
+    index = ClassroomIndex(CLASSROOMS, 2)
+    index.occupy(2, 0b10)
+
+    assert index.is_free(2, 0b01)
+    assert not index.is_free(2, 0b11)
+    assert not index.is_free(99, 0b01)
+
+
+def test_engine_keeps_large_room_for_large_section():
+    small = SectionData(1, 1, 2, frozenset({1}))
+    large = SectionData(2, 2, 2, frozenset(range(2, 62)))
+    snapshot = ScheduleSnapshot([small, large], CLASSROOMS, TIME_BLOCKS)
+    engine = ScheduleEngine(snapshot, GRID)
+
+    first = engine.place(small)
+    second = engine.place(large)
+
+    assert first.classroom_id == 2
+    assert second.classroom_id == 1
+
+
+def test_engine_frees_room_on_unassign():
+    section = SectionData(1, 1, 2, frozenset({1}))
+    snapshot = ScheduleSnapshot([section], [ClassroomData(1, "Sala", 10)], TIME_BLOCKS)
+    engine = ScheduleEngine(snapshot, GRID)
+    placement = engine.place(section)
+
+    engine.unassign(section, placement)
+
+    assert engine.place(section) is not None
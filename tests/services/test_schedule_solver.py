@@ -0,0 +1,82 @@
+import sys
+
+from app.services.schedule_engine import (
+    ClassroomData,
+    ScheduleEngine,
+    ScheduleSnapshot,
+    SectionData,
+    TimeBlockData,
+)
+from app.services.schedule_grid import TimeGrid
+from app.services.schedule_solver import BacktrackingSolver
+
+TIME_BLOCKS = [
+    TimeBlockData(1, "Lunes", "09:00", "10:00"),
+    TimeBlockData(2, "Lunes", "10:00", "11:00"),
+    TimeBlockData(3, "Martes", "09:00", "10:00"),
+]
+GRID = TimeGrid(TIME_BLOCKS)
+
+
+def _engine(sections, classrooms):
+    return ScheduleEngine(ScheduleSnapshot(sections, classrooms, TIME_BLOCKS), GRID)
+
+
+def test_solver_finds_schedule_where_greedy_fails():
+    short = SectionData(1, 1, 1, frozenset({1, 2}))
+    long = SectionData(2, 2, 2, frozenset({3}))
+    classrooms = [ClassroomData(1, "A", 10)]
+
+    greedy = _engine([short, long], classrooms)
+    greedy.place(short)
+    assert greedy.place(long) is None
+
+    engine = _engine([short, long], classrooms)
+    assert BacktrackingSolver(engine).solve([short, long])
+    blocks = {placement.section_id: placement.block_ids for placement in engine.placements}
+    assert blocks == {1: (3,), 2: (1, 2)}
+
+
+def test_solver_reports_infeasible_problem():
+    first = SectionData(1, 1, 2, frozenset())
+    second = SectionData(2, 1, 2, frozenset())
+    engine = _engine([first, second], [ClassroomData(1, "A", 10), ClassroomData(2, "B", 10)])
+
+    assert not BacktrackingSolver(engine).solve([first, second])
+    assert engine.placements == []
+
+
+def test_solver_gives_up_after_backtrack_limit():
+    sections = [SectionData(i, i, 1, frozenset()) for i in range(1, 5)]
+    engine = _engine(sections, [ClassroomData(1, "A", 10)])
+
+    solver = BacktrackingSolver(engine, max_backtracks=0)
+    assert not solver.solve(sections)
+
+
+def test_unassign_releases_occupancy():
+    first = SectionData(1, 1, 1, frozenset({7}))
+    second = SectionData(2, 2, 1, frozenset({7}))
+    engine = _engine([first, second], [ClassroomData(1, "A", 10)])
+
+    placement = engine.place(first)
+    engine.unassign(first, placement)
+
+    assert engine.placements == []
+    assert engine.rooms.is_free(1, engine.mask_of(placement.block_ids))
+    assert engine.masks.teacher[1] == 0
+    assert engine.masks.blocked[2] == 0
+
+
+def test_solver_does_not_recurse_per_section():
+    sections = [SectionData(i, i, 1, frozenset()) for i in range(1, 301)]
+    classrooms = [ClassroomData(i, f"Sala {i}", 10) for i in range(1, 101)]
+    engine = _engine(sections, classrooms)
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(250)
+    try:
+        assert BacktrackingSolver(engine).solve(sections)
+    finally:
+        sys.setrecursionlimit(limit)
+    assert len(engine.placements) == 300
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.course_instance import CourseInstance, Semester
+from app.models.section import Section, WeighingType
+from app.models.student_section import StudentSection
+from app.services import generate_schedule
+from app.services.schedule_engine import ScheduleSnapshot, SectionData
+from app.services.schedule_versions import get_active_version_id
+
+
+@pytest.fixture
+def two_term_sections(_db, test_course, test_teacher, test_student):
+    sections = []
+    for code, (year, semester) in enumerate(((2024, Semester.SECOND), (2025, Semester.FIRST))):
+        instance = CourseInstance(course_id=test_course.id, year=year, semester=semester)
+        _db.session.add(instance)
+        _db.session.commit()
+        section = Section(
+            course_instance_id=instance.id,
+            teacher_id=test_teacher.id,
+            code=5000 + code,
+            weighing_type=WeighingType.WEIGHT,
+        )
+        _db.session.add(section)
+        _db.session.commit()
+        _db.session.add(StudentSection(student_id=test_student.id, section_id=section.id))
+        _db.session.commit()
+        sections.append(section)
+    return sections
+
+
+def _active_slots():
+    return {
+        (row.section_id, row.classroom_id, row.time_block_id)
+        for row in AssignedTimeBlock.query.filter_by(version_id=get_active_version_id())
+    }
+
+
+def test_split_by_term():
+    snapshot = ScheduleSnapshot(
+        [
+            SectionData(1, 1, 1, frozenset({5}), (2025, 1)),
+            SectionData(2, 1, 1, frozenset({5}), (2024, 2)),
+        ],
+        [],
+        [],
+        [(1, 1, 1), (2, 1, 1)],
+    )
+
+    terms = snapshot.split_by_term()
+
+    assert list(terms) == [(2024, 2), (2025, 1)]
+    assert [section.id for section in terms[(2025, 1)].sections] == [1]
+    assert terms[(2025, 1)].assignments == [(1, 1, 1)]
+    assert terms[(2025, 1)].conflict_graph.degree(1) == 0
+
+
+def test_terms_share_rooms_teachers_and_students(two_term_sections, test_classroom):
+    placements = generate_schedule.generate_schedule(
+        generate_schedule.GenerationOptions(term_workers=1)
+    )
+
+    first, second = placements
+    assert (first.classroom_id, first.block_ids) == (second.classroom_id, second.block_ids)
+
+
+def test_double_booking_a_room_within_a_term_is_rejected(_db, two_term_sections, test_classroom):
+    generate_schedule.generate_schedule(generate_schedule.GenerationOptions(term_workers=1))
+    row = AssignedTimeBlock.query.filter_by(section_id=two_term_sections[0].id).first()
+
+    _db.session.add(
+        AssignedTimeBlock(
+            version_id=row.version_id,
+            section_id=two_term_sections[1].id,
+            classroom_id=row.classroom_id,
+            time_block_id=row.time_block_id,
+            year=row.year,
+            semester=row.semester,
+        )
+    )
+    with pytest.raises(IntegrityError):
+        _db.session.commit()
+    _db.session.rollback()
+
+
+def test_parallel_terms_match_sequential(two_term_sections, test_classroom):
+    sequential = generate_schedule.generate_schedule(
+        generate_schedule.GenerationOptions(term_workers=1)
+    )
+    parallel = generate_schedule.generate_schedule(
+        generate_schedule.GenerationOptions(term_workers=2)
+    )
+
+    assert parallel == sequential
+
+
+def test_single_term_keeps_other_terms(two_term_sections, test_classroom):
+    generate_schedule.generate_schedule(generate_schedule.GenerationOptions(term_workers=1))
+    before = _active_slots()
+
+    placements = generate_schedule.generate_schedule(term=(2025, 1))
+
+    assert [placement.section_id for placement in placements] == [two_term_sections[1].id]
+    assert _active_slots() == before
+
+
+def test_unknown_term_is_rejected(two_term_sections, test_classroom):
+    with pytest.raises(ValueError):
+        generate_schedule.generate_schedule(term=(1999, 1))
+
+
+def test_get_terms(two_term_sections):
+    assert generate_schedule.get_terms() == [(2024, 2), (2025, 1)]
@@ -0,0 +1,76 @@
+from sqlalchemy import event
+
+from app.models.section import Section
+from app.services import generate_schedule
+from app.services.schedule_timetable import (
+    CLASSROOM_TIMETABLE,
+    STUDENT_TIMETABLE,
+    TEACHER_TIMETABLE,
+    timetable_for,
+    weekly_timetable,
+)
+
+
+def _entries(days):
+    return [entry for entries in days.values() for entry in entries]
+
+
+def test_student_timetable_lists_only_their_sections(
+    _db, sample_sections_no_conflict, test_classroom, test_student
+):
+    generate_schedule.generate_schedule()
+    section = Section.query.filter(Section.students.any(id=test_student.id)).one()
+
+    name, days = timetable_for(STUDENT_TIMETABLE, test_student.id)
+
+    assert name == "John Doe"
+    assert [entry["section_code"] for entry in _entries(days)] == [section.code]
+    assert list(days)[:5] == ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
+
+
+def test_teacher_and_classroom_timetables(
+    _db, sample_sections_no_conflict, test_classroom, test_teacher
+):
+    generate_schedule.generate_schedule()
+
+    _name, teacher_days = timetable_for(TEACHER_TIMETABLE, test_teacher.id)
+    name, classroom_days = timetable_for(CLASSROOM_TIMETABLE, test_classroom.id)
+
+    assert len(_entries(teacher_days)) == 1
+    assert name == test_classroom.name
+    assert len(_entries(classroom_days)) == 2
+    assert not _entries(timetable_for(TEACHER_TIMETABLE, test_teacher.id, term=(2024, 1))[1])
+
+
+def test_timetable_of_unknown_owner(_db):
+    assert timetable_for(STUDENT_TIMETABLE, 999) is None
+
+
+def test_timetable_is_three_queries(_db, sample_sections_no_conflict, test_classroom, test_student):
+    generate_schedule.generate_schedule()
+    student_id = test_student.id
+    queries = []
+
+    def count(*_args):
+        queries.append(1)
+
+    event.listen(_db.engine, "before_cursor_execute", count)
+    try:
+        timetable_for(STUDENT_TIMETABLE, student_id)
+    finally:
+        event.remove(_db.engine, "before_cursor_execute", count)
+
+    assert len(queries) == 3
+
+
+def test_weekly_timetable_orders_days_and_blocks():
+    rows = [
+        {"weekday": "Sábado", "start_time": "09:00"},
+        {"weekday": "Martes", "start_time": "14:00"},
+        {"weekday": "Martes", "start_time": "09:00"},
+    ]
+
+    days = weekly_timetable(rows)
+
+    assert list(days) == ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+    assert [entry["start_time"] for entry in days["Martes"]] == ["09:00", "14:00"]
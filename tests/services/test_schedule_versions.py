@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.course_instance import Semester
+from app.models.schedule_version import ScheduleVersion, ScheduleVersionStatus
+from app.models.section import Section
+from app.services import generate_schedule
+from app.services.schedule_versions import (
+    ScheduleVersionError,
+    activate_version,
+    copy_version_rows,
+    create_version,
+    diff_versions,
+    get_active_version_id,
+    list_versions,
+    mark_version_failed,
+    prune_versions,
+    rescore_version,
+    rollback_to_version,
+)
+
+
+def _add_rows(_db, version_id, rows):
+    for section_id, classroom_id, time_block_id in rows:
+        _db.session.add(
+            AssignedTimeBlock(
+                version_id=version_id,
+                section_id=section_id,
+                classroom_id=classroom_id,
+                time_block_id=time_block_id,
+                year=2025,
+                semester=Semester.FIRST,
+            )
+        )
+    _db.session.commit()
+
+
+def test_new_version_is_not_visible_until_activated(_db):
+    version_id = create_version()
+    assert get_active_version_id() is None
+
+    activate_version(version_id)
+    _db.session.commit()
+
+    assert get_active_version_id() == version_id
+    assert _db.session.get(ScheduleVersion, version_id).status == ScheduleVersionStatus.READY
+
+
+def test_activation_flips_the_previous_version(_db):
+    first_id = create_version()
+    activate_version(first_id)
+    second_id = create_version()
+    activate_version(second_id)
+    _db.session.commit()
+
+    assert ScheduleVersion.query.filter_by(is_active=True).one().id == second_id
+
+
+def test_rollback_rejects_unfinished_versions(_db):
+    version_id = create_version()
+    with pytest.raises(ScheduleVersionError):
+        rollback_to_version(version_id)
+
+
+def test_prune_keeps_newest_and_active(_db, sample_sections_no_conflict, test_classroom):
+    section_id = Section.query.first().id
+    version_ids = []
+    for _ in range(4):
+        version_id = create_version()
+        _add_rows(_db, version_id, [(section_id, test_classroom.id, 1)])
+        activate_version(version_id)
+        _db.session.commit()
+        version_ids.append(version_id)
+    rollback_to_version(version_ids[0])
+
+    prune_versions(keep=2)
+
+    remaining = {version.id for version, _ in list_versions()}
+    assert remaining == {version_ids[0], version_ids[2], version_ids[3]}
+    assert {row.version_id for row in AssignedTimeBlock.query.all()} == remaining
+
+
+def test_prune_counts_ready_versions_apart_from_failed_ones(
+    _db, sample_sections_no_conflict, test_classroom
+):
+    section_id = Section.query.first().id
+    ready_ids = []
+    for _ in range(3):
+        version_id = create_version()
+        _add_rows(_db, version_id, [(section_id, test_classroom.id, 1)])
+        activate_version(version_id)
+        _db.session.commit()
+        ready_ids.append(version_id)
+    failed_ids = []
+    for _ in range(3):
+        version_id = create_version()
+        mark_version_failed(version_id)
+        failed_ids.append(version_id)
+
+    prune_versions(keep=2)
+
+    remaining = {version.id for version, _ in list_versions()}
+    assert remaining == {*ready_ids[1:], *failed_ids[1:]}
+
+
+def test_prune_reaps_abandoned_builds(_db, sample_sections_no_conflict, test_classroom):
+    section_id = Section.query.first().id
+    abandoned_id = create_version()
+    _add_rows(_db, abandoned_id, [(section_id, test_classroom.id, 1)])
+    _db.session.get(ScheduleVersion, abandoned_id).created_at = datetime.now() - timedelta(days=1)
+    _db.session.commit()
+    building_id = create_version()
+
+    prune_versions()
+
+    remaining = {version.id for version, _ in list_versions()}
+    assert remaining == {building_id}
+    assert AssignedTimeBlock.query.count() == 0
+
+
+def test_diff_versions(_db, sample_sections_no_conflict, test_classroom):
+    first, second = (section.id for section in Section.query.order_by(Section.id))
+    old_id = create_version()
+    _add_rows(_db, old_id, [(first, test_classroom.id, 1)])
+    new_id = create_version()
+    _add_rows(_db, new_id, [(first, test_classroom.id, 2), (second, test_classroom.id, 3)])
+
+    assert diff_versions(old_id, new_id) == {"added": [second], "removed": [], "moved": [first]}
+    assert diff_versions(new_id, old_id) == {"added": [], "removed": [second], "moved": [first]}
+
+
+def test_copy_version_rows_skips_terms_and_sections(
+    _db, sample_sections_no_conflict, test_classroom
+):
+    first, second = (section.id for section in Section.query.order_by(Section.id))
+    source_id = create_version()
+    _add_rows(_db, source_id, [(first, test_classroom.id, 1), (second, test_classroom.id, 2)])
+
+    copy_id = create_version()
+    copy_version_rows(source_id, copy_id, skipped_section_ids={second})
+    skipped_term_id = create_version()
+    copy_version_rows(source_id, skipped_term_id, skipped_terms=[(2025, 1)])
+    _db.session.commit()
+
+    copied = AssignedTimeBlock.query.filter_by(version_id=copy_id).all()
+    assert [(row.section_id, row.time_block_id, row.year) for row in copied] == [(first, 1, 2025)]
+    assert AssignedTimeBlock.query.filter_by(version_id=skipped_term_id).count() == 0
+
+
+def test_failed_generation_keeps_active_version(_db, sample_sections_no_conflict, test_classroom):
+    generate_schedule.generate_schedule()
+    active_id = get_active_version_id()
+    _db.session.delete(test_classroom)
+    _db.session.commit()
+
+    with pytest.raises(generate_schedule.ScheduleAssignmentError):
+        generate_schedule.generate_schedule()
+
+    assert get_active_version_id() == active_id
+    assert ScheduleVersion.query.order_by(ScheduleVersion.id.desc()).first().status == (
+        ScheduleVersionStatus.FAILED
+    )
+
+
+def test_rescore_keeps_untouched_terms_and_scores_unsplit_versions_whole(
+    _db, sample_sections_no_conflict, test_classroom
+):
+    generate_schedule.generate_schedule()
+    version_id = get_active_version_id()
+    grid = generate_schedule.build_time_grid()
+    score = _db.session.get(ScheduleVersion, version_id).score
+    other_term = {"total": 7, "idle_gaps": 0, "teacher_days": 1, "room_slack": 2}
+
+    _store_score(_db, version_id, {**score, "terms": {**score["terms"], "2024-2": other_term}})
+    rescore_version(version_id, grid, [(2025, 1)])
+    assert _stored_score(_db, version_id)["total"] == score["total"] + 7
+
+    _store_score(_db, version_id, {key: value for key, value in score.items() if key != "terms"})
+    rescore_version(version_id, grid, [])
+    assert _stored_score(_db, version_id) == score
+
+
+def _store_score(_db, version_id, score):
+    _db.session.get(ScheduleVersion, version_id).score = score
+    _db.session.commit()
+
+
+def _stored_score(_db, version_id):
+    _db.session.commit()
+    _db.session.expire_all()
+    return _db.session.get(ScheduleVersion, version_id).score
@@ -20,9 +20,10 @@ def test_get_students_not_in_section(mock_student, mock_section):
     mock_student.query.filter.assert_called_once()
 
 
+@patch("app.services.student_section_service.refresh_subtotals")
 @patch("app.services.student_section_service.StudentSection")
 @patch("app.services.student_section_service.kanvas_db")
-def test_remove_student_from_section_success(mock_db, mock_student_section):
+def test_remove_student_from_section_success(mock_db, mock_student_section, mock_refresh):
     # Mock student_section exists
     mock_student_section.query.filter_by.return_value.first.return_value = MagicMock()
 
@@ -32,5 +33,5 @@ def test_remove_student_from_section_success(mock_db, mock_student_section):
     # Assert success
     assert result is True
     mock_db.session.delete.assert_called_once()
+    mock_refresh.assert_called_once_with([1], [2])
     mock_db.session.commit.assert_called_once()
-
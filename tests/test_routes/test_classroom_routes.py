@@ -1,7 +1,10 @@
 import pytest
 from flask import get_flashed_messages, url_for
 
+from app.models.assigned_time_block import AssignedTimeBlock
 from app.models.classroom import Classroom
+from app.services.generate_schedule import generate_schedule
+from app.services.schedule_versions import get_active_version_id
 
 
 def test_index_empty(client, _db):
@@ -134,6 +137,25 @@ def test_delete_classroom(client, _db):
         assert Classroom.query.get(classroom_id) is None
 
 
+@pytest.mark.usefixtures("sample_sections_no_conflict")
+def test_delete_classroom_reassigns_its_sections(client, _db, test_classroom):
+    """Test eliminar una sala del horario reasigna sus secciones"""
+    with client:
+        other_room = Classroom(name="Sala 2", capacity=30)
+        _db.session.add(other_room)
+        _db.session.commit()
+        room_ids = {test_classroom.id, other_room.id}
+        generate_schedule()
+        lost_room_id = AssignedTimeBlock.query.first().classroom_id
+
+        client.post(url_for("classroom.delete", classroom_id=lost_room_id), follow_redirects=True)
+
+        assert "Secciones reasignadas en el horario: 1." in get_flashed_messages()
+        rows = AssignedTimeBlock.query.filter_by(version_id=get_active_version_id()).all()
+        assert len(rows) == 6
+        assert {row.classroom_id for row in rows} == room_ids - {lost_room_id}
+
+
 def test_delete_non_existent(client, _db):
     """Test eliminar sala inexistente"""
     response = client.post(url_for("classroom.delete", classroom_id=999))
@@ -154,3 +154,85 @@ def test_delete_grade_db_error(mock_commit, client, test_grade):
 
     assert response.status_code == 500
     assert "Error al eliminar la nota" in response.data.decode()
+
+
+def test_instance_sheet_renders_every_student(
+    client, _test_student_in_section, test_evaluation_instance, test_grade
+):
+    response = client.get(
+        url_for("grades.instance_sheet", evaluation_instance_id=test_evaluation_instance.id)
+    )
+
+    assert response.status_code == 200
+    assert b"John Doe" in response.data
+    field = f'name="grade-{test_evaluation_instance.id}-{test_grade.student_id}"'
+    assert field.encode() in response.data
+
+
+def test_instance_sheet_saves_form_grades(
+    client, _test_student_in_section, test_evaluation_instance
+):
+    student_id = _test_student_in_section.student.id
+
+    with client:
+        response = client.post(
+            url_for("grades.instance_sheet", evaluation_instance_id=test_evaluation_instance.id),
+            data={f"grade-{test_evaluation_instance.id}-{student_id}": "6.3"},
+            follow_redirects=True,
+        )
+
+    assert response.status_code == 200
+    assert b"Notas guardadas: 1." in response.data
+    grade = StudentEvaluationInstance.query.filter_by(
+        evaluation_instance_id=test_evaluation_instance.id, student_id=student_id
+    ).one()
+    assert grade.grade == 6.3
+
+
+def test_evaluation_sheet_saves_json_grades(
+    client, _test_student_in_section, test_evaluation_instance, test_grade
+):
+    response = client.post(
+        url_for("grades.evaluation_sheet", evaluation_id=test_evaluation_instance.evaluation_id),
+        json={
+            "grades": [
+                {
+                    "evaluation_instance_id": test_evaluation_instance.id,
+                    "student_id": test_grade.student_id,
+                    "grade": 5.5,
+                }
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json == {"saved": 1}
+    assert StudentEvaluationInstance.query.one().grade == 5.5
+
+
+def test_sheet_rejects_students_outside_the_section(
+    client, _test_student_in_section, test_evaluation_instance, test_student_not_in_section
+):
+    response = client.post(
+        url_for("grades.instance_sheet", evaluation_instance_id=test_evaluation_instance.id),
+        json={"grades": [{"student_id": test_student_not_in_section.id, "grade": 6.0}]},
+    )
+
+    assert response.status_code == 400
+    assert "no pertenece a esta sección" in response.json["errors"][0]
+    assert StudentEvaluationInstance.query.count() == 0
+
+
+def test_sheet_closed_section_redirects(
+    client, test_evaluation_instance_closed_section, test_student_in_closed_section
+):
+    response = client.post(
+        url_for(
+            "grades.instance_sheet",
+            evaluation_instance_id=test_evaluation_instance_closed_section.id,
+        ),
+        json={"grades": [{"student_id": test_student_in_closed_section.student.id, "grade": 6}]},
+    )
+
+    assert response.status_code == 302
+    assert StudentEvaluationInstance.query.count() == 0
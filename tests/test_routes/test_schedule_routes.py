@@ -0,0 +1,303 @@
+from datetime import time
+
+import pytest
+from flask import url_for
+
+from app.models.assigned_time_block import AssignedTimeBlock
+from app.models.schedule_job import ScheduleJob
+from app.models.schedule_version import ScheduleVersion, ScheduleVersionStatus
+from app.models.section import Section
+from app.models.time_block import TimeBlock
+from app.services.schedule_versions import get_active_version_id
+
+
+@pytest.fixture(autouse=True)
+def inline_jobs(app, monkeypatch):
+    monkeypatch.setitem(app.config, "SCHEDULE_JOBS_INLINE", True)
+
+
+def _generate(client, **params):
+    return client.post(url_for("schedule.submit_job", **params), follow_redirects=True)
+
+
+def test_index_without_schedule(client, _db):
+    response = client.get(url_for("schedule.index"))
+    assert response.status_code == 200
+    assert "No hay horario disponible".encode("utf-8") in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_generate_success(client):
+    response = _generate(client)
+
+    assert response.status_code == 200
+    assert b"Completado" in response.data
+    assert AssignedTimeBlock.query.count() == 6
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_index_shows_schedule_quality(client):
+    _generate(client)
+
+    response = client.get(url_for("schedule.index"))
+
+    assert "Calidad del horario".encode("utf-8") in response.data
+    assert ScheduleVersion.query.one().score["total"] >= 0
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict")
+def test_generate_without_classrooms(client):
+    response = _generate(client)
+
+    assert response.status_code == 200
+    assert b"Fallido" in response.data
+    assert AssignedTimeBlock.query.count() == 0
+    assert ScheduleVersion.query.one().status == ScheduleVersionStatus.FAILED
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict")
+def test_feasibility_lists_issues(client):
+    response = client.get(url_for("schedule.feasibility"), headers={"Accept": "application/json"})
+
+    assert response.status_code == 200
+    assert response.json["feasible"] is False
+    assert {issue["kind"] for issue in response.json["issues"]} == {"capacity"}
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_feasibility_page_without_issues(client):
+    response = client.get(url_for("schedule.feasibility"))
+
+    assert response.status_code == 200
+    assert "No se encontraron impedimentos".encode("utf-8") in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_generate_incremental(client):
+    _generate(client)
+    response = _generate(client, incremental=1)
+
+    assert response.status_code == 200
+    job = ScheduleJob.query.order_by(ScheduleJob.id.desc()).first()
+    assert job.incremental and job.placed == 0
+    assert AssignedTimeBlock.query.filter_by(version_id=get_active_version_id()).count() == 6
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_versions_list(client):
+    _generate(client)
+    response = client.get(url_for("schedule.versions"))
+
+    assert response.status_code == 200
+    assert b"Activa" in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_activate_previous_version(client):
+    _generate(client)
+    first_id = get_active_version_id()
+    _generate(client)
+
+    response = client.post(
+        url_for("schedule.activate_version", version_id=first_id), follow_redirects=True
+    )
+
+    assert response.status_code == 200
+    assert get_active_version_id() == first_id
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_diff_version(client):
+    _generate(client)
+    first_id = get_active_version_id()
+    _generate(client)
+
+    response = client.get(url_for("schedule.diff_version", version_id=first_id))
+
+    assert response.status_code == 200
+    assert "Secciones movidas (0)".encode("utf-8") in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_submit_job_returns_id(client):
+    response = client.post(url_for("schedule.submit_job"), headers={"Accept": "application/json"})
+
+    assert response.status_code == 202
+    status = client.get(response.json["status_url"]).json
+    assert status["status"] == "done"
+    assert (status["placed"], status["total"]) == (2, 2)
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_job_page_and_cancel_of_finished_job(client):
+    response = client.post(url_for("schedule.submit_job"), follow_redirects=True)
+    assert response.status_code == 200
+    assert b"Completado" in response.data
+
+    job_id = ScheduleJob.query.one().id
+    response = client.post(
+        url_for("schedule.cancel", job_id=job_id), headers={"Accept": "application/json"}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_generate_with_invalid_term(client):
+    response = _generate(client, term="2025")
+
+    assert response.status_code == 200
+    assert "Periodo inválido".encode("utf-8") in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_generate_single_term(client):
+    response = _generate(client, term="2025-1")
+
+    assert response.status_code == 200
+    assert b"Completado" in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_download_defaults_to_xlsx(client):
+    _generate(client)
+
+    response = client.get(url_for("schedule.download"))
+
+    assert response.status_code == 200
+    assert response.mimetype.endswith("spreadsheetml.sheet")
+    assert "horario.xlsx" in response.headers["Content-Disposition"]
+    assert response.data.startswith(b"PK")
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict")
+def test_download_csv_for_one_classroom(client, test_classroom):
+    _generate(client)
+
+    response = client.get(
+        url_for("schedule.download", format="csv", classroom_id=test_classroom.id, term="2025-1")
+    )
+
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith("course_title,")
+    assert len(lines) == 3
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_download_jsonl(client):
+    _generate(client)
+
+    response = client.get(url_for("schedule.download", format="jsonl"))
+
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+
+
+def test_download_unknown_format(client, _db):
+    response = client.get(url_for("schedule.download", format="pdf"), follow_redirects=True)
+
+    assert "formato desconocido".encode("utf-8") in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_student_timetable_page(client, test_student):
+    _generate(client)
+
+    response = client.get(url_for("schedule.student_timetable", student_id=test_student.id))
+
+    assert response.status_code == 200
+    assert b"Horario de John Doe" in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict")
+def test_classroom_timetable_json(client, test_classroom):
+    _generate(client)
+
+    response = client.get(
+        url_for("schedule.classroom_timetable", classroom_id=test_classroom.id),
+        headers={"Accept": "application/json"},
+    )
+
+    assert response.status_code == 200
+    assert response.json["name"] == test_classroom.name
+    assert sum(len(entries) for entries in response.json["timetable"].values()) == 2
+
+
+def test_teacher_timetable_not_found(client, _db):
+    response = client.get(url_for("schedule.teacher_timetable", teacher_id=999))
+
+    assert response.status_code == 404
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_edit_section_page(client):
+    _generate(client)
+    section_id = Section.query.order_by(Section.id).first().id
+
+    response = client.get(url_for("schedule.edit_section", section_id=section_id))
+
+    assert response.status_code == 200
+    assert b"Intercambiar" in response.data
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict")
+def test_move_section_json(client, test_classroom):
+    _generate(client)
+    section_id = Section.query.order_by(Section.id).first().id
+    block = TimeBlock.query.filter_by(weekday="Viernes", start_time=time(14)).one()
+
+    response = client.post(
+        url_for("schedule.move", section_id=section_id),
+        json={"classroom_id": test_classroom.id, "time_block_id": block.id},
+    )
+
+    assert response.status_code == 200
+    assert response.json["entry"]["weekday"] == "Viernes"
+    assert response.json["entry"]["start_time"] == "14:00"
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_swap_with_itself_is_rejected(client):
+    _generate(client)
+    section_id = Section.query.order_by(Section.id).first().id
+
+    response = client.post(
+        url_for("schedule.swap", section_id=section_id), json={"other_section_id": section_id}
+    )
+
+    assert response.status_code == 409
+    assert "consigo misma" in response.json["error"]
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_repair_moves_sections_off_teacher_blocks(client):
+    _generate(client)
+    section = Section.query.order_by(Section.id).first()
+    rows = AssignedTimeBlock.query.filter_by(
+        version_id=get_active_version_id(), section_id=section.id
+    ).all()
+
+    response = client.post(
+        url_for("schedule.repair"),
+        json={"teacher_blocks": [[section.teacher_id, rows[0].time_block_id]]},
+    )
+
+    assert response.status_code == 200
+    assert response.json["moved"] == [section.id]
+    assert response.json["unplaced"] == []
+
+
+def test_repair_rejects_bad_ids(client):
+    response = client.post(url_for("schedule.repair"), json={"classroom_ids": ["x"]})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.usefixtures("sample_sections_no_conflict", "test_classroom")
+def test_index_shows_run_report(client):
+    _generate(client)
+
+    response = client.get(url_for("schedule.index"))
+
+    assert "Reporte de generación".encode() in response.data
+    assert "Asignación".encode() in response.data
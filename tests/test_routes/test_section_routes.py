@@ -6,6 +6,7 @@ from app.models.evaluation import Evaluation
 from app.models.section import Section, WeighingType
 from app.models.section_grade import SectionGrade
 from app.models.student_evaluation_instance import StudentEvaluationInstance
+from app.services.grade_subtotals import refresh_subtotals
 
 
 # ---------------------------
@@ -289,3 +290,90 @@ def test_grades_success(client, test_closed_section, test_student_in_closed_sect
     response = client.get(url_for("section.grades", section_id=test_closed_section.id))
     assert response.status_code == 200
     assert b"5.5" in response.data  # Verificar que se muestra la nota
+
+
+def test_grades_open_section_shows_provisional_average(
+    client,
+    test_open_section,
+    _test_evaluation,
+    test_evaluation_instance,
+    _test_student_in_section,
+):
+    kanvas_db.session.add(
+        StudentEvaluationInstance(
+            student_id=_test_student_in_section.student.id,
+            evaluation_instance_id=test_evaluation_instance.id,
+            grade=6.4,
+        )
+    )
+    refresh_subtotals([test_open_section.id])
+    kanvas_db.session.commit()
+
+    response = client.get(url_for("section.grades", section_id=test_open_section.id))
+
+    assert response.status_code == 200
+    assert b"Midterm" in response.data
+    assert response.data.count(b"6.4") == 3
+
+
+# ---------------------------
+# Pruebas para close_many()
+# ---------------------------
+def test_close_many_by_term(
+    client,
+    test_open_section,
+    _test_evaluation,
+    test_evaluation_instance,
+    _test_student_in_section,
+):
+    kanvas_db.session.add(
+        StudentEvaluationInstance(
+            student_id=_test_student_in_section.student.id,
+            evaluation_instance_id=test_evaluation_instance.id,
+            grade=6.0,
+        )
+    )
+    kanvas_db.session.commit()
+
+    response = client.post(
+        url_for("section.close_many"), data={"term": "2025-1"}, follow_redirects=True
+    )
+
+    assert response.status_code == 200
+    assert b"Secciones cerradas: 1." in response.data
+    assert Section.query.get(test_open_section.id).closed is True
+
+
+def test_close_many_by_ids_json(client, test_open_section, test_closed_section, _test_evaluation):
+    response = client.post(
+        url_for("section.close_many"),
+        json={"section_ids": [test_open_section.id, test_closed_section.id]},
+    )
+
+    assert response.status_code == 200
+    assert response.json == {
+        "closed": [test_open_section.id],
+        "skipped": [test_closed_section.id],
+        "failed": {},
+    }
+
+
+def test_close_many_by_repeated_form_ids(
+    client, test_open_section, test_closed_section, _test_evaluation
+):
+    response = client.post(
+        url_for("section.close_many"),
+        data={"section_ids": [str(test_open_section.id), str(test_closed_section.id)]},
+        follow_redirects=True,
+    )
+
+    assert response.status_code == 200
+    assert b"Secciones cerradas: 1." in response.data
+    assert Section.query.get(test_open_section.id).closed is True
+
+
+def test_close_many_invalid_term(client, _db):
+    response = client.post(url_for("section.close_many"), json={"term": "2025"})
+
+    assert response.status_code == 400
+    assert "Periodo inválido" in response.json["error"]
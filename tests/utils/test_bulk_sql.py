@@ -0,0 +1,31 @@
+from app.models.classroom import Classroom
+from app.utils.bulk_sql import insert_rows, upsert_rows
+
+
+def test_insert_rows(_db):
+    insert_rows(Classroom, [{"name": "A", "capacity": 10}, {"name": "B", "capacity": 20}])
+    _db.session.commit()
+    assert Classroom.query.count() == 2
+
+
+def test_insert_rows_without_rows(_db):
+    insert_rows(Classroom, [])
+    assert Classroom.query.count() == 0
+
+
+def test_upsert_rows_inserts_and_updates(_db):
+    _db.session.add(Classroom(id=1, name="A", capacity=10))
+    _db.session.commit()
+
+    upsert_rows(
+        Classroom,
+        [{"id": 1, "name": "A", "capacity": 99}, {"id": 2, "name": "B", "capacity": 5}],
+        ["id"],
+        ["capacity"],
+        chunk_size=1,
+    )
+    _db.session.commit()
+    _db.session.expire_all()
+
+    assert _db.session.get(Classroom, 1).capacity == 99
+    assert _db.session.get(Classroom, 2).capacity == 5